@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from commentary_cache import CACHE_SIZE, CACHE_TTL, CommentaryCache
+from commentary_stream import REFINE_DEADLINE, CommentaryStream, template_commentary
+from inference import (BATCH_WINDOW_MS, COMMENTARY_MODEL_DIR, MAX_BATCH_SIZE, MAX_NEW_TOKENS, MULTITASK_MODEL_DIR,
+                       REWRITER_MODEL_DIR, MicroBatcher, checkpoint_tasks, load_generator)
+from live_ingest import AsyncLiveIngest
+from live_poller import LIVE_BASE_URL
+from speculative_decoding import load_speculative_generator
+from translation import TRANSLATION_MODEL_DIR, Translator
+
+# Overridable from the environment, e.g. BATCH_WINDOW_MS=25 uvicorn main:app
+# (point a model dir at an export_quantized.py output to serve the int8 model)
+MODEL_DIRS = {
+    "commentary": os.environ.get("COMMENTARY_MODEL_DIR", COMMENTARY_MODEL_DIR),
+    "rewrite": os.environ.get("REWRITER_MODEL_DIR", REWRITER_MODEL_DIR),
+}
+# A train_multitask.py checkpoint serves every task it was trained for, from one model
+MULTITASK_DIR = os.environ.get("MULTITASK_MODEL_DIR", MULTITASK_MODEL_DIR)
+BATCH_WINDOW = float(os.environ.get("BATCH_WINDOW_MS", BATCH_WINDOW_MS))
+BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", MAX_BATCH_SIZE))
+NEW_TOKENS = int(os.environ.get("MAX_NEW_TOKENS", MAX_NEW_TOKENS))
+LIVE_FEED_URL = os.environ.get("LIVE_BASE_URL", LIVE_BASE_URL)
+CACHE_ENTRIES = int(os.environ.get("CACHE_SIZE", CACHE_SIZE))  # 0 disables the template cache
+CACHE_SECONDS = float(os.environ.get("CACHE_TTL", CACHE_TTL))
+TRANSLATION_DIR = os.environ.get("TRANSLATION_MODEL_DIR", TRANSLATION_MODEL_DIR)
+# TIERED_COMMENTARY=1 streams template commentary at once and the model's as a refinement when in time
+TIERED = os.environ.get("TIERED_COMMENTARY", "0") == "1"
+REFINE_SECONDS = float(os.environ.get("REFINE_DEADLINE", REFINE_DEADLINE))
+# SPECULATIVE_DECODING=1 drafts greedy decoding from the commentary templates (same output, fewer decoder passes)
+SPECULATIVE = os.environ.get("SPECULATIVE_DECODING", "0") == "1"
+HEARTBEAT_SECONDS = 15  # SSE comment sent to idle streams so proxies keep them open
+
+batchers = {}  # Tasks served by a multi-task checkpoint share one batcher
+prefixes = {}
+caches = {}
+live = {}  # "ingest", "stream" and the task feeding one into the other
+translators = {}  # "default" when a translation model is available
+
+
+class EventRequest(BaseModel):
+    event: str
+
+
+async def start_batcher(model_dir, speculative=False):
+    load = load_speculative_generator if speculative else load_generator
+    batcher = MicroBatcher(load(model_dir, max_new_tokens=NEW_TOKENS).generate,
+                           max_batch_size=BATCH_SIZE, max_wait_ms=BATCH_WINDOW)
+    await batcher.start()
+    return batcher
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load each saved model once; a missing checkpoint only disables its endpoint
+    tasks = checkpoint_tasks(MULTITASK_DIR) if os.path.isdir(MULTITASK_DIR) else None
+    if tasks:
+        # The template drafter only drafts for "commentary: " inputs; other tasks keep batched generate()
+        batcher = await start_batcher(MULTITASK_DIR, SPECULATIVE)
+        for task, prefix in tasks.items():
+            batchers[task] = batcher
+            prefixes[task] = prefix
+        print(f"✅ Loaded {MULTITASK_DIR} for {', '.join(f'/{task}' for task in tasks)}")
+    for task, model_dir in MODEL_DIRS.items():
+        if task in batchers:
+            continue
+        if not os.path.isdir(model_dir):
+            print(f"⚠️ {model_dir} not found, /{task} is disabled.")
+            continue
+        batchers[task] = await start_batcher(model_dir, SPECULATIVE and task == "commentary")
+        print(f"✅ Loaded {model_dir} for /{task}")
+    if not batchers:
+        raise RuntimeError("No model checkpoints found. Train them with train_multitask.py, or train_t5.py / "
+                           "train_event_rewriter.py.")
+    if CACHE_ENTRIES:
+        for task in batchers:
+            caches[task] = CommentaryCache(max_size=CACHE_ENTRIES, ttl=CACHE_SECONDS)
+    if os.path.isdir(TRANSLATION_DIR):
+        translators["default"] = Translator(TRANSLATION_DIR)
+        print(f"✅ Loaded {TRANSLATION_DIR} for /translate")
+    else:
+        print(f"⚠️ {TRANSLATION_DIR} not found, /translate is disabled.")
+
+    # Live games are only polled while somebody is subscribed to them
+    if "commentary" in batchers:
+        live["ingest"] = AsyncLiveIngest(base_url=LIVE_FEED_URL)
+        live["stream"] = CommentaryStream(lambda text: generate("commentary", text),
+                                          draft_fn=template_commentary if TIERED else None, deadline=REFINE_SECONDS)
+        live["consumer"] = asyncio.create_task(live["stream"].consume(live["ingest"].events()))
+
+    yield
+
+    if live:
+        live["ingest"].track(set())
+        live["consumer"].cancel()
+        await live["stream"].stop()
+        live.clear()
+    for batcher in set(batchers.values()):
+        await batcher.stop()
+    batchers.clear()
+    prefixes.clear()
+    caches.clear()
+    translators.clear()
+
+
+app = FastAPI(title="AI Commentary Generator", lifespan=lifespan)
+
+
+async def generate(task, event):
+    async def submit(text):
+        return await batchers[task].submit(prefixes.get(task, "") + text)
+
+    # Events that only differ in players, teams or numbers reuse cached commentary
+    if task in caches:
+        return await caches[task].submit(event, submit)
+    return await submit(event)
+
+
+async def run_task(task, event):
+    if task not in batchers:
+        raise HTTPException(status_code=503, detail=f"No model loaded for {task}")
+    return await generate(task, event)
+
+
+@app.post("/commentary")
+async def commentary(request: EventRequest):
+    return {"event": request.event, "commentary": await run_task("commentary", request.event)}
+
+
+@app.post("/rewrite")
+async def rewrite(request: EventRequest):
+    return {"event": request.event, "description": await run_task("rewrite", request.event)}
+
+
+async def translation_lines(commentary):
+    async for language, translation in translators["default"].fan_out(commentary):
+        yield json.dumps({"language": language, "translation": translation}, ensure_ascii=False) + "\n"
+
+
+@app.post("/translate")
+async def translate(request: EventRequest):
+    """
+    English commentary in `event`; one JSON line per target language, streamed as each finishes.
+    """
+    if not translators:
+        raise HTTPException(status_code=503, detail="No translation model loaded")
+    return StreamingResponse(translation_lines(request.event), media_type="application/x-ndjson")
+
+
+async def sse_messages(game_id):
+    """
+    Server-sent events for one subscriber; the subscription ends when the client disconnects.
+    """
+    subscription = live["stream"].subscribe(game_id)
+    live["ingest"].track(live["stream"].games())
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            kind = "refinement" if "refines" in message else "commentary"
+            yield f"id: {message['seq']}\nevent: {kind}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        if live:
+            live["stream"].unsubscribe(subscription)
+            live["ingest"].track(live["stream"].games())
+
+
+@app.get("/games/{game_id}/stream")
+async def stream_game(game_id: str):
+    if not live:
+        raise HTTPException(status_code=503, detail="No model loaded for commentary")
+    return StreamingResponse(sse_messages(game_id), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/games/{game_id}/state")
+async def game_state(game_id: str):
+    if not live:
+        raise HTTPException(status_code=503, detail="No model loaded for commentary")
+    if game_id not in live["stream"].states:
+        raise HTTPException(status_code=404, detail=f"No events received for game {game_id}")
+    return live["stream"].states.snapshot(game_id)
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "batch_window_ms": BATCH_WINDOW,
+        "max_batch_size": BATCH_SIZE,
+        "models": {task: batcher.metrics.snapshot() for task, batcher in batchers.items()},
+        "stream": live["stream"].snapshot() if live else None,
+        "cache": {task: cache.snapshot() for task, cache in caches.items()},
+        "translation": translators["default"].snapshot() if translators else None,
+    }
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "models": sorted(batchers)}
@@ -0,0 +1,85 @@
+import argparse
+import os
+import random
+import time
+
+import pandas as pd
+
+from commentary_cache import CommentaryCache, event_signature
+from event_classifier import classify_event, render_commentary
+from generate_training_data import INPUT_FILE
+from inference import COMMENTARY_MODEL_DIR, MAX_BATCH_SIZE, load_generator, percentiles
+from preprocess_playbyplay import preprocess_pbp_data
+
+CACHE_SIZES = [1000, 10000, 100000]
+SEED = 42
+
+
+def template_generate(events):
+    """
+    Stand-in for the T5 model: template commentary. It always repeats the event's names and
+    numbers, so nearly all of it is cacheable and the avoided share is an upper bound.
+    """
+    return [render_commentary(classify_event(event)) for event in events]
+
+
+class CountingModel:
+    """
+    Counts how many events are sent to generation.
+    """
+
+    def __init__(self, generate_fn):
+        self.generate_fn = generate_fn
+        self.calls = 0
+
+    def generate(self, events):
+        self.calls += len(events)
+        return self.generate_fn(events)
+
+
+def run(events, cache_size, generate_fn):
+    random.seed(SEED)
+    cache, model = CommentaryCache(max_size=cache_size, ttl=None), CountingModel(generate_fn)
+    start = time.perf_counter()
+    for i in range(0, len(events), MAX_BATCH_SIZE):
+        cache.generate(events[i:i + MAX_BATCH_SIZE], model.generate)
+    return cache, model, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the season corpus through the commentary cache.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=CACHE_SIZES)
+    parser.add_argument("--limit", type=int, help="Only use the first N events")
+    parser.add_argument("--model-dir", default=COMMENTARY_MODEL_DIR,
+                        help="Checkpoint whose outputs are cached (use --limit; template stand-in when missing)")
+    args = parser.parse_args()
+
+    if not os.path.exists(INPUT_FILE):
+        preprocess_pbp_data()
+    events = pd.read_csv(INPUT_FILE)["event_description"].dropna().tolist()[:args.limit]
+    print(f"🔍 {len(events):,} events from {INPUT_FILE}, batches of {MAX_BATCH_SIZE}")
+    if os.path.isdir(args.model_dir):
+        generate_fn, bound = load_generator(args.model_dir).generate, ""
+        print(f"🤖 Caching {args.model_dir} outputs")
+    else:
+        generate_fn, bound = template_generate, "≤"
+        print(f"⚠️ {args.model_dir} not found: template commentary stands in for the model. Templates are almost "
+              "always cacheable, so 'avoided' and 'cacheable' are upper bounds (marked ≤).")
+
+    print(f"{'size':>8} {'model calls':>12} {'avoided':>10} {'cacheable':>10} {'hit rate':>9} {'templates':>10}"
+          f" {'uncacheable':>12}"
+          f" {'evictions':>10} {'hit p50 µs':>11} {'p99 µs':>8} {'events/s':>10}")
+    for size in args.sizes:
+        cache, model, elapsed = run(events, size, generate_fn)
+        stats = cache.snapshot()
+        # The hit path is sub-millisecond, so report it in µs
+        hit = percentiles([seconds * 1000 for seconds in cache.metrics.hit_latency], (50, 99))
+        avoided = f"{bound}{1 - model.calls / len(events):.1%}"
+        cacheable = f"{bound}{1 - stats['uncacheable'] / model.calls:.1%}" if model.calls else "-"
+        print(f"{size:>8,} {model.calls:>12,} {avoided:>10} {cacheable:>10} {stats['hit_rate']:>9.1%}"
+              f" {stats['size']:>10,} {stats['uncacheable']:>12,} {stats['evictions']:>10,}"
+              f" {hit['p50']:>11.1f} {hit['p99']:>8.1f} {len(events) / elapsed:>10,.0f}")
+
+    signatures = pd.Series([event_signature(event)[0] for event in events[:200000]]).value_counts()
+    print(f"📊 {len(signatures):,} distinct signatures in the first {min(len(events), 200000):,} events; most common:")
+    print(signatures.head(10).to_string())
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import pandas as pd
+
+from benchmark_inference_server import EVENTS_FILE, MAX_NEW_TOKENS, REPO_DIR, build_stand_in_model, wait_until_ready
+from benchmark_live_ingest import load_recorded_games, start_feed_server
+from inference import COMMENTARY_MODEL_DIR, percentiles
+
+PORT = 8766
+GAMES = 2  # Replayed live_playbyplay_*.csv games, released one action every ACTION_GAP seconds
+SUBSCRIBER_COUNTS = [1, 25]  # Reading clients per game
+STALLED_PER_GAME = 1  # Clients that connect and never read
+DURATION = 20
+
+
+async def read_stream(client, game_id, deliveries, stop_at):
+    """
+    Reads one game's SSE stream until `stop_at`, recording (seq, delivery latency) per message.
+    """
+    try:
+        async with client.stream("GET", f"/games/{game_id}/stream") as response:
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    message = json.loads(line[len("data: "):])
+                    deliveries.append((game_id, message["seq"], time.time() - message["received_at"]))
+                if time.time() >= stop_at:
+                    break
+    except httpx.ReadTimeout:
+        pass
+
+
+async def stall_stream(client, game_id, stop_at):
+    async with client.stream("GET", f"/games/{game_id}/stream"):
+        await asyncio.sleep(max(0.0, stop_at - time.time()))
+
+
+async def run_scenario(model_dir, recorded, subscribers):
+    feed, feed_url = start_feed_server(recorded, GAMES)
+    env = dict(os.environ, COMMENTARY_MODEL_DIR=model_dir, REWRITER_MODEL_DIR=os.path.join(model_dir, "missing"),
+               MAX_NEW_TOKENS=str(MAX_NEW_TOKENS), LIVE_BASE_URL=feed_url)
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level",
+                                "warning"], cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL)
+    deliveries = []
+    try:
+        limits = httpx.Limits(max_connections=None)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=DURATION, limits=limits) as client:
+            await wait_until_ready(client, process)
+
+            # Start the replay now that the server is up
+            start = time.time()
+            feed.feeds = {game_id: (actions, start) for game_id, (actions, _) in feed.feeds.items()}
+            stop_at = start + DURATION
+            readers = [read_stream(client, game_id, deliveries, stop_at)
+                       for game_id in feed.feeds for _ in range(subscribers)]
+            stalled = [stall_stream(client, game_id, stop_at) for game_id in feed.feeds for _ in range(STALLED_PER_GAME)]
+            await asyncio.gather(*readers, *stalled)
+            server = (await client.get("/metrics")).json()
+    finally:
+        process.terminate()
+        process.wait()
+        feed.shutdown()
+
+    stream = server["stream"]
+    unique = len({(game_id, seq) for game_id, seq, _ in deliveries})
+    client_ms = percentiles([latency for _, _, latency in deliveries])
+    print(f"{subscribers:>11} {stream['events']:>7} {unique:>7} {len(deliveries):>10} "
+          f"{server['models']['commentary']['requests']:>10} {stream['dropped']:>8} "
+          f"{stream['ingest_to_publish_ms']['p50']:>13.0f} {client_ms['p50']:>9.0f} {client_ms['p95']:>9.0f} "
+          f"{client_ms['p99']:>9.0f}")
+
+
+async def main():
+    recorded = load_recorded_games()
+    events = pd.read_csv(EVENTS_FILE)["structured_event"].dropna().tolist()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_dir = os.path.abspath(COMMENTARY_MODEL_DIR)
+        if not os.path.isdir(model_dir):
+            model_dir = os.path.join(work_dir, "t5-stand-in")
+            build_stand_in_model(model_dir, events)
+            print(f"⚠️ {COMMENTARY_MODEL_DIR} not found, timing a randomly initialised t5-small-sized stand-in.")
+
+        print(f"⏱️ Ingest -> client latency, {GAMES} replayed games, {DURATION}s per scenario, "
+              f"{STALLED_PER_GAME} stalled client(s) per game")
+        print(f"{'subs / game':>11} {'events':>7} {'unique':>7} {'delivered':>10} {'generated':>10} {'dropped':>8} "
+              f"{'publish p50':>13} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for subscribers in SUBSCRIBER_COUNTS:
+            await run_scenario(model_dir, recorded, subscribers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
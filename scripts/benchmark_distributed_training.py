@@ -0,0 +1,133 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+WORKERS = [1, 2, 4, 8]
+GLOBAL_BATCH_SIZE = 64  # Fixed across worker counts, so every run does the same optimizer steps
+WARMUP_STEPS = 2
+
+
+def train_worker(model_dir, steps, global_batch_size, output):
+    """
+    One DDP worker: trains `steps` optimizer steps of global_batch_size examples, split across
+    workers and accumulated in micro-batches as batch_arguments() would for Trainer.
+    Rank 0 writes timed samples/sec as JSON to `output`.
+    """
+    from distributed_training import batch_arguments, is_main_process, setup_worker, world_size
+
+    setup_worker()
+    import torch
+    import torch.distributed as dist
+    from torch.nn.parallel import DistributedDataParallel
+    from transformers import AutoTokenizer, DataCollatorForSeq2Seq, T5ForConditionalGeneration
+
+    from benchmark_training_batches import LEARNING_RATE, WEIGHT_DECAY, load_pairs
+    from training_data import example_lengths, length_grouped_batches, tokenize_pairs
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = T5ForConditionalGeneration.from_pretrained(model_dir)
+    collator = DataCollatorForSeq2Seq(tokenizer, model=model)
+    train_sources, _, train_targets, _ = load_pairs()
+    dataset = tokenize_pairs(tokenizer, train_sources, train_targets)
+    lengths = example_lengths(dataset)
+    dataset = dataset.remove_columns("length")
+
+    workers, rank = world_size(), int(os.environ.get("RANK", 0))
+    micro_batch = batch_arguments(global_batch_size)["per_device_train_batch_size"]
+    if workers > 1:
+        model = DistributedDataParallel(model)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=LEARNING_RATE, weight_decay=WEIGHT_DECAY)
+    model.train()
+
+    # Every worker draws the same global batches and keeps its own share of each
+    batches = length_grouped_batches(lengths, global_batch_size, seed=0)
+    batches = [batch for batch in batches if len(batch) == global_batch_size][:WARMUP_STEPS + steps]
+    for step, batch in enumerate(batches):
+        if step == WARMUP_STEPS:
+            if workers > 1:
+                dist.barrier()
+            start = time.perf_counter()
+        share = batch[rank::workers]
+        micro_batches = [share[i:i + micro_batch] for i in range(0, len(share), micro_batch)]
+        for i, indices in enumerate(micro_batches):
+            # Gradients are only all-reduced on the last micro-batch of the step
+            last = i == len(micro_batches) - 1
+            with model.no_sync() if workers > 1 and not last else contextlib.nullcontext():
+                loss = model(**collator([dataset[int(j)] for j in indices])).loss
+                (loss * len(indices) / len(share)).backward()
+        optimizer.step()
+        optimizer.zero_grad()
+    if workers > 1:
+        dist.barrier()
+    seconds = time.perf_counter() - start
+
+    if is_main_process():
+        with open(output, "w") as f:
+            json.dump({"samples_per_second": steps * global_batch_size / seconds, "micro_batch": micro_batch,
+                       "threads": torch.get_num_threads()}, f)
+    if workers > 1:
+        dist.destroy_process_group()
+
+
+def resolve_model_dir(work_dir):
+    from transformers import AutoTokenizer
+
+    from benchmark_inference_server import build_stand_in_model
+    from benchmark_training_batches import load_pairs
+
+    try:
+        AutoTokenizer.from_pretrained("t5-small")
+        return "t5-small"
+    except OSError:
+        print("⚠️ t5-small not available, using a randomly initialised stand-in with a word-level tokenizer.")
+        train_sources, _, train_targets, _ = load_pairs()
+        build_stand_in_model(work_dir, train_sources + train_targets)
+        return work_dir
+
+
+def run(workers, model_dir, steps, global_batch_size, work_dir):
+    from distributed_training import launch
+
+    output = os.path.join(work_dir, f"result-{workers}.json")
+    command = [sys.executable, __file__, "--worker", model_dir, "--steps", str(steps),
+               "--global-batch-size", str(global_batch_size), "--output", output]
+    if launch(command, workers):
+        raise RuntimeError(f"Training with {workers} workers failed")
+    with open(output) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scale CPU DDP training across local workers.")
+    parser.add_argument("--workers", type=int, nargs="*", default=WORKERS)
+    parser.add_argument("--steps", type=int, default=10, help="Timed optimizer steps per run")
+    parser.add_argument("--global-batch-size", type=int, default=GLOBAL_BATCH_SIZE)
+    parser.add_argument("--worker", metavar="MODEL_DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        train_worker(args.worker, args.steps, args.global_batch_size, args.output)
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_dir = resolve_model_dir(work_dir)
+        cores = os.cpu_count()
+        print(f"⏱️ {args.steps} steps of {args.global_batch_size} examples from data/final_training_data_v2.csv, "
+              f"{cores} cores")
+        print(f"{'workers':>7} {'threads':>8} {'micro-batch':>12} {'samples/s':>10} {'speedup':>8} {'efficiency':>11}")
+        baseline = None
+        for workers in args.workers:
+            if workers > cores:
+                print(f"⚠️ {workers} workers on {cores} cores, threads are oversubscribed.")
+            result = run(workers, model_dir, args.steps, args.global_batch_size, work_dir)
+            # Parallel efficiency: speedup over the first (smallest) run per extra worker
+            baseline = baseline or (result["samples_per_second"], workers)
+            speedup = result["samples_per_second"] / baseline[0]
+            efficiency = speedup / (workers / baseline[1])
+            print(f"{workers:>7} {result['threads']:>8} {result['micro_batch']:>12} "
+                  f"{result['samples_per_second']:>10.1f} {speedup:>8.2f} {efficiency:>11.0%}")
@@ -0,0 +1,74 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from encoding_repair import SUSPECT_PATTERN, clean_flag_path, read_clean_csv, read_csv_text, repair_csv, repair_frame
+
+FILES = ["data/labeled_training_data.csv", "data/final_training_data_v2.csv"]
+REPEAT = 50  # Copies of each file's rows, so per-cell costs dominate timer noise
+
+
+def chained_replace(text):
+    """
+    The clean_text() that merge_labeled_data.py used to apply per cell.
+    """
+    if isinstance(text, str):
+        text = text.encode("utf-8", "ignore").decode("utf-8")
+        text = text.replace("‚Äôs", "'s").replace("‚Äô", "'")
+        text = text.replace("Äôs", "'s").replace("Äô", "'")
+        text = text.replace("„Ä¶", "...")
+        text = text.replace("‚Äù", '"').replace("‚Äú", '"')
+        text = text.replace("â€“", "-").replace("â€”", "—")
+        text = text.replace("Ã©", "é").replace("Ã±", "ñ")
+        text = text.replace("Â", "")
+        return text.strip()
+    return text
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def remaining_mojibake(df):
+    return int(sum(df[column].astype(str).str.contains(SUSPECT_PATTERN).sum()
+                   for column in df.columns if df[column].dtype == object))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encoding repair throughput on the labeled CSVs.")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    print(f"{'file':<32} {'method':<22} {'cells':>9} {'cells/s':>12} {'seconds':>8} {'mojibake left':>14}")
+    for path in FILES:
+        df = pd.concat([read_csv_text(path)] * args.repeat, ignore_index=True)
+        columns = [column for column in df.columns if df[column].dtype == object]
+        cells = len(df) * len(columns)
+
+        def apply_chained():
+            fixed = df.copy()
+            for column in columns:
+                fixed[column] = fixed[column].astype(str).apply(chained_replace)
+            return fixed
+
+        results = {"chained str.replace": timed(apply_chained),
+                   "single-pass repair": timed(lambda: repair_frame(df, columns)[0])}
+
+        # Ingest once, then what every later merge pays to read the flagged file
+        with tempfile.TemporaryDirectory() as work_dir:
+            copy = os.path.join(work_dir, os.path.basename(path))
+            df.to_csv(copy, index=False)
+            _, ingest = timed(lambda: repair_csv(copy))
+            results["ingest (repair+flag)"] = (read_clean_csv(copy), ingest)
+            results["flagged re-read"] = timed(lambda: read_clean_csv(copy))
+            os.remove(clean_flag_path(copy))
+            results["unflagged re-read"] = timed(lambda: read_clean_csv(copy))
+
+        for method, (fixed, seconds) in results.items():
+            print(f"{path:<32} {method:<22} {cells:>9,} {cells / seconds:>12,.0f} {seconds:>8.3f}"
+                  f" {remaining_mojibake(fixed):>14,}")
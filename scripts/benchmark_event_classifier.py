@@ -0,0 +1,52 @@
+import os
+import random
+import time
+
+import pandas as pd
+
+from event_classifier import classify_events, render_commentary
+from generate_training_data import INPUT_FILE, generate_commentary
+from preprocess_playbyplay import preprocess_pbp_data
+
+SEED = 42
+
+
+def legacy_loop(df):
+    """
+    The old main loop: iterrows plus the per-row elif chain.
+    """
+    training_data = []
+    for _, row in df.iterrows():
+        event = row["event_description"]
+        training_data.append([event, generate_commentary(event)])
+    return [commentary for _, commentary in training_data]
+
+
+if __name__ == "__main__":
+    if not os.path.exists(INPUT_FILE):
+        preprocess_pbp_data()
+    df = pd.read_csv(INPUT_FILE)
+    rows = len(df)
+
+    random.seed(SEED)
+    start = time.perf_counter()
+    expected = legacy_loop(df)
+    legacy_seconds = time.perf_counter() - start
+
+    random.seed(SEED)
+    start = time.perf_counter()
+    records = classify_events(df["event_description"])
+    classify_seconds = time.perf_counter() - start
+    actual = [render_commentary(record) for record in records]
+    total_seconds = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(expected, actual))
+    print(f"🔍 Parity with seed {SEED}: {rows - mismatches}/{rows} rows identical")
+    print(f"⏱️ iterrows + elif chain   {rows / legacy_seconds:>11,.0f} rows/s ({legacy_seconds:.1f}s)")
+    print(f"⏱️ classify only           {rows / classify_seconds:>11,.0f} rows/s ({classify_seconds:.1f}s)")
+    print(f"⏱️ classify + render       {rows / total_seconds:>11,.0f} rows/s ({total_seconds:.1f}s, "
+          f"{legacy_seconds / total_seconds:.1f}x)")
+
+    counts = pd.Series([record.event_type for record in records]).value_counts()
+    print("📊 Event types:")
+    print(counts.head(15).to_string())
@@ -0,0 +1,62 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from event_index import KEYWORDS, EventIndex, update_index
+from preprocess_playbyplay import OUTPUT_FILE, preprocess_pbp_data
+
+LIVE_FILE = "data/preprocessed_live_playbyplay.csv"
+RARE_EVENTS = [keyword for keyword in KEYWORDS if keyword != "team"]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def full_scans(path):
+    """
+    What extract_problematic_events.py / extract_targeted_events.py did: read the corpus, then
+    one case-insensitive regex scan for the rare events, another for "TEAM", and a per-row
+    keyword loop for the targeted sample.
+    """
+    df = pd.read_csv(path)
+    texts = df[[column for column in ("event_description", "structured_event") if column in df.columns][0]]
+    rare = df[texts.str.contains("|".join(RARE_EVENTS), case=False, na=False)]
+    team = df[texts.str.contains("TEAM", case=False, na=False)]
+    targeted = texts.fillna("").astype(str).str.lower().apply(lambda text: any(k in text for k in RARE_EVENTS))
+    return len(pd.concat([rare, team]).drop_duplicates()), int(targeted.sum())
+
+
+def indexed(index):
+    rare_or_team = index.any_of(RARE_EVENTS + ["team"])
+    return len(rare_or_team), len(index.stratified_sample(RARE_EVENTS, 200))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indexed rare-event extraction vs. full corpus scans.")
+    parser.add_argument("--sources", nargs="+", default=[LIVE_FILE, OUTPUT_FILE])
+    args = parser.parse_args()
+
+    if OUTPUT_FILE in args.sources and not os.path.exists(OUTPUT_FILE):
+        preprocess_pbp_data()
+    print(f"{'corpus':<40} {'setup':<26} {'seconds':>9} {'rows found':>11}")
+    for source in args.sources:
+        with tempfile.TemporaryDirectory() as work_dir:
+            index_dir = os.path.join(work_dir, "index")
+            results = {
+                "full scans (current)": timed(lambda: full_scans(source)),
+                "index build (cold)": timed(lambda: len(update_index(source, KEYWORDS, index_dir=index_dir))),
+                "index update (no change)": timed(lambda: len(update_index(source, KEYWORDS, index_dir=index_dir))),
+            }
+            index, load = timed(lambda: EventIndex.load(index_dir))
+            results["index load"] = (len(index), load)
+            results["extraction (set ops)"] = timed(lambda: indexed(index))
+            results["new keyword (one scan)"] = timed(
+                lambda: len(update_index(source, KEYWORDS + ["and one"], index_dir=index_dir).rows("and one")))
+        for setup, (found, seconds) in results.items():
+            print(f"{source:<40} {setup:<26} {seconds:>9.4f} {str(found):>11}")
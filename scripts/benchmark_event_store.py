@@ -0,0 +1,64 @@
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+import event_store
+
+DATA_DIR = "data/"
+SAMPLE_GAME = "0022300001"
+
+
+def load_csv_loop():
+    """
+    What the downstream scripts do today: list data/ and read every file.
+    """
+    frames = []
+    for filename in os.listdir(DATA_DIR):
+        if filename.startswith(("playbyplay_", "live_playbyplay_")) and filename.endswith(".csv"):
+            frames.append(pd.read_csv(os.path.join(DATA_DIR, filename)))
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_csv_one_game():
+    return pd.read_csv(os.path.join(DATA_DIR, f"playbyplay_{SAMPLE_GAME}.csv"))
+
+
+SCENARIOS = {
+    "csv_full": load_csv_loop,
+    "store_full": lambda: event_store.read_events(),
+    "store_projected": lambda: event_store.read_events(columns=["game_id", "period", "clock_seconds", "home_event", "away_event"]),
+    "store_q4": lambda: event_store.read_events(columns=["game_id", "clock_seconds", "description"], periods=[4]),
+    "csv_one_game": load_csv_one_game,
+    "store_one_game": lambda: event_store.read_events(game_ids=[SAMPLE_GAME]),
+}
+
+
+def run_scenario(name):
+    """
+    Runs one scenario in this process and prints rows, seconds and peak RSS (MB).
+    """
+    start = time.perf_counter()
+    df = SCENARIOS[name]()
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{len(df)} {elapsed:.3f} {peak_mb:.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_scenario(sys.argv[1])
+        sys.exit(0)
+
+    if not os.path.exists(event_store.STORE_DIR):
+        event_store.import_csvs()
+
+    # Each scenario runs in a fresh interpreter so peak RSS is measured in isolation
+    print(f"{'scenario':<18} {'rows':>10} {'seconds':>9} {'peak RSS MB':>12}")
+    for name in SCENARIOS:
+        output = subprocess.run([sys.executable, __file__, name], capture_output=True, text=True, check=True)
+        rows, seconds, peak = output.stdout.split()[-3:]
+        print(f"{name:<18} {rows:>10} {seconds:>9} {peak:>12}")
@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from game_clock import GameTimeline, parse_game_clock, period_length, period_start
+from live_ingest import clock_to_seconds
+from preprocess_playbyplay import MANIFEST_FILE, OUTPUT_FILE, preprocess_pbp_data
+from replay_simulator import DATA_DIR, list_recorded_games
+
+WINDOW_QUERIES = 100  # "Last 2 minutes of Q4" for this many games
+ASOF_QUERIES = 2000  # Wall-clock times aligned with the game clock
+SEED = 42
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def load_v2_corpus():
+    """
+    The preprocessed V2 corpus ("Q3 - 10:45" clocks) with each row's game ID taken from the manifest.
+    """
+    if not os.path.exists(OUTPUT_FILE):
+        preprocess_pbp_data()
+    with open(MANIFEST_FILE) as f:
+        files = json.load(f)["files"]
+    df = pd.read_csv(OUTPUT_FILE, dtype=str, keep_default_na=False)
+    df["game_id"] = np.repeat([name[len("playbyplay_"):-len(".csv")] for name in files],
+                              [entry["rows"] for entry in files.values()])
+    return df
+
+
+def load_live_corpus():
+    frames = [pd.read_csv(path).drop_duplicates(subset=["actionNumber"], keep="last").assign(game_id=game_id)
+              for game_id, path in list_recorded_games(DATA_DIR).items()]
+    return pd.concat(frames, ignore_index=True)
+
+
+def row_elapsed_v2(text):
+    """
+    Per-row baseline: split "Q3 - 10:45" by hand.
+    """
+    try:
+        quarter, clock = text.split(" - ")
+        period = int(quarter[1:])
+        minutes, seconds = clock.split(":")
+    except ValueError:
+        return None
+    length = 3000 if period > 4 else 7200
+    start = min(period - 1, 4) * 7200 + max(period - 5, 0) * 3000
+    return start + length - int(minutes) * 600 - int(float(seconds) * 10)
+
+
+def row_elapsed_live(row):
+    seconds = clock_to_seconds(row["clock"])
+    if seconds is None:
+        return None
+    period = row["period"]
+    length = 3000 if period > 4 else 7200
+    start = min(period - 1, 4) * 7200 + max(period - 5, 0) * 3000
+    return start + length - int(round(seconds * 10))
+
+
+def mask_window(df, elapsed, game_id, period, last_seconds):
+    """
+    Per-query baseline: boolean masks over the whole corpus.
+    """
+    end = period_start(period) + period_length(period)
+    return np.flatnonzero(((df["game_id"] == game_id) & (elapsed >= end - last_seconds * 10)
+                           & (elapsed <= end)).to_numpy())
+
+
+def scan_asof(df, game_id, stamp):
+    """
+    Per-query baseline: the game's rows at or before `stamp`, comparing ISO timestamps as strings.
+    """
+    game = df[(df["game_id"] == game_id) & (df["timeActual"] <= stamp)]
+    if game.empty:
+        return -1
+    return int(game.index[np.argmax(game["timeActual"].to_numpy() == game["timeActual"].max())])
+
+
+def report(corpus, operation, method, count, seconds, matches):
+    print(f"{corpus:<6} {operation:<26} {method:<22} {count:>10,} {seconds:>9.3f} {count / seconds:>13,.0f} "
+          f"{'yes' if matches else 'NO':>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized clock parsing and timeline queries vs. per-row handling.")
+    parser.add_argument("--window-queries", type=int, default=WINDOW_QUERIES)
+    parser.add_argument("--asof-queries", type=int, default=ASOF_QUERIES)
+    args = parser.parse_args()
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'corpus':<6} {'operation':<26} {'method':<22} {'count':>10} {'seconds':>9} {'per second':>13} {'matches':>8}")
+    v2 = load_v2_corpus()
+    per_row, row_seconds = timed(lambda: v2["time_remaining"].map(row_elapsed_v2))
+    elapsed, vector_seconds = timed(lambda: parse_game_clock(v2["time_remaining"]))
+    matches = per_row.astype("Int32").equals(elapsed)
+    report("v2", "parse clock", "per-row split", len(v2), row_seconds, True)
+    report("v2", "parse clock", "vectorized", len(v2), vector_seconds, matches)
+
+    games = rng.choice(v2["game_id"].unique(), min(args.window_queries, v2["game_id"].nunique()), replace=False)
+    masked, mask_seconds = timed(lambda: [mask_window(v2, elapsed, game_id, 4, 120) for game_id in games])
+    timeline, build_seconds = timed(lambda: GameTimeline(v2["game_id"], elapsed))
+    windows, search_seconds = timed(lambda: [timeline.period_window(game_id, 4, 120) for game_id in games])
+    matches = all(np.array_equal(np.sort(a), np.sort(b)) for a, b in zip(masked, windows))
+    report("v2", "last 2 min of Q4 (queries)", "boolean masks", len(games), mask_seconds, True)
+    report("v2", "last 2 min of Q4 (queries)", "timeline build", len(v2), build_seconds, True)
+    report("v2", "last 2 min of Q4 (queries)", "binary search", len(games), search_seconds, matches)
+
+    live = load_live_corpus()
+    per_row, row_seconds = timed(lambda: live.apply(row_elapsed_live, axis=1))
+    elapsed, vector_seconds = timed(lambda: parse_game_clock(live["clock"], live["period"]))
+    report("live", "parse clock", "per-row regex", len(live), row_seconds, True)
+    report("live", "parse clock", "vectorized", len(live), vector_seconds, per_row.astype("Int32").equals(elapsed))
+
+    # Random wall-clock moments during each game, e.g. when a tweet or a betting line arrived
+    stamps = pd.to_datetime(live["timeActual"], utc=True, format="ISO8601")
+    picks = rng.integers(0, len(live), args.asof_queries)
+    offsets = pd.to_timedelta(rng.integers(-30_000, 30_000, args.asof_queries), unit="ms")
+    queries = pd.DataFrame({"game_id": live["game_id"].to_numpy()[picks],
+                            "time": stamps.iloc[picks].reset_index(drop=True) + offsets})
+    query_text = queries["time"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f").str[:-5] + "Z"
+    scanned, scan_seconds = timed(lambda: [scan_asof(live, game_id, stamp)
+                                           for game_id, stamp in zip(queries["game_id"], query_text)])
+    timeline, build_seconds = timed(lambda: GameTimeline(live["game_id"], elapsed, live["timeActual"]))
+    joined, join_seconds = timed(lambda: timeline.asof_join(queries, "game_id", "time"))
+    # Compare the matched events' times: equal stamps may resolve to different rows
+    found = np.asarray(scanned)
+    joined = joined.to_numpy()
+    matches = np.array_equal(found < 0, joined < 0) and np.array_equal(
+        stamps.to_numpy()[found[found >= 0]], stamps.to_numpy()[joined[joined >= 0]])
+    report("live", "as-of join (queries)", "per-query scans", len(queries), scan_seconds, True)
+    report("live", "as-of join (queries)", "timeline build", len(live), build_seconds, True)
+    report("live", "as-of join (queries)", "binary search", len(queries), join_seconds, matches)
@@ -0,0 +1,78 @@
+import argparse
+import time
+
+from game_state import GameStateTracker
+from inference import percentiles
+from replay_simulator import build_replay_games
+
+GAMES = 15
+RESCAN_EVERY = 10  # The history-rescan baseline is quadratic, so only every Nth action is timed
+
+
+def feed(games):
+    """
+    Interleaves the games' releases in wall-clock order, the way the live stream sees them:
+    the preliminary version of an action when it appears, the recorded one when it is corrected.
+    :return: List of (gameId, action, is_edit).
+    """
+    releases = []
+    for game_id, game in games.items():
+        index = {action["actionNumber"]: i for i, action in enumerate(game.actions)}
+        for action_number, is_edit, at in game.releases():
+            i = index[action_number]
+            action = game.actions[i] if is_edit else game.preliminary[i]
+            releases.append((at, game_id, {**action, "gameId": game_id}, is_edit))
+    releases.sort(key=lambda release: release[0])
+    return [(game_id, action, is_edit) for _, game_id, action, is_edit in releases]
+
+
+def rescan(history, game_id):
+    """
+    Baseline: rebuilds the game's state from its full action history, as a generator
+    without a running state would have to for every action.
+    """
+    tracker = GameStateTracker()
+    for action in history[game_id].values():
+        tracker.update(action)
+    return tracker.snapshot(game_id)
+
+
+def timed_us(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000  # percentiles() reports ms, so this is µs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-action game-state update cost across concurrent replayed games.")
+    parser.add_argument("--games", type=int, default=GAMES)
+    args = parser.parse_args()
+
+    games = build_replay_games(copies=-(-args.games // 4), start=0)
+    games = dict(list(games.items())[:args.games])
+    changes = feed(games)
+
+    tracker = GameStateTracker()
+    history = {game_id: {} for game_id in games}
+    samples = {"update (new)": [], "update (edit)": [], "snapshot": [], "history rescan": []}
+    for n, (game_id, action, is_edit) in enumerate(changes):
+        _, update = timed_us(lambda: tracker.update(action))
+        samples["update (edit)" if is_edit else "update (new)"].append(update)
+        _, snapshot = timed_us(lambda: tracker.snapshot(game_id, action))
+        samples["snapshot"].append(snapshot)
+        history[game_id][action["actionNumber"]] = action
+        if n % RESCAN_EVERY == 0:
+            samples["history rescan"].append(timed_us(lambda: rescan(history, game_id))[1])
+
+    # The incremental state must end where a rebuild from the final actions does
+    mismatched = [game_id for game_id in games if tracker.snapshot(game_id) != rescan(history, game_id)]
+    rolled_back = sum(state.rolled_back for state in tracker.games.values())
+
+    print(f"⏱️ {len(games)} games, {len(changes):,} changes interleaved in release order, "
+          f"{rolled_back} actions rolled back for edits")
+    print(f"{'operation':<16} {'count':>7} {'p50 µs':>8} {'p99 µs':>8} {'max µs':>8}")
+    for operation, latencies in samples.items():
+        if latencies:
+            us = percentiles(latencies, (50, 99, 100))
+            print(f"{operation:<16} {len(latencies):>7,} {us['p50']:>8.1f} {us['p99']:>8.1f} {us['p100']:>8.1f}")
+    print("✅ Final states match a full rebuild." if not mismatched else f"❌ State mismatch for {mismatched}")
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import pandas as pd
+from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+from transformers import PreTrainedTokenizerFast, T5Config, T5ForConditionalGeneration
+
+from inference import COMMENTARY_MODEL_DIR, percentiles
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EVENTS_FILE = "data/final_training_data_v2.csv"
+PORT = 8765
+CONCURRENCY = 32  # Closed-loop clients, each sending its next request as soon as the last one returns
+DURATION = 15  # Seconds of load per configuration
+WARMUP = 3
+MAX_NEW_TOKENS = 24
+# (batch window ms, max batch size); a max batch of 1 is the unbatched baseline
+CONFIGS = [(0, 1), (0, 32), (5, 32), (10, 32), (25, 32), (50, 32)]
+
+
+def build_stand_in_model(model_dir, texts):
+    """
+    Saves a randomly initialised model with t5-small dimensions and a word-level tokenizer
+    fitted on `texts`, for timing when no trained checkpoint is available.
+    """
+    tokenizer = Tokenizer(models.WordLevel(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.train_from_iterator(texts, trainers.WordLevelTrainer(special_tokens=["<pad>", "</s>", "<unk>"]))
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, pad_token="<pad>", eos_token="</s>",
+                                        unk_token="<unk>")
+    config = T5Config(vocab_size=len(tokenizer), d_model=512, d_kv=64, d_ff=2048, num_layers=6, num_heads=8,
+                      pad_token_id=0, eos_token_id=1, decoder_start_token_id=0)
+    tokenizer.save_pretrained(model_dir)
+    T5ForConditionalGeneration(config).save_pretrained(model_dir)
+
+
+async def wait_until_ready(client, process):
+    while process.poll() is None:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server exited during startup")
+
+
+async def generate_load(client, events, duration):
+    """
+    Runs CONCURRENCY closed-loop clients for `duration` seconds.
+    :return: (completed requests, client-side latencies in seconds)
+    """
+    latencies = []
+    stop_at = time.perf_counter() + duration
+
+    async def worker(rng):
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            response = await client.post("/commentary", json={"event": rng.choice(events)})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker(random.Random(i)) for i in range(CONCURRENCY)))
+    return len(latencies), latencies
+
+
+async def run_config(model_dir, events, window_ms, batch_size):
+    env = dict(os.environ, COMMENTARY_MODEL_DIR=model_dir, REWRITER_MODEL_DIR=os.path.join(model_dir, "missing"),
+               BATCH_WINDOW_MS=str(window_ms), MAX_BATCH_SIZE=str(batch_size),
+               MAX_NEW_TOKENS=str(MAX_NEW_TOKENS))
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level",
+                                "warning"], cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL)
+    try:
+        limits = httpx.Limits(max_connections=CONCURRENCY)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=120, limits=limits) as client:
+            await wait_until_ready(client, process)
+            await generate_load(client, events, WARMUP)
+            count, latencies = await generate_load(client, events, DURATION)
+            server = (await client.get("/metrics")).json()["models"]["commentary"]
+    finally:
+        process.terminate()
+        process.wait()
+
+    client_ms = percentiles(latencies)
+    print(f"{window_ms:>9} {batch_size:>9} {count / DURATION:>9.1f} {client_ms['p50']:>9.0f} {client_ms['p95']:>9.0f} "
+          f"{client_ms['p99']:>9.0f} {server['mean_batch_size']:>10} {server['batch_ms']['p50']:>12.0f}")
+
+
+async def main():
+    events = pd.read_csv(EVENTS_FILE)["structured_event"].dropna().tolist()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_dir = os.path.abspath(COMMENTARY_MODEL_DIR)
+        if not os.path.isdir(model_dir):
+            model_dir = os.path.join(work_dir, "t5-stand-in")
+            build_stand_in_model(model_dir, events)
+            print(f"⚠️ {COMMENTARY_MODEL_DIR} not found, timing a randomly initialised t5-small-sized stand-in.")
+
+        print(f"🔄 {CONCURRENCY} concurrent clients, {DURATION}s per configuration, {os.cpu_count()} CPU(s)")
+        print(f"{'window ms':>9} {'max batch':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+              f"{'mean batch':>10} {'batch p50 ms':>12}")
+        for window_ms, batch_size in CONFIGS:
+            await run_config(model_dir, events, window_ms, batch_size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
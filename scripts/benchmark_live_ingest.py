@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from live_ingest import AsyncLiveIngest
+from live_poller import LivePoller
+
+DATA_DIR = "data/"
+SLATE_SIZES = [1, 15]
+DURATION = 10.0  # Seconds each scenario runs
+ACTION_GAP = 0.2  # Seconds between released actions within one game
+POLL_EVERY = 0.25  # Fixed polling interval for the benchmark
+SERVER_LATENCY = 0.05  # Simulated CDN round trip per request
+
+PATH_PATTERN = re.compile(r"/playbyplay/playbyplay_(\w+)\.json")
+
+
+def load_recorded_games():
+    """
+    :return: List of action lists, one per recorded live_playbyplay_*.csv file.
+    """
+    games = []
+    for file in sorted(os.listdir(DATA_DIR)):
+        if file.startswith("live_playbyplay_") and file.endswith(".csv"):
+            df = pd.read_csv(os.path.join(DATA_DIR, file))
+            games.append(json.loads(df.to_json(orient="records")))
+    return games
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """
+    Serves each benchmark game's actions as they are released over time.
+    """
+
+    def do_GET(self):
+        match = PATH_PATTERN.search(self.path)
+        if not match or match.group(1) not in self.server.feeds:
+            self.send_error(404)
+            return
+
+        time.sleep(SERVER_LATENCY)
+        actions, start = self.server.feeds[match.group(1)]
+        released = min(len(actions), int((time.time() - start) / ACTION_GAP) + 1)
+
+        body = json.dumps({"game": {"actions": actions[:released]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_feed_server(recorded, n_games):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    server.daemon_threads = True
+    start = time.time()
+    server.feeds = {f"g{i:02d}": (recorded[i % len(recorded)], start + 0.01 * i) for i in range(n_games)}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def ingest_delays(events, feeds):
+    """
+    Delay between an action becoming visible on the server and it being emitted.
+    """
+    positions = {
+        game_id: {action["actionNumber"]: i for i, action in enumerate(actions)}
+        for game_id, (actions, _) in feeds.items()
+    }
+    delays = []
+    for game_id, action_number, received_at in events:
+        released_at = feeds[game_id][1] + positions[game_id][action_number] * ACTION_GAP
+        delays.append(received_at - released_at)
+    return delays
+
+
+def run_async(recorded, n_games):
+    server, base_url = start_feed_server(recorded, n_games)
+    events = []
+
+    async def scenario():
+        ingest = AsyncLiveIngest(base_url=base_url, pool_size=n_games, interval_fn=lambda event: POLL_EVERY)
+        runner = asyncio.create_task(ingest.run(list(server.feeds)))
+        deadline = time.time() + DURATION
+        while time.time() < deadline:
+            try:
+                event = await asyncio.wait_for(ingest.queue.get(), timeout=deadline - time.time())
+            except asyncio.TimeoutError:
+                break
+            events.append((event["gameId"], event["actionNumber"], event["received_at"]))
+        runner.cancel()
+
+    asyncio.run(scenario())
+    server.shutdown()
+    return ingest_delays(events, server.feeds)
+
+
+def run_sequential(recorded, n_games):
+    """
+    Baseline: one poller walking every game in turn, as fetch_playbyplay.py used to.
+    """
+    server, base_url = start_feed_server(recorded, n_games)
+    poller = LivePoller(base_url=base_url, output_dir=None)
+    events = []
+
+    deadline = time.time() + DURATION
+    while time.time() < deadline:
+        start = time.monotonic()
+        poller.poll_once(list(server.feeds))
+        while not poller.events.empty():
+            event = poller.events.get()
+            events.append((event["gameId"], event["actionNumber"], time.time()))
+        time.sleep(max(0.0, POLL_EVERY - (time.monotonic() - start)))
+
+    server.shutdown()
+    return ingest_delays(events, server.feeds)
+
+
+def summarize(name, n_games, delays):
+    delays = sorted(delays)
+    p50 = statistics.median(delays) * 1000
+    p95 = delays[int(0.95 * (len(delays) - 1))] * 1000
+    print(f"{name:<12} {n_games:>6} {len(delays):>8} {p50:>10.1f} {p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    recorded = load_recorded_games()
+    print(f"⏱️ Ingest delay, {DURATION:.0f}s per scenario, {SERVER_LATENCY * 1000:.0f} ms simulated server latency")
+    print(f"{'mode':<12} {'games':>6} {'events':>8} {'p50 ms':>10} {'p95 ms':>10}")
+
+    for n_games in SLATE_SIZES:
+        summarize("sequential", n_games, run_sequential(recorded, n_games))
+        summarize("async", n_games, run_async(recorded, n_games))
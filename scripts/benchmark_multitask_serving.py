@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+EVENTS_FILE = "data/final_training_data_v2.csv"
+CHAIN_EVENTS = 50  # Events run through rewrite -> commentary per setup
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def serve_chain(setup, model_dirs):
+    """
+    Loads the models for one setup and runs events through rewrite -> commentary.
+    Prints load seconds, parameter MB, RSS added by loading and after serving (MB; weights are
+    memory-mapped, so loading alone understates it) and per-event chain latencies (s) as JSON.
+    """
+    from inference import TASK_PREFIXES, load_generator
+
+    events = pd.read_csv(EVENTS_FILE)["structured_event"].dropna().tolist()[:CHAIN_EVENTS]
+    before = rss_mb()
+    start = time.perf_counter()
+    if setup == "multi-task":
+        generator = load_generator(model_dirs[0])
+        rewriter = commentator = generator
+        rewrite_prefix, commentary_prefix = TASK_PREFIXES["rewrite"], TASK_PREFIXES["commentary"]
+    else:
+        rewriter, commentator = load_generator(model_dirs[0]), load_generator(model_dirs[1])
+        rewrite_prefix = commentary_prefix = ""
+    load_seconds = time.perf_counter() - start
+    loaded_mb = rss_mb() - before
+    models = {id(generator.model): generator.model for generator in (rewriter, commentator)}.values()
+    params_mb = sum(p.numel() * p.element_size() for model in models for p in model.parameters()) / 2 ** 20
+
+    commentator.generate([commentary_prefix + events[0]])  # Warm-up
+    latencies = []
+    for event in events:
+        start = time.perf_counter()
+        description = rewriter.generate([rewrite_prefix + event])[0] or event  # Stand-ins may return nothing
+        commentator.generate([commentary_prefix + description])
+        latencies.append(time.perf_counter() - start)
+    print(json.dumps({"load_seconds": load_seconds, "params_mb": params_mb, "loaded_mb": loaded_mb,
+                      "serving_mb": rss_mb() - before, "latencies": latencies}))
+
+
+def run(setup, model_dirs):
+    output = subprocess.run([sys.executable, __file__, setup, *model_dirs], capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        serve_chain(sys.argv[1], sys.argv[2:])
+        sys.exit(0)
+
+    from benchmark_inference_server import build_stand_in_model
+    from inference import COMMENTARY_MODEL_DIR, MULTITASK_MODEL_DIR, REWRITER_MODEL_DIR, percentiles
+
+    df = pd.read_csv(EVENTS_FILE).dropna()
+    texts = df["structured_event"].tolist() + df["natural_description"].tolist()
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Trained checkpoints when present, otherwise t5-small-sized stand-ins (same cost per token)
+        dirs = {}
+        for name, model_dir in [("rewrite", REWRITER_MODEL_DIR), ("commentary", COMMENTARY_MODEL_DIR),
+                                ("multi-task", MULTITASK_MODEL_DIR)]:
+            if not os.path.isdir(model_dir):
+                model_dir = os.path.join(work_dir, name)
+                build_stand_in_model(model_dir, texts)
+                print(f"⚠️ No {name} checkpoint, using a randomly initialised stand-in.")
+            dirs[name] = model_dir
+
+        print(f"⏱️ rewrite -> commentary for {CHAIN_EVENTS} events from {EVENTS_FILE}, one event at a time")
+        print(f"{'setup':<12} {'load s':>8} {'params MB':>10} {'RSS MB':>8} {'serving MB':>11}"
+              f" {'chain p50 ms':>13} {'p95 ms':>8}")
+        for setup, model_dirs in [("two models", [dirs["rewrite"], dirs["commentary"]]),
+                                  ("multi-task", [dirs["multi-task"]])]:
+            result = run(setup, model_dirs)
+            latency = percentiles(result["latencies"], (50, 95))
+            print(f"{setup:<12} {result['load_seconds']:>8.2f} {result['params_mb']:>10.0f} {result['loaded_mb']:>8.0f}"
+                  f" {result['serving_mb']:>11.0f}"
+                  f" {latency['p50']:>13.1f} {latency['p95']:>8.1f}")
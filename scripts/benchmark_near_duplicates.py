@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from inference import percentiles
+from near_duplicates import NearDuplicateIndex, row_texts
+
+SOURCE_FILE = "data/final_training_data_v2.csv"
+COLUMNS = ["structured_event", "natural_description"]
+SCALES = [1, 10, 100, 400]  # Corpus size as multiples of the labeled CSV
+QUERIES = 1000
+SEED = 42
+
+# Variants that exact drop_duplicates lets through
+MOJIBAKE = {"'": "‚Äô", "é": "Ã©", "ñ": "Ã±", "-": "â€“"}
+
+
+def variant(text, rng):
+    """
+    A copy of a labeled text with a name swapped, whitespace changed or an encoding artifact introduced.
+    """
+    words = text.split()
+    kind = rng.randrange(3)
+    if kind == 0 and words:
+        i = rng.randrange(len(words))
+        if words[i][:1].isupper():
+            words[i] = rng.choice(["Tatum", "Brown", "Adebayo", "Jokic", "Curry", "Young"])
+        return " ".join(words)
+    if kind == 1:
+        return "  ".join(words) + " "
+    for clean, broken in MOJIBAKE.items():
+        text = text.replace(clean, broken)
+    return text
+
+
+def corpus(df, scale, rng):
+    """
+    The labeled rows followed by (scale - 1) rounds of perturbed copies.
+    """
+    texts = row_texts(df, COLUMNS).tolist()
+    rows = list(texts)
+    for _ in range(scale - 1):
+        rows += [variant(text, rng) for text in texts]
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Near-duplicate index build and query time as the corpus grows.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    args = parser.parse_args()
+
+    df = pd.read_csv(SOURCE_FILE).dropna(subset=COLUMNS)
+    print(f"⏱️ {len(df):,} labeled rows from {SOURCE_FILE}, grown with name/whitespace/mojibake variants")
+    print(f"{'rows':>10} {'build s':>8} {'rows/s':>9} {'µs/row':>7} {'query p50 µs':>13} {'p99 µs':>8}"
+          f" {'exact dupes':>12} {'near dupes':>11} {'clusters':>9}")
+    for scale in args.scales:
+        rng = random.Random(SEED)
+        rows = corpus(df, scale, rng)
+        index = NearDuplicateIndex()
+        start = time.perf_counter()
+        index.add_all(rows)
+        roots = index.cluster_ids()
+        build = time.perf_counter() - start
+
+        latencies = []
+        for text in rng.sample(rows, min(QUERIES, len(rows))):
+            query_start = time.perf_counter()
+            index.query(variant(text, rng))
+            latencies.append((time.perf_counter() - query_start) * 1000)  # percentiles() reports ms, so this is µs
+        query = percentiles(latencies, (50, 99))
+
+        exact = len(rows) - len(set(rows))
+        clusters = len(set(roots.tolist()))
+        print(f"{len(rows):>10,} {build:>8.2f} {len(rows) / build:>9,.0f} {build / len(rows) * 1e6:>7.1f}"
+              f" {query['p50']:>13.1f} {query['p99']:>8.1f} {exact:>12,} {len(rows) - clusters:>11,} {clusters:>9,}")
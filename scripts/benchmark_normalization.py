@@ -0,0 +1,46 @@
+import os
+import time
+
+import pandas as pd
+
+import event_store
+from normalization_engine import NormalizationEngine, structure_live_events
+from preprocess_live_playbyplay import load_and_merge_data, preprocess_event, team_name_map
+from preprocess_playbyplay import clean_event_description
+
+LIVE_REPEAT = 100  # The four recorded live games are tiny; repeat them for a stable timing
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def same_values(a, b):
+    return (a.fillna("<missing>").to_numpy() == b.fillna("<missing>").to_numpy()).all()
+
+
+def report(label, rows, old_seconds, new_seconds, identical):
+    print(f"{label:<22} {rows:>9} rows  per-row {rows / old_seconds:>11,.0f} rows/s  "
+          f"engine {rows / new_seconds:>11,.0f} rows/s  ({old_seconds / new_seconds:.1f}x)  identical: {identical}")
+
+
+if __name__ == "__main__":
+    if not os.path.exists(event_store.STORE_DIR):
+        event_store.import_csvs()
+
+    # V2 descriptions exactly as preprocess_playbyplay.py builds them
+    v2 = event_store.read_events(columns=["home_event", "away_event"], source="v2")
+    events = v2["home_event"].fillna("") + v2["away_event"].fillna("")
+
+    old, old_seconds = timed(lambda: events.apply(clean_event_description))
+    engine = NormalizationEngine()
+    new, new_seconds = timed(lambda: engine.apply(events))
+    report("clean_event_description", len(events), old_seconds, new_seconds, same_values(old, new))
+    print(engine.report())
+
+    live = pd.concat([load_and_merge_data()] * LIVE_REPEAT, ignore_index=True)
+    old, old_seconds = timed(lambda: live.apply(preprocess_event, axis=1))
+    new, new_seconds = timed(lambda: structure_live_events(live, team_name_map))
+    report("preprocess_event", len(live), old_seconds, new_seconds, same_values(old, new))
@@ -0,0 +1,61 @@
+import filecmp
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from preprocess_playbyplay import list_input_files, preprocess_pbp_data
+
+DATA_DIR = "data/"
+NEW_GAMES = 10  # Games held back and added before the incremental run
+
+
+def timed(label, **kwargs):
+    start = time.perf_counter()
+    processed = preprocess_pbp_data(**kwargs)
+    print(f"⏱️ {label:<38} {time.perf_counter() - start:>8.2f}s  ({processed} files processed)")
+
+
+if __name__ == "__main__":
+    filenames = list_input_files(DATA_DIR)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Work on a copy so data/ is never touched
+        data_dir = os.path.join(work_dir, "data")
+        os.makedirs(data_dir)
+        for filename in filenames:
+            shutil.copy2(os.path.join(DATA_DIR, filename), data_dir)
+
+        reference = os.path.join(work_dir, "reference.csv")
+        output = os.path.join(work_dir, "preprocessed.csv")
+        manifest = os.path.join(work_dir, "manifest.json")
+
+        timed("full run, 1 worker", data_dir=data_dir, output_file=reference,
+              manifest_file=os.path.join(work_dir, "reference.json"), incremental=False, max_workers=1)
+        timed("full run, all cores", data_dir=data_dir, output_file=output, manifest_file=manifest,
+              incremental=False)
+        print(f"   identical to reference: {filecmp.cmp(reference, output, shallow=False)}")
+
+        timed("incremental, nothing changed", data_dir=data_dir, output_file=output, manifest_file=manifest)
+
+        # New games arrive: hold back the last few files, build, then add them back
+        held_back = os.path.join(work_dir, "held_back")
+        os.makedirs(held_back)
+        for filename in filenames[-NEW_GAMES:]:
+            shutil.move(os.path.join(data_dir, filename), held_back)
+        preprocess_pbp_data(data_dir=data_dir, output_file=output, manifest_file=manifest, incremental=False)
+        for filename in filenames[-NEW_GAMES:]:
+            shutil.move(os.path.join(held_back, filename), data_dir)
+        timed(f"incremental, {NEW_GAMES} new games", data_dir=data_dir, output_file=output, manifest_file=manifest)
+        print(f"   identical to reference: {filecmp.cmp(reference, output, shallow=False)}")
+
+        # A game in the middle of the corpus is corrected
+        edited = os.path.join(data_dir, filenames[len(filenames) // 2])
+        df = pd.read_csv(edited, dtype=str)
+        df.to_csv(edited, index=False)
+        with open(edited, "a") as f:
+            f.write("\n")
+        timed("incremental, 1 edited game", data_dir=data_dir, output_file=output, manifest_file=manifest)
+        print(f"   identical to reference: {filecmp.cmp(reference, output, shallow=False)}")
@@ -0,0 +1,108 @@
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from benchmark_inference_server import EVENTS_FILE, build_stand_in_model
+from export_quantized import export_quantized, model_size_mb
+from inference import COMMENTARY_MODEL_DIR, REWRITER_MODEL_DIR, QuantizedT5Generator, T5Generator, percentiles
+
+LATENCY_EVENTS = 50  # Single-event generate() calls timed per model
+BATCH_SIZE = 16
+
+
+def held_out_split(file_path=EVENTS_FILE):
+    """
+    :return: (inputs, references) for the 10% validation split, split like the training scripts.
+    """
+    df = pd.read_csv(file_path).dropna(subset=["structured_event", "natural_description"])
+    _, inputs, _, references = train_test_split(df["structured_event"].tolist(), df["natural_description"].tolist(),
+                                                 test_size=0.1, random_state=42)
+    return inputs, references
+
+
+def corpus_bleu(hypotheses, references, max_n=4):
+    """
+    Corpus-level BLEU-4 on whitespace tokens with the standard brevity penalty, 0-100.
+    """
+    matches, totals = [0] * max_n, [0] * max_n
+    hyp_length = ref_length = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp, ref = hypothesis.split(), reference.split()
+        hyp_length += len(hyp)
+        ref_length += len(ref)
+        for n in range(1, max_n + 1):
+            hyp_ngrams = Counter(tuple(hyp[i:i + n]) for i in range(len(hyp) - n + 1))
+            ref_ngrams = Counter(tuple(ref[i:i + n]) for i in range(len(ref) - n + 1))
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            totals[n - 1] += max(0, len(hyp) - n + 1)
+    if not hyp_length or 0 in matches:
+        return 0.0
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_n
+    brevity = min(0.0, 1 - ref_length / hyp_length)
+    return 100 * math.exp(log_precision + brevity)
+
+
+def exact_match(hypotheses, references):
+    return 100 * sum(h.strip() == r.strip() for h, r in zip(hypotheses, references)) / len(references)
+
+
+def generate_all(generator, inputs):
+    outputs = []
+    for i in range(0, len(inputs), BATCH_SIZE):
+        outputs += generator.generate(inputs[i:i + BATCH_SIZE])
+    return outputs
+
+
+def event_latency(generator, inputs):
+    """
+    :return: Per-event generate() latencies in seconds.
+    """
+    generator.generate(inputs[:1])  # Warm-up
+    latencies = []
+    for text in inputs[:LATENCY_EVENTS]:
+        start = time.perf_counter()
+        generator.generate([text])
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def compare(name, model_dir, inputs, references, work_dir):
+    int8_dir = export_quantized(model_dir, os.path.join(work_dir, os.path.basename(model_dir) + "-int8"))
+    print(f"📦 {name}: {model_size_mb(model_dir):.0f} MB fp32 -> {model_size_mb(int8_dir):.0f} MB int8")
+
+    results = {}
+    for label, generator in [("fp32", T5Generator(model_dir)), ("int8", QuantizedT5Generator(int8_dir))]:
+        outputs = generate_all(generator, inputs)
+        latency = percentiles(event_latency(generator, inputs), (50, 95))
+        results[label] = outputs
+        print(f"   {label}  exact match {exact_match(outputs, references):5.1f}%  "
+              f"BLEU {corpus_bleu(outputs, references):5.1f}  "
+              f"per-event p50 {latency['p50']:7.1f} ms  p95 {latency['p95']:7.1f} ms")
+
+    agreement = exact_match(results["int8"], results["fp32"])
+    delta = corpus_bleu(results["int8"], references) - corpus_bleu(results["fp32"], references)
+    print(f"   int8 vs fp32: BLEU delta {delta:+.2f}, identical outputs {agreement:.1f}%")
+
+
+if __name__ == "__main__":
+    inputs, references = held_out_split()
+    print(f"🔍 Held-out split: {len(inputs)} events from {EVENTS_FILE}")
+
+    # Checkpoints to compare can also be given on the command line
+    model_dirs = sys.argv[1:] or [COMMENTARY_MODEL_DIR, REWRITER_MODEL_DIR]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for model_dir in model_dirs:
+            name = os.path.basename(model_dir.rstrip("/"))
+            if not os.path.isdir(model_dir):
+                print(f"⚠️ {model_dir} not found, using a randomly initialised t5-small-sized stand-in "
+                      f"(quality numbers are only meaningful as int8 vs fp32 agreement).")
+                model_dir = os.path.join(work_dir, os.path.basename(model_dir))
+                build_stand_in_model(model_dir, inputs + references)
+            compare(name, model_dir, inputs, references, work_dir)
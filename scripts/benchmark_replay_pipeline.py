@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import os
+import time
+
+from commentary_stream import live_event_text
+from event_classifier import classify_any_event, render_commentary
+from inference import COMMENTARY_MODEL_DIR, MicroBatcher, load_generator, percentiles
+from live_ingest import AsyncLiveIngest, poll_interval
+from replay_simulator import build_replay_games, start_replay_server
+
+GAME_COUNTS = [4, 16, 64]  # Concurrent games; the four recordings are replayed as many times as needed
+SPEED = 100
+DURATION = 30
+SERVER_LATENCY = 0.02  # Simulated CDN round trip per request
+MIN_POLL_INTERVAL = 0.05
+
+
+async def template_commentary(text):
+    return render_commentary(classify_any_event(text))
+
+
+async def run_pipeline(n_games, speed, duration, generate):
+    """
+    Replays `n_games` games through ingestion -> preprocessing -> generation for `duration` seconds.
+    :return: (released changes, per-event stage timings, events still in flight at the end)
+    """
+    games = build_replay_games(copies=-(-n_games // 4), speed=speed)
+    games = dict(list(games.items())[:n_games])
+    server, base_url = start_replay_server(games, latency=SERVER_LATENCY)
+    released = {
+        (game_id, action_number, is_edit): at
+        for game_id, game in games.items() for action_number, is_edit, at in game.releases()
+    }
+
+    ingest = AsyncLiveIngest(base_url=base_url, pool_size=n_games,
+                             interval_fn=lambda event: max(MIN_POLL_INTERVAL, poll_interval(event) / speed))
+    runner = asyncio.create_task(ingest.run(list(games)))
+    timings, in_flight = [], set()
+
+    async def process(event):
+        text = live_event_text(event)
+        preprocessed = time.time()
+        await generate(text)
+        done = time.time()
+        release = released.get((event["gameId"], event["actionNumber"], event["is_edit"]))
+        timings.append((release, event["received_at"], preprocessed, done))
+
+    start = time.time()
+    deadline = start + duration
+    while True:
+        try:
+            event = await asyncio.wait_for(ingest.queue.get(), timeout=deadline - time.time())
+        except (asyncio.TimeoutError, ValueError):
+            break
+        task = asyncio.create_task(process(event))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    runner.cancel()
+    backlog = len(in_flight)
+    for task in in_flight:
+        task.cancel()
+    await asyncio.gather(runner, *in_flight, return_exceptions=True)
+    server.shutdown()
+    return sum(start <= at < deadline for at in released.values()), timings, backlog
+
+
+def report(n_games, duration, released, timings, backlog):
+    timed = [t for t in timings if t[0] is not None]
+    stages = {
+        "ingest": [received - release for release, received, _, _ in timed],
+        "preprocess": [preprocessed - received for _, received, preprocessed, _ in timings],
+        "generate": [done - preprocessed for _, _, preprocessed, done in timings],
+        "end-to-end": [done - release for release, _, _, done in timed],
+    }
+    print(f"{n_games:>6} {released / duration:>10.1f} {len(timings) / duration:>10.1f} {backlog:>8}", end="")
+    for samples in stages.values():
+        ms = percentiles(samples, (50, 99))
+        print(f" {ms['p50']:>9.1f} {ms['p99']:>9.1f}", end="")
+    print()
+
+
+async def main(args):
+    if args.generator == "model":
+        batcher = MicroBatcher(load_generator(args.model_dir).generate)
+        await batcher.start()
+        generate = batcher.submit
+    else:
+        generate = template_commentary
+
+    print(f"⏱️ {args.speed:g}x replay, {args.duration}s per run, {SERVER_LATENCY * 1000:.0f} ms feed latency, "
+          f"{args.generator} generation")
+    print(f"{'games':>6} {'offered/s':>10} {'done/s':>10} {'backlog':>8}"
+          f" {'ingest p50':>9} {'p99':>9} {'prep p50':>9} {'p99':>9} {'gen p50':>9} {'p99':>9} {'e2e p50':>9} {'p99':>9}")
+    for n_games in args.games:
+        report(n_games, args.duration, *await run_pipeline(n_games, args.speed, args.duration, generate))
+
+    if args.generator == "model":
+        await batcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive replayed live games through the commentary pipeline.")
+    parser.add_argument("--games", type=int, nargs="+", default=GAME_COUNTS)
+    parser.add_argument("--speed", type=float, default=SPEED)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--generator", choices=["model", "template"],
+                        default="model" if os.path.isdir(COMMENTARY_MODEL_DIR) else "template")
+    parser.add_argument("--model-dir", default=COMMENTARY_MODEL_DIR)
+    asyncio.run(main(parser.parse_args()))
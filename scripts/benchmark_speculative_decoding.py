@@ -0,0 +1,77 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmark_inference_server import EVENTS_FILE, build_stand_in_model
+from inference import COMMENTARY_MODEL_DIR, load_generator, percentiles
+from speculative_decoding import NGRAM_FILE, NgramTable, TemplateDrafter, load_speculative_generator
+
+EVENTS = 200
+SEED = 42
+
+
+def run(generator, events):
+    """
+    Generates one event at a time, the way live commentary arrives.
+    :return: (outputs, per-event latencies in seconds, seconds in total)
+    """
+    outputs, latencies = [], []
+    start = time.perf_counter()
+    for event in events:
+        began = time.perf_counter()
+        outputs.extend(generator.generate([event]))
+        latencies.append(time.perf_counter() - began)
+    return outputs, latencies, time.perf_counter() - start
+
+
+def report(name, tokenizer, outputs, latencies, seconds, baseline, stats=None):
+    tokens = sum(len(ids) for ids in tokenizer(outputs).input_ids)
+    ms = percentiles(latencies, (50, 99))
+    identical = sum(a == b for a, b in zip(outputs, baseline)) / len(outputs)
+    acceptance = stats.get("acceptance_rate") if stats else None
+    per_pass = stats.get("tokens_per_pass") if stats else 1.0
+    print(f"{name:<32} {ms['p50']:>9.1f} {ms['p99']:>9.1f} {tokens / seconds:>9.1f} {identical:>10.1%} "
+          f"{'-' if acceptance is None else f'{acceptance:.1%}':>11} {per_pass or 0:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Template-drafted speculative decoding vs. greedy generate().")
+    parser.add_argument("--events", type=int, default=EVENTS)
+    parser.add_argument("--model-dir", default=COMMENTARY_MODEL_DIR)
+    args = parser.parse_args()
+
+    texts = pd.read_csv(EVENTS_FILE)["structured_event"].dropna().tolist()
+    events = random.Random(SEED).sample(texts, min(args.events, len(texts)))
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_dir = args.model_dir
+        if not os.path.isdir(model_dir):
+            model_dir = os.path.join(work_dir, "t5-stand-in")
+            build_stand_in_model(model_dir, texts)
+            print(f"⚠️ {args.model_dir} not found, timing a randomly initialised t5-small-sized stand-in "
+                  "(its output follows no template, so expect almost no accepted drafts).")
+
+        baseline = load_generator(model_dir)
+        speculative = load_speculative_generator(model_dir)
+        tokenizer = baseline.tokenizer
+        drafters = {"template": TemplateDrafter(tokenizer)}
+        if os.path.exists(NGRAM_FILE):
+            drafters["template + n-grams"] = TemplateDrafter(tokenizer, NgramTable.from_csv(tokenizer))
+
+        # Warm up both paths so one-off allocation does not land in the first timings
+        baseline.generate(events[:2])
+        speculative.generate(events[:2])
+
+        print(f"⏱️ {len(events)} events, one at a time on {baseline.device}, up to {baseline.max_new_tokens} new tokens")
+        print(f"{'decoding':<32} {'p50 ms':>9} {'p99 ms':>9} {'tokens/s':>9} {'identical':>10} "
+              f"{'acceptance':>11} {'per pass':>9}")
+        expected, latencies, seconds = run(baseline, events)
+        report("greedy generate()", tokenizer, expected, latencies, seconds, expected)
+        for name, drafter in drafters.items():
+            speculative.drafter = drafter
+            speculative.stats.clear()
+            outputs, latencies, seconds = run(speculative, events)
+            report(f"speculative, {name}", tokenizer, outputs, latencies, seconds, expected, speculative.snapshot())
@@ -0,0 +1,69 @@
+import filecmp
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from generate_training_data import INPUT_FILE, generate_training_data, stream_training_data
+
+SCALES = [0.5, 1, 2]  # Input size relative to the preprocessed corpus
+SEED = 7
+
+
+def run_mode(mode, input_file, output_file):
+    """
+    Runs one generation mode in this process and prints seconds and peak RSS (MB).
+    """
+    random.seed(0)
+    start = time.perf_counter()
+    if mode == "in_memory":
+        df = pd.read_csv(input_file)
+        generate_training_data(df).to_csv(output_file, index=False)
+    elif mode == "stream":
+        stream_training_data(input_file, output_file)
+    elif mode == "stream_seeded":
+        stream_training_data(input_file, output_file, seed=SEED)
+    elif mode == "stream_parallel":
+        stream_training_data(input_file, output_file, seed=SEED, workers=2)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if mode == "stream_parallel":
+        peak_mb = max(peak_mb, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)
+    print(f"{elapsed:.2f} {peak_mb:.0f}")
+
+
+def make_input(corpus, scale, path):
+    rows = int(len(corpus) * scale)
+    repeats = -(-rows // len(corpus))
+    pd.concat([corpus] * repeats, ignore_index=True).head(rows).to_csv(path, index=False)
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_mode(*sys.argv[1:4])
+        sys.exit(0)
+
+    corpus = pd.read_csv(INPUT_FILE)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(f"{'rows':>10} {'mode':<16} {'seconds':>9} {'peak RSS MB':>12}")
+        for scale in SCALES:
+            input_file = os.path.join(work_dir, "input.csv")
+            rows = make_input(corpus, scale, input_file)
+
+            outputs = {}
+            for mode in ["in_memory", "stream", "stream_seeded", "stream_parallel"]:
+                outputs[mode] = os.path.join(work_dir, f"{mode}.csv")
+                result = subprocess.run([sys.executable, __file__, mode, input_file, outputs[mode]],
+                                        capture_output=True, text=True, check=True)
+                seconds, peak = result.stdout.split()[-2:]
+                print(f"{rows:>10} {mode:<16} {seconds:>9} {peak:>12}")
+
+            print(f"{'':>10} stream == in_memory: {filecmp.cmp(outputs['stream'], outputs['in_memory'], shallow=False)}, "
+                  f"parallel == seeded: {filecmp.cmp(outputs['stream_parallel'], outputs['stream_seeded'], shallow=False)}")
@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmark_inference_server import EVENTS_FILE, MAX_NEW_TOKENS, build_stand_in_model
+from commentary_stream import CommentaryStream, live_event_text, template_commentary
+from event_classifier import classify_any_event
+from inference import COMMENTARY_MODEL_DIR, MicroBatcher, load_generator, percentiles
+from live_ingest import normalize_action
+from replay_simulator import list_recorded_games, load_recorded_game
+
+GAMES = 4
+ACTION_GAP = 0.5  # Seconds between released actions within one game (a busy stretch of play)
+DURATION = 20
+DEADLINES = [0.25, 0.5, 1.0, 2.0]
+
+
+def check_missed_shots(recorded):
+    """
+    Every missed shot or free throw of the recorded games must get a missed template (or fixed
+    "misses" text) from the instant tier, never a make.
+    :return: Live descriptions that would render as a make.
+    """
+    wrong = []
+    for game_id, actions in recorded.items():
+        for action in actions:
+            if action.get("shotResult") != "Missed":
+                continue
+            text = live_event_text(normalize_action(game_id, action))
+            record = classify_any_event(text)
+            if not (record.missed and (record.template_set == "missed" or record.template_key is None
+                                       and "miss" in record.text)):
+                wrong.append(text)
+    return wrong
+
+
+async def read_messages(subscription, received, stop):
+    while not stop.is_set():
+        message = await subscription.get()
+        received.append((message, time.time()))
+
+
+async def run_mode(generate, recorded, deadline, duration):
+    """
+    Replays the recorded games into a stream; deadline None is the model-only stream.
+    :return: (client messages as (message, delivered at), stream snapshot)
+    """
+    stream = CommentaryStream(generate, draft_fn=None if deadline is None else template_commentary,
+                              deadline=deadline or 0)
+    received, stop = [], asyncio.Event()
+    readers = [asyncio.create_task(read_messages(stream.subscribe(game_id), received, stop)) for game_id in recorded]
+
+    start = time.time()
+    releases = sorted((i * ACTION_GAP + offset * ACTION_GAP / len(recorded), game_id, action)
+                      for offset, (game_id, actions) in enumerate(recorded.items())
+                      for i, action in enumerate(actions) if i * ACTION_GAP < duration)
+    for at, game_id, action in releases:
+        await asyncio.sleep(max(0.0, start + at - time.time()))
+        stream.submit(normalize_action(game_id, action))
+
+    # Let in-flight generation finish (or run out its deadline) before counting
+    await asyncio.sleep(deadline if deadline is not None else 0)
+    while stream.refinements or any(not queue.empty() for queue in stream.pending.values()):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.1)
+    stop.set()
+    for reader in readers:
+        reader.cancel()
+    await stream.stop()
+    return received, stream.snapshot()
+
+
+def report(name, received, snapshot):
+    first = {}
+    for message, delivered in received:
+        key = (message["gameId"], message["actionNumber"], message["is_edit"])
+        first.setdefault(key, delivered - message["received_at"])
+    model = [delivered - message["received_at"] for message, delivered in received if message["tier"] == "model"]
+    first_ms, model_ms = percentiles(list(first.values()), (50, 99)), percentiles(model, (50, 99))
+    tiers = snapshot["tiers"] or {}
+    fallback = tiers.get("fallback_rate")
+    on_time = tiers.get("on_time_share")
+    print(f"{name:<18} {len(first):>7} {first_ms['p50']:>10.1f} {first_ms['p99']:>10.1f} "
+          f"{model_ms['p50'] or 0:>10.1f} {model_ms['p99'] or 0:>10.1f} "
+          f"{'-' if fallback is None else f'{fallback:.1%}':>9} {'-' if on_time is None else f'{on_time:.1%}':>8} "
+          f"{tiers.get('stale', 0):>6}")
+
+
+async def main(args):
+    recorded = {game_id: load_recorded_game(path) for game_id, path in list(list_recorded_games().items())[:args.games]}
+    wrong = check_missed_shots(recorded)
+    print("✅ Every missed shot gets missed-shot template commentary." if not wrong
+          else f"❌ {len(wrong)} missed shots render as makes, e.g. {wrong[:3]}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_dir = COMMENTARY_MODEL_DIR
+        if not os.path.isdir(model_dir):
+            model_dir = os.path.join(work_dir, "t5-stand-in")
+            build_stand_in_model(model_dir, pd.read_csv(EVENTS_FILE)["structured_event"].dropna().tolist())
+            print(f"⚠️ {COMMENTARY_MODEL_DIR} not found, timing a randomly initialised t5-small-sized stand-in.")
+        batcher = MicroBatcher(load_generator(model_dir, max_new_tokens=MAX_NEW_TOKENS).generate)
+        await batcher.start()
+
+        print(f"⏱️ {len(recorded)} replayed games, one action per game every {ACTION_GAP}s for {args.duration}s")
+        print(f"{'mode':<18} {'events':>7} {'first p50':>10} {'first p99':>10} {'model p50':>10} {'model p99':>10} "
+              f"{'fallback':>9} {'on time':>8} {'stale':>6}   (latencies in ms from ingest)")
+        try:
+            report("model only", *await run_mode(batcher.submit, recorded, None, args.duration))
+            for deadline in args.deadlines:
+                report(f"tiered, {deadline:g}s", *await run_mode(batcher.submit, recorded, deadline, args.duration))
+        finally:
+            await batcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Template-first tiered commentary vs. model-only streaming.")
+    parser.add_argument("--games", type=int, default=GAMES)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--deadlines", type=float, nargs="+", default=DEADLINES)
+    asyncio.run(main(parser.parse_args()))
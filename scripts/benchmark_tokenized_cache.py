@@ -0,0 +1,77 @@
+import time
+
+START = time.time()  # Before the heavy imports, which are part of startup
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+SCALES = [1, 10, 50]  # Copies of the CSV, to see how tokenization cost grows with the corpus
+SOURCE_FILE = "data/final_training_data_v2.csv"
+SOURCE_COLUMN, TARGET_COLUMN = "structured_event", "natural_description"
+
+
+def first_step(csv_file, model_dir, cache_dir):
+    """
+    Training startup as in the training scripts, up to the first optimizer step.
+    Prints seconds spent getting the tokenized splits, and seconds from process start.
+    """
+    import torch
+    from torch.utils.data import DataLoader
+    from transformers import AutoTokenizer, DataCollatorForSeq2Seq, T5ForConditionalGeneration
+
+    from training_data import BatchSampler, example_lengths, length_grouped_batches, load_tokenized_splits
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    data_start = time.time()
+    train_dataset, _ = load_tokenized_splits(csv_file, SOURCE_COLUMN, TARGET_COLUMN, tokenizer,
+                                             cache_dir=None if cache_dir == "-" else cache_dir)
+    data_seconds = time.time() - data_start
+
+    model = T5ForConditionalGeneration.from_pretrained(model_dir)
+    lengths = example_lengths(train_dataset)
+    loader = DataLoader(train_dataset.remove_columns("length"),
+                        batch_sampler=BatchSampler(lambda seed: length_grouped_batches(lengths, 8, seed)),
+                        collate_fn=DataCollatorForSeq2Seq(tokenizer, model=model))
+    optimizer = torch.optim.AdamW(model.parameters(), lr=3e-4)
+    model(**next(iter(loader))).loss.backward()
+    optimizer.step()
+    print(f"{data_seconds:.3f} {time.time() - START:.3f}")
+
+
+def run(csv_file, model_dir, cache_dir):
+    output = subprocess.run([sys.executable, __file__, csv_file, model_dir, cache_dir],
+                            capture_output=True, text=True, check=True).stdout
+    return [float(value) for value in output.split()[-2:]]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        first_step(*sys.argv[1:4])
+        sys.exit(0)
+
+    from benchmark_inference_server import build_stand_in_model
+
+    corpus = pd.read_csv(SOURCE_FILE)
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_dir = os.path.join(work_dir, "model")
+        build_stand_in_model(model_dir, corpus[SOURCE_COLUMN].tolist() + corpus[TARGET_COLUMN].tolist())
+
+        print(f"{'rows':>8} {'mode':<12} {'data s':>8} {'start -> first step s':>22}")
+        for scale in SCALES:
+            csv_file = os.path.join(work_dir, f"training_x{scale}.csv")
+            pd.concat([corpus] * scale, ignore_index=True).to_csv(csv_file, index=False)
+            cache_dir = os.path.join(work_dir, "tokenized_cache")
+
+            for mode, cache in [("no cache", "-"), ("cold cache", cache_dir), ("warm cache", cache_dir)]:
+                data_seconds, total_seconds = run(csv_file, model_dir, cache)
+                print(f"{len(corpus) * scale:>8,} {mode:<12} {data_seconds:>8.2f} {total_seconds:>22.2f}")
+
+            # Any change to the CSV must miss the cache
+            with open(csv_file, "a") as f:
+                f.write("Q4 - 0:01,Extra event,Extra description\n")
+            data_seconds, total_seconds = run(csv_file, model_dir, cache_dir)
+            print(f"{len(corpus) * scale + 1:>8,} {'CSV edited':<12} {data_seconds:>8.2f} {total_seconds:>22.2f}")
@@ -0,0 +1,122 @@
+import argparse
+import copy
+import random
+import tempfile
+import time
+
+import pandas as pd
+import torch
+from sklearn.model_selection import train_test_split
+from torch.utils.data import DataLoader
+from transformers import AutoTokenizer, DataCollatorForSeq2Seq, T5ForConditionalGeneration
+
+from benchmark_inference_server import build_stand_in_model
+from training_data import (MAX_LENGTH, BatchSampler, example_lengths, length_grouped_batches, length_report,
+                           token_budget_batches, tokenize_pairs)
+
+DATA_FILE = "data/final_training_data_v2.csv"
+BATCH_SIZE = 8  # per_device_train_batch_size in the training scripts
+MAX_BATCH_TOKENS = 512
+LEARNING_RATE = 3e-4
+WEIGHT_DECAY = 0.01
+SEED = 42
+
+
+def load_pairs(file_path=DATA_FILE):
+    df = pd.read_csv(file_path).dropna(subset=["structured_event", "natural_description"])
+    return train_test_split(df["structured_event"].tolist(), df["natural_description"].tolist(),
+                            test_size=0.1, random_state=42)
+
+
+def load_model_and_tokenizer(work_dir, texts):
+    try:
+        return T5ForConditionalGeneration.from_pretrained("t5-small"), AutoTokenizer.from_pretrained("t5-small")
+    except OSError:
+        print("⚠️ t5-small not available, using a randomly initialised stand-in with a word-level tokenizer.")
+        build_stand_in_model(work_dir, texts)
+        return T5ForConditionalGeneration.from_pretrained(work_dir), AutoTokenizer.from_pretrained(work_dir)
+
+
+def max_length_loader(tokenizer, sources, targets):
+    """
+    The current setup: every example padded to MAX_LENGTH, shuffled batches of BATCH_SIZE.
+    """
+    encoded = tokenizer(sources, text_target=targets, truncation=True, padding="max_length", max_length=MAX_LENGTH,
+                        return_tensors="pt")
+    examples = [{key: encoded[key][i] for key in ("input_ids", "attention_mask", "labels")}
+                for i in range(len(sources))]
+    return DataLoader(examples, batch_size=BATCH_SIZE, shuffle=True, generator=torch.Generator().manual_seed(SEED))
+
+
+def bucketed_loader(dataset, collator, make_batches):
+    lengths = example_lengths(dataset)
+    sampler = BatchSampler(lambda seed: make_batches(lengths, seed), seed=SEED)
+    return DataLoader(dataset.remove_columns("length"), batch_sampler=sampler, collate_fn=collator)
+
+
+def evaluate(model, loader):
+    model.eval()
+    total, tokens = 0.0, 0
+    with torch.no_grad():
+        for batch in loader:
+            n = (batch["labels"] != -100).sum().item()
+            total += model(**batch).loss.item() * n
+            tokens += n
+    return total / tokens
+
+
+def train(model, loader, epochs):
+    """
+    :return: (seconds, examples, padded tokens seen) for `epochs` passes.
+    """
+    optimizer = torch.optim.AdamW(model.parameters(), lr=LEARNING_RATE, weight_decay=WEIGHT_DECAY)
+    model.train()
+    examples = padded = 0
+    start = time.perf_counter()
+    for _ in range(epochs):
+        for batch in loader:
+            loss = model(**batch).loss
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad()
+            examples += len(batch["input_ids"])
+            padded += batch["input_ids"].numel() + batch["labels"].numel()
+    return time.perf_counter() - start, examples, padded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare max_length padding with bucketed dynamic padding.")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--max-batch-tokens", type=int, default=MAX_BATCH_TOKENS)
+    parser.add_argument("--limit", type=int, help="Only train on the first N examples")
+    args = parser.parse_args()
+
+    train_sources, val_sources, train_targets, val_targets = load_pairs()
+    train_sources, train_targets = train_sources[:args.limit], train_targets[:args.limit]
+    torch.manual_seed(SEED)
+    random.seed(SEED)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        initial, tokenizer = load_model_and_tokenizer(work_dir, train_sources + train_targets)
+    collator = DataCollatorForSeq2Seq(tokenizer, model=initial)
+    train_dataset = tokenize_pairs(tokenizer, train_sources, train_targets)
+    val_dataset = tokenize_pairs(tokenizer, val_sources, val_targets).remove_columns("length")
+    val_loader = DataLoader(val_dataset, batch_size=32, collate_fn=collator)
+    length_report(train_dataset, batch_size=BATCH_SIZE)
+
+    setups = {
+        "max_length": lambda: max_length_loader(tokenizer, train_sources, train_targets),
+        "length-grouped": lambda: bucketed_loader(
+            train_dataset, collator, lambda lengths, seed: length_grouped_batches(lengths, BATCH_SIZE, seed)),
+        f"{args.max_batch_tokens}-token": lambda: bucketed_loader(
+            train_dataset, collator, lambda lengths, seed: token_budget_batches(lengths, args.max_batch_tokens, seed)),
+    }
+    # Eval loss is computed the same way for every setup: dynamic padding, pad labels ignored
+    print(f"⏱️ {len(train_dataset):,} training examples, {args.epochs} epoch(s) per setup, eval on {len(val_dataset):,}")
+    print(f"{'setup':<16} {'batches':>8} {'samples/s':>10} {'s/epoch':>9} {'padded tok/ex':>14} {'eval loss':>10}")
+    for name, make_loader in setups.items():
+        model = copy.deepcopy(initial)
+        loader = make_loader()
+        seconds, examples, padded = train(model, loader, args.epochs)
+        print(f"{name:<16} {len(loader):>8,} {examples / seconds:>10.1f} {seconds / args.epochs:>9.1f}"
+              f" {padded / examples:>14.1f} {evaluate(model, val_loader):>10.4f}")
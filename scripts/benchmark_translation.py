@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+from event_classifier import classify_event, render_commentary
+from generate_training_data import INPUT_FILE
+from inference import percentiles
+from preprocess_playbyplay import preprocess_pbp_data
+from translation import TRANSLATION_MODEL_DIR, Translator, split_phrases
+
+SEED = 42
+
+
+def event_commentary(count):
+    """
+    Template commentary for `count` consecutive corpus events, standing in for model output.
+    """
+    if not os.path.exists(INPUT_FILE):
+        preprocess_pbp_data()
+    events = pd.read_csv(INPUT_FILE, nrows=count * 2)["event_description"].dropna().tolist()[:count]
+    rng = random.Random(SEED)
+    return [render_commentary(classify_event(event), rng) for event in events]
+
+
+def unbatched(translator, commentary):
+    """
+    Baseline: every sentence in every language as its own model call, no cache.
+    """
+    for language in translator.languages:
+        for phrase in split_phrases(commentary):
+            translator._generate([phrase], language)
+
+
+async def fan_out(translator, commentary):
+    """
+    :return: (seconds to the first language, seconds to all languages)
+    """
+    start = time.perf_counter()
+    first = None
+    async for _ in translator.fan_out(commentary):
+        first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-event translation fan-out latency on CPU.")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--model-dir", default=TRANSLATION_MODEL_DIR)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.model_dir):
+        sys.exit(f"⚠️ {args.model_dir} not found. Save a model with: python scripts/translation.py --download")
+    commentary = event_commentary(args.events)
+    print(f"⏱️ {len(commentary)} events of template commentary, {os.cpu_count()} cores")
+
+    print(f"{'setup':<22} {'first p50 ms':>13} {'all p50 ms':>11} {'all p95 ms':>11} {'events/s':>9} {'hit rate':>9}")
+    translator = Translator(args.model_dir, cache_size=0)
+    baseline = []
+    for text in commentary[:min(len(commentary), 20)]:  # The baseline is slow; a sample is enough
+        start = time.perf_counter()
+        unbatched(translator, text)
+        baseline.append(time.perf_counter() - start)
+    total = percentiles(baseline, (50, 95))
+    print(f"{'unbatched, no cache':<22} {'-':>13} {total['p50']:>11.1f} {total['p95']:>11.1f}"
+          f" {len(baseline) / sum(baseline):>9.2f} {'-':>9}")
+
+    for name, cache_size in [("batched, no cache", 0), ("batched + phrase cache", None)]:
+        translator = Translator(args.model_dir, **({} if cache_size is None else {"cache_size": cache_size}))
+        firsts, totals = [], []
+        for text in commentary:
+            first, seconds = asyncio.run(fan_out(translator, text))
+            firsts.append(first)
+            totals.append(seconds)
+        first, total = percentiles(firsts, (50,)), percentiles(totals, (50, 95))
+        hit_rate = translator.cache.snapshot()["hit_rate"] if translator.cache else None
+        print(f"{name:<22} {first['p50']:>13.1f} {total['p50']:>11.1f} {total['p95']:>11.1f}"
+              f" {len(totals) / sum(totals):>9.2f} {f'{hit_rate:.1%}' if hit_rate is not None else '-':>9}")
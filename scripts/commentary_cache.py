@@ -0,0 +1,334 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+
+from inference import LATENCY_SAMPLES, percentiles
+from preprocess_live_playbyplay import team_name_map
+
+CACHE_SIZE = 10000  # Templates kept (LRU)
+CACHE_TTL = 3600  # Seconds a template stays valid; None keeps it until evicted
+
+# Slot names for players follow commentary_templates ([PLAYER], [SECOND_PLAYER], ...)
+PLAYER_SLOTS = ("[PLAYER]", "[SECOND_PLAYER]", "[THIRD_PLAYER]")
+TEAM_SLOTS = ("[TEAM]", "[SECOND_TEAM]")
+SLOT_PATTERN = re.compile(r"\[[A-Z_0-9]+\]")
+
+# Capitalized play-by-play words that are never names ("Layup", "Foul", ...).
+# Anything else that looks like a capitalized word is treated as a name.
+EVENT_VOCABULARY = {
+    "Alley", "Assist", "Attempt", "Away", "Back", "Backcourt", "Bad", "Ball", "Bank", "Bench", "Bounds", "Challenge",
+    "Charge", "Clear", "Clock", "Coach", "Cross", "Cutting", "Def", "Defense", "Defensive", "Delay", "Discontinue",
+    "Double", "Dribble", "Driving", "Dunk", "Ejection", "End", "Fadeaway", "Field", "Finger", "Flagrant",
+    "Floating", "Flopping", "Foul", "Free", "From", "Full", "Game", "Goal", "Goaltending", "Hanging", "Heave",
+    "Hook", "Hustle", "Illegal", "Inbound", "Instant", "Jam", "Jump", "Jumper", "Kicked", "Lane", "Layup", "Lost",
+    "Non-Unsportsmanlike", "Off", "Offensive", "Oop", "Other", "Out", "Palming", "Pass", "Path", "Period",
+    "Personal", "Play", "Pull-Up", "Pullup", "Putback", "Rebound", "Reg", "Regular", "Replay", "Reset", "Reverse",
+    "Rim", "Roll", "Running", "Sec", "Second", "Seconds", "Short", "Shot", "Start", "Step", "Take", "Taunting",
+    "Team", "Tech", "Technical", "Three", "Throw", "Timeout", "Tip", "Transition", "Traveling", "Turnaround",
+    "Turnover", "Violation",
+}
+NAME_SUFFIXES = ("Jr", "Sr")
+NUMBER_WORDS = {
+    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "first", "second", "third",
+    "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth", "once", "twice",
+}
+
+NAME_PART = re.compile(r"[A-Z][a-zß-ɏ'’-]*")
+ROMAN_SUFFIX = re.compile(r" (?:II|III|IV)\b")
+NUMBER_PATTERN = re.compile(r"(?<![\w.:])\d+(?![\w])|(?<=:)\d+(?![\w])")
+TEAM_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(name) for name in sorted(team_name_map.values(), key=len, reverse=True))
+    + r")\b|\b(?:" + "|".join(team_name_map) + r")\b", re.IGNORECASE)
+TEAM_NAMES = {name.lower(): name for name in team_name_map.values()}
+SENTENCE_START = re.compile(r"(?:^|[.!?]\s+)$")
+PLAYER_NEIGHBOUR = re.compile(r"[A-Z][\w.'’-]* \[(?:[A-Z]+_)?PLAYER|PLAYER(?:_\d+)?\] (?:[A-Z][a-z]|Jr|Sr|I[IV])")
+
+
+def name_spans(text):
+    """
+    Finds names as runs of capitalized word parts that are not event vocabulary.
+    Initials ("J. Tatum"), glued parts ("VanVleet", "LayupAdebayo") and suffixes ("Smith Jr.") are handled.
+    :return: List of (start, end) spans.
+    """
+    parts = []
+    for match in NAME_PART.finditer(text):
+        word, end = match.group(), match.end()
+        followed_by = text[end:end + 1]
+        if word.rstrip("'’-") in EVENT_VOCABULARY:
+            continue
+        is_initial = len(word) <= 3 and followed_by == "."
+        if len(word) == 1 and not is_initial:
+            continue  # One letter of an all-caps word like "MISS" or a code like "P1.T2"
+        parts.append((match.start(), end + 1 if is_initial or word in NAME_SUFFIXES and followed_by == "." else end,
+                      is_initial, word in NAME_SUFFIXES))
+
+    spans = []
+    for start, end, is_initial, is_suffix in parts:
+        if spans:
+            previous_start, previous_end, previous_initial = spans[-1]
+            gap = text[previous_end:start]
+            if gap in ("", "-") or previous_initial and gap in ("", " ") or is_suffix and gap == " ":
+                spans[-1] = (previous_start, end, is_initial)
+                continue
+        spans.append((start, end, is_initial))
+
+    result = []
+    for start, end, is_initial in spans:
+        if is_initial and end - start <= 4:
+            continue  # A lone initial such as the "S." in "S.FOUL"
+        suffix = ROMAN_SUFFIX.match(text, end)
+        result.append((start, suffix.end() if suffix else end))
+    return result
+
+
+def _slot(kind, index):
+    if kind == "player":
+        return PLAYER_SLOTS[index] if index < len(PLAYER_SLOTS) else f"[PLAYER_{index + 1}]"
+    if kind == "team":
+        return TEAM_SLOTS[index] if index < len(TEAM_SLOTS) else f"[TEAM_{index + 1}]"
+    return "[NUMBER]" if index == 0 else f"[NUMBER_{index + 1}]"
+
+
+def event_signature(event):
+    """
+    Canonicalizes an event by masking its player, team and number slots.
+    :return: (signature, slots) where slots maps slot token -> value from the event.
+    """
+    spans = [(m.start(), m.end(), "team") for m in TEAM_PATTERN.finditer(event)]
+    taken = [(start, end) for start, end, _ in spans]
+    spans += [(start, end, "player") for start, end in name_spans(event)
+              if not any(start < t_end and t_start < end for t_start, t_end in taken)]
+    spans += [(m.start(), m.end(), "number") for m in NUMBER_PATTERN.finditer(event)]
+    spans.sort()
+
+    slots, assigned, counts = {}, {}, {"player": 0, "team": 0, "number": 0}
+    signature, position = [], 0
+    for start, end, kind in spans:
+        if start < position:
+            continue
+        value = event[start:end]
+        if kind == "team":
+            value = TEAM_NAMES.get(value.lower(), value)
+        key = (kind, value.lower() if kind == "team" else value)
+        if key not in assigned:
+            assigned[key] = _slot(kind, counts[kind])
+            counts[kind] += 1
+            slots[assigned[key]] = value
+        signature.append(event[position:start])
+        signature.append(assigned[key])
+        position = end
+    signature.append(event[position:])
+    return "".join(signature), slots
+
+
+def surname(name):
+    """
+    "J. Tatum" -> "Tatum", "Smith Jr." -> "Smith": the form commentary usually uses.
+    """
+    words = [word for word in name.replace(".", ". ").split()
+             if word.rstrip(".") not in NAME_SUFFIXES + ("II", "III", "IV") and not word.endswith(".")]
+    return words[-1] if words else name
+
+
+def make_template(commentary, slots):
+    """
+    Masks the event's slot values in generated commentary.
+    :return: The template, or None when the commentary cannot be safely reused for other
+             values (it mentions names, teams or numbers that are not the event's slots).
+    """
+    aliases = {}
+    for slot, value in slots.items():
+        if slot in TEAM_SLOTS or slot.startswith("[TEAM"):
+            aliases[value.lower()] = slot
+        else:
+            aliases[value] = slot
+            if "PLAYER" in slot:
+                aliases.setdefault(surname(value), slot)
+
+    template = commentary
+    if aliases:
+        # Team names match in any case ("CLIPPERS" / "Clippers"), names and numbers exactly
+        alternatives = [f"(?i:{re.escape(value)})" if aliases[value].startswith(("[TEAM", "[SECOND_TEAM"))
+                        else re.escape(value) for value in sorted(aliases, key=len, reverse=True)]
+        pattern = re.compile(r"(?<![\w])(?:" + "|".join(alternatives) + r")(?![\w])")
+        template = pattern.sub(lambda m: aliases.get(m.group(), aliases.get(m.group().lower())), commentary)
+
+    if TEAM_PATTERN.search(template):
+        return None
+    if PLAYER_NEIGHBOUR.search(template):
+        return None  # "Jayson [PLAYER]" / "J. [PLAYER]" would pin the first name to this player
+    text = SLOT_PATTERN.sub("", template)
+    for start, end in name_spans(text):
+        if SENTENCE_START.search(text[:start]) is None:
+            return None
+    if any(slot.startswith("[NUMBER") for slot in slots):
+        if re.search(r"\d", text) or NUMBER_WORDS & set(re.findall(r"[a-z]+", text.lower())):
+            return None
+    return template
+
+
+def fill_template(template, slots):
+    return SLOT_PATTERN.sub(lambda m: slots.get(m.group(), m.group()), template)
+
+
+class CacheMetrics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0  # Misses that waited on an identical in-flight signature
+        self.uncacheable = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.hit_latency = deque(maxlen=LATENCY_SAMPLES)
+        self.miss_latency = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self, size):
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "size": size,
+            "lookups": lookups,
+            "hits": self.hits,
+            "shared": self.shared,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.shared) / lookups, 4) if lookups else None,
+            "uncacheable": self.uncacheable,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_latency_ms": percentiles(self.hit_latency),
+            "miss_latency_ms": percentiles(self.miss_latency),
+        }
+
+
+class CommentaryCache:
+    """
+    Bounded LRU/TTL cache of commentary templates keyed on event signatures.
+    A hit re-fills the cached template with the new event's players, teams and numbers,
+    so e.g. every "X REBOUND (Off:0 Def:1)" after the first skips the model.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.templates = OrderedDict()  # signature -> (template, stored_at)
+        self.in_flight = {}  # signature -> future, so concurrent misses generate once
+        self.metrics = CacheMetrics()
+
+    def get(self, event):
+        """
+        :return: (commentary or None, signature, slots)
+        """
+        signature, slots = event_signature(event)
+        entry = self.templates.get(signature)
+        if entry is not None:
+            template, stored_at = entry
+            if self.ttl is not None and self.clock() - stored_at > self.ttl:
+                del self.templates[signature]
+                self.metrics.expirations += 1
+            else:
+                self.templates.move_to_end(signature)
+                return fill_template(template, slots), signature, slots
+        return None, signature, slots
+
+    def put(self, signature, slots, commentary):
+        """
+        Stores generated commentary as a template.
+        :return: True when it was cacheable.
+        """
+        template = make_template(commentary, slots)
+        if template is None:
+            self.metrics.uncacheable += 1
+            return False
+        self.templates[signature] = (template, self.clock())
+        self.templates.move_to_end(signature)
+        while len(self.templates) > self.max_size:
+            self.templates.popitem(last=False)
+            self.metrics.evictions += 1
+        return True
+
+    def generate(self, events, generate_fn):
+        """
+        Batch version: serves hits from the cache and sends each distinct missing signature
+        to `generate_fn` (a list -> list function such as T5Generator.generate) once.
+        :return: List of commentary, in input order.
+        """
+        results, misses = [None] * len(events), {}
+        for i, event in enumerate(events):
+            start = time.perf_counter()
+            commentary, signature, slots = self.get(event)
+            if commentary is not None:
+                results[i] = commentary
+                self.metrics.hits += 1
+                self.metrics.hit_latency.append(time.perf_counter() - start)
+            else:
+                misses.setdefault(signature, []).append((i, slots))
+        if not misses:
+            return results
+
+        firsts = [waiting[0] for waiting in misses.values()]
+        self.metrics.misses += len(firsts)
+        generated = generate_fn([events[i] for i, _ in firsts])
+        uncached = []
+        for (signature, waiting), commentary in zip(misses.items(), generated):
+            results[waiting[0][0]] = commentary
+            if self.put(signature, waiting[0][1], commentary):
+                for i, slots in waiting[1:]:
+                    results[i] = fill_template(self.templates[signature][0], slots)
+                    self.metrics.shared += 1
+            else:
+                uncached += [i for i, _ in waiting[1:]]
+
+        # Commentary that could not become a template is generated per event
+        if uncached:
+            self.metrics.misses += len(uncached)
+            for i, commentary in zip(uncached, generate_fn([events[i] for i in uncached])):
+                results[i] = commentary
+        return results
+
+    async def submit(self, event, generate):
+        """
+        Async version for the server: a hit returns immediately, a miss awaits `generate(event)`
+        (e.g. MicroBatcher.submit) and concurrent misses with the same signature share one call.
+        """
+        start = time.perf_counter()
+        commentary, signature, slots = self.get(event)
+        if commentary is not None:
+            self.metrics.hits += 1
+            self.metrics.hit_latency.append(time.perf_counter() - start)
+            return commentary
+
+        pending = self.in_flight.get(signature)
+        if pending is not None:
+            try:
+                template = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                template = None
+            if template is not None:
+                self.metrics.shared += 1
+                return fill_template(template, slots)
+
+        self.metrics.misses += 1
+        pending = asyncio.get_running_loop().create_future()
+        self.in_flight.setdefault(signature, pending)
+        try:
+            commentary = await generate(event)
+        except Exception as e:
+            pending.set_exception(e)
+            pending.exception()  # Waiters re-raise it; avoid "never retrieved" warnings
+            raise
+        except BaseException:
+            pending.cancel()
+            raise
+        finally:
+            if self.in_flight.get(signature) is pending:
+                del self.in_flight[signature]
+        cached = self.put(signature, slots, commentary)
+        pending.set_result(self.templates[signature][0] if cached else None)
+        self.metrics.miss_latency.append(time.perf_counter() - start)
+        return commentary
+
+    def snapshot(self):
+        return self.metrics.snapshot(len(self.templates))
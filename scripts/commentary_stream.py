@@ -0,0 +1,276 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+
+from event_classifier import classify_any_event, render_commentary
+from game_state import GameStateTracker
+from inference import LATENCY_SAMPLES, percentiles
+from preprocess_live_playbyplay import preprocess_event
+
+SUBSCRIBER_BUFFER = 256  # Messages a client may fall behind before its oldest ones are dropped
+REFINE_DEADLINE = 2.0  # Seconds the model may take to replace template commentary
+STALE_EVENTS = 3  # Newer events in the same game after which a refinement is no longer shown
+
+
+def live_event_text(event):
+    """
+    Model input for one normalized live event, built like preprocessed_live_playbyplay.csv.
+    """
+    return preprocess_event({"description": event["description"], "teamTricode": event["team"]})
+
+
+def template_commentary(text, rng=random):
+    """
+    Rule-based commentary for one event, from the templates the training labels were generated with
+    (live feed descriptions get classify_live_event's rules).
+    """
+    return render_commentary(classify_any_event(text), rng)
+
+
+class TierMetrics:
+    """
+    Tiered generation counters. Every event gets template commentary; the model's version
+    replaces it when it is ready in time and the event is still current.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.refined = 0  # Model commentary published
+        self.late = 0  # Model missed the deadline; the template commentary stands
+        self.stale = 0  # Model was in time, but the action was edited or the game moved on
+        self.failed = 0
+        self.template_latency = deque(maxlen=LATENCY_SAMPLES)
+        self.model_latency = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self):
+        completed = self.refined + self.late + self.stale + self.failed
+        return {
+            "events": self.events,
+            "pending": self.events - completed,
+            "refined": self.refined,
+            "late": self.late,
+            "stale": self.stale,
+            "failed": self.failed,
+            "fallback_rate": round((completed - self.refined) / completed, 4) if completed else None,
+            "on_time_share": round((self.refined + self.stale) / completed, 4) if completed else None,
+            "template_ms": percentiles(self.template_latency),
+            "model_ms": percentiles(self.model_latency),
+        }
+
+
+class Subscription:
+    """
+    One client's bounded message buffer. A client that stops reading loses its
+    oldest messages instead of holding up the game; `seq` gaps show what was dropped.
+    """
+
+    def __init__(self, game_id, buffer_size=SUBSCRIBER_BUFFER):
+        self.game_id = game_id
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+
+    def offer(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class CommentaryStream:
+    """
+    Turns ingested events into commentary and fans it out to subscribers per game.
+    Each event is generated once, no matter how many clients watch the game, and
+    published in arrival order; generation itself runs concurrently so the model's
+    micro-batcher sees bursts as batches.
+
+    With a `draft_fn` the stream is tiered: the draft (template commentary) is published
+    as soon as the event arrives, and the model's commentary follows as a refinement of
+    that message when it is ready within `deadline` seconds and the event is not stale.
+    """
+
+    def __init__(self, commentary_fn, buffer_size=SUBSCRIBER_BUFFER, draft_fn=None, deadline=REFINE_DEADLINE,
+                 stale_events=STALE_EVENTS):
+        """
+        :param commentary_fn: Async function mapping model input text to commentary.
+        :param draft_fn: Function mapping model input text to instant commentary (e.g. template_commentary).
+        """
+        self.commentary_fn = commentary_fn
+        self.draft_fn = draft_fn
+        self.deadline = deadline
+        self.stale_events = stale_events
+        self.buffer_size = buffer_size
+        self.subscribers = defaultdict(set)
+        self.pending = {}  # gameId -> queue of (event, text, game state, generation task)
+        self.publishers = {}
+        self.sequence = defaultdict(int)
+        self.events = 0
+        self.failures = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.latency = deque(maxlen=LATENCY_SAMPLES)  # Ingest receipt -> fan-out
+        self.states = GameStateTracker()
+        self.tiers = TierMetrics()
+        self.drafted = defaultdict(int)  # gameId -> events drafted so far
+        self.versions = {}  # (gameId, actionNumber) -> draft number of its latest version
+        self.refinements = set()
+
+    def games(self):
+        """
+        :return: Set of game IDs that currently have subscribers.
+        """
+        return {game_id for game_id, subscribers in self.subscribers.items() if subscribers}
+
+    def subscribe(self, game_id):
+        subscription = Subscription(game_id, self.buffer_size)
+        self.subscribers[game_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.dropped += subscription.dropped
+        self.subscribers[subscription.game_id].discard(subscription)
+
+    def submit(self, event):
+        """
+        Starts generating commentary for one event; games nobody watches are skipped.
+        The game state is updated for every event, so it is current when someone subscribes.
+        """
+        game_id = event["gameId"]
+        self.states.update(event)
+        if not self.subscribers[game_id]:
+            return
+        self.events += 1
+        text = live_event_text(event)
+        state = self.states.snapshot(game_id, event)
+        if self.draft_fn is not None:
+            self._submit_tiered(event, text, state)
+            return
+        if game_id not in self.pending:
+            self.pending[game_id] = asyncio.Queue()
+            self.publishers[game_id] = asyncio.create_task(self._publish_game(game_id))
+        self.pending[game_id].put_nowait((event, text, state, asyncio.create_task(self.commentary_fn(text))))
+
+    async def _publish_game(self, game_id):
+        pending = self.pending[game_id]
+        while True:
+            event, text, state, task = await pending.get()
+            try:
+                commentary = await task
+            except Exception as e:
+                self.failures += 1
+                print(f"❌ Commentary failed for Game ID {game_id}, action {event['actionNumber']}: {e}")
+                continue
+            self._publish(event, text, commentary, state, "model")
+
+    def _publish(self, event, text, commentary, state, tier, refines=None):
+        """
+        Fans one message out to the game's subscribers.
+        :param refines: `seq` of the template message this model commentary replaces.
+        :return: The message's seq.
+        """
+        game_id = event["gameId"]
+        self.sequence[game_id] += 1
+        message = {
+            "gameId": game_id,
+            "seq": self.sequence[game_id],
+            "actionNumber": event["actionNumber"],
+            "period": event["period"],
+            "clock": event["clock"],
+            "event": text,
+            "commentary": commentary,
+            "tier": tier,
+            "state": state,
+            "is_edit": event["is_edit"],
+            "received_at": event["received_at"],
+            "published_at": time.time(),
+        }
+        if refines is None:
+            self.latency.append(message["published_at"] - event["received_at"])
+        else:
+            message["refines"] = refines
+        for subscription in list(self.subscribers[game_id]):
+            subscription.offer(message)
+            self.delivered += 1
+        return message["seq"]
+
+    def _submit_tiered(self, event, text, state):
+        start = time.perf_counter()
+        try:
+            draft = self.draft_fn(text)
+        except Exception as e:
+            self.failures += 1
+            print(f"❌ Template commentary failed for Game ID {event['gameId']}, "
+                  f"action {event['actionNumber']}: {e}")
+            return
+        self.tiers.template_latency.append(time.perf_counter() - start)
+        self.tiers.events += 1
+        seq = self._publish(event, text, draft, state, "template")
+
+        game_id = event["gameId"]
+        self.drafted[game_id] += 1
+        key = (game_id, event["actionNumber"])
+        self.versions[key] = self.drafted[game_id]
+        task = asyncio.create_task(self._refine(event, text, state, seq, key, self.drafted[game_id]))
+        self.refinements.add(task)
+        task.add_done_callback(self.refinements.discard)
+
+    async def _refine(self, event, text, state, seq, key, version):
+        """
+        Replaces a template message with the model's commentary, unless the model misses the
+        deadline (the request is cancelled, so a backed-up batcher skips it) or, by the time it
+        answers, the action was edited or the game has moved `stale_events` events on.
+        """
+        start = time.perf_counter()
+        try:
+            commentary = await asyncio.wait_for(self.commentary_fn(text), self.deadline)
+        except asyncio.TimeoutError:
+            self.tiers.late += 1
+            commentary = None
+        except Exception as e:
+            self.tiers.failed += 1
+            print(f"❌ Commentary failed for Game ID {key[0]}, action {key[1]}: {e}")
+            commentary = None
+        current = self.versions.get(key) == version
+        if current:
+            del self.versions[key]
+        if commentary is None:
+            return
+        self.tiers.model_latency.append(time.perf_counter() - start)
+        if not current or self.drafted[key[0]] - version > self.stale_events:
+            self.tiers.stale += 1
+            return
+        self.tiers.refined += 1
+        self._publish(event, text, commentary, state, "model", refines=seq)
+
+    async def consume(self, source):
+        """
+        Feeds every event of an async event source (e.g. AsyncLiveIngest.events()) into the stream.
+        """
+        async for event in source:
+            self.submit(event)
+
+    async def stop(self):
+        tasks = list(self.publishers.values()) + list(self.refinements)
+        for pending in self.pending.values():
+            while not pending.empty():
+                tasks.append(pending.get_nowait()[3])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.pending.clear()
+        self.publishers.clear()
+
+    def snapshot(self):
+        return {
+            "games": len(self.games()),
+            "subscribers": sum(len(subscribers) for subscribers in self.subscribers.values()),
+            "events": self.events,
+            "failures": self.failures,
+            "delivered": self.delivered,
+            "dropped": self.dropped + sum(s.dropped for subs in self.subscribers.values() for s in subs),
+            "ingest_to_publish_ms": percentiles(self.latency),
+            "tiers": self.tiers.snapshot() if self.draft_fn is not None else None,
+        }
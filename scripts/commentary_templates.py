@@ -0,0 +1,99 @@
+# Expanded AI-generated responses
+commentary_templates = {
+    "3PT Jump Shot": [
+        "[PLAYER] drills a deep three!", 
+        "[PLAYER] connects from downtown!", 
+        "[PLAYER] splashes a long-range shot!",
+        "[PLAYER] drills a deep three!", 
+        "[PLAYER] connects from way downtown!", 
+        "[PLAYER] buries a long-range shot!", 
+        "[PLAYER] lets it fly... and hits!"
+    ],
+    "Jump Shot": [
+        "[PLAYER] pulls up and nails the jumper!", 
+        "[PLAYER] sinks a mid-range shot!", 
+        "[PLAYER] buries the jump shot!",
+        "[PLAYER] pulls up and knocks it down!", 
+        "[PLAYER] nails the mid-range jumper!", 
+        "[PLAYER] rises up and buries it!"
+    ],
+    "Dunk": [
+        "[PLAYER] slams it home!", 
+        "[PLAYER] throws it down!", 
+        "[PLAYER] hammers it in!"
+    ],
+    "Layup": [
+        "[PLAYER] drives inside and lays it in!", 
+        "[PLAYER] finishes strong at the rim!", 
+        "[PLAYER] gets the bucket in traffic!",
+        "[PLAYER] drives inside and lays it in!", 
+        "[PLAYER] attacks the rim for two!", 
+        "[PLAYER] glides in for the score!"
+    ],
+    "Rebound": [
+        "[PLAYER] secures the board.", 
+        "[PLAYER] snatches the ball off the glass.", 
+        "[PLAYER] comes down with the rebound."
+    ],
+    "Steal": [
+        "[PLAYER] steals the ball from [SECOND_PLAYER]!", 
+        "[PLAYER] picks [SECOND_PLAYER]'s pocket!", 
+        "[PLAYER] swipes it away from [SECOND_PLAYER]!"
+    ],
+    "Foul": [
+        "[PLAYER] is charged with a foul.", 
+        "[PLAYER] was assessed a foul."
+    ],
+    "Technical Foul": [
+        "Technical foul assessed to [PLAYER].", 
+        "[PLAYER] hit with a technical foul.", 
+        "[PLAYER] T'd up by the ref!"
+    ],
+    "Turnover": [
+        "[PLAYER] loses the ball.", 
+        "[PLAYER] turns it over.", 
+        "[PLAYER] coughs it up."
+    ],
+    "Block": [
+        "[PLAYER] swats [SECOND_PLAYER]'s shot away!", 
+        "[PLAYER] denies [SECOND_PLAYER] at the rim!", 
+        "[PLAYER] sends [SECOND_PLAYER]'s shot packing!"
+    ],
+    "Substitution": [
+        "[PLAYER] comes in for [SECOND_PLAYER].", 
+        "[PLAYER] checks in for [SECOND_PLAYER].", 
+        "[PLAYER] enters the game for [SECOND_PLAYER]."
+    ],
+        "Free Throw": [
+        "Free throws for [PLAYER]."
+    ],
+    "Missed Free Throw": [
+        "[PLAYER] misses the free throw after the technical foul."
+    ],
+    "Timeout": [
+        "[PLAYER] calls a timeout.", 
+        "Timeout [PLAYER]."
+    ],
+    "Ejection": [
+        "[PLAYER] has been ejected from the game."
+    ],
+    "Jump Ball": [
+        "There's a jump ball between [PLAYER] and [SECOND_PLAYER], and it's tipped to [THIRD_PLAYER]."
+    ]
+}
+
+# Missed shot responses
+missed_shot_templates = {
+    "3PT Jump Shot": [
+        "[PLAYER] fires from deep but can't connect.", 
+        "[PLAYER] launches a three but misses."
+    ],
+    "Jump Shot": [
+        "[PLAYER] takes a jumper but can't get it to fall.", 
+        "[PLAYER] pulls up but it's off the mark."
+    ],
+    "Layup": [
+        "[PLAYER] drives inside but the layup won’t fall.", 
+        "[PLAYER] attacks the basket but can't finish."
+    ]
+}
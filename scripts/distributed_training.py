@@ -0,0 +1,126 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import torch
+import torch.distributed as dist
+
+GLOBAL_BATCH_SIZE = 8  # Examples per optimizer step, whatever the number of workers
+MAX_DEVICE_BATCH_SIZE = 8  # Largest per-worker micro-batch; beyond it gradients are accumulated
+INTEROP_THREADS = 1  # Each worker runs one model, so inter-op parallelism only adds contention
+
+
+def world_size():
+    return int(os.environ.get("WORLD_SIZE", 1))
+
+
+def is_main_process():
+    return int(os.environ.get("RANK", 0)) == 0
+
+
+def worker_threads(workers, cores=None):
+    """
+    Intra-op threads per worker: the machine's cores split evenly, so workers never oversubscribe.
+    """
+    return max(1, (cores or os.cpu_count()) // workers)
+
+
+def setup_worker():
+    """
+    Call at the top of a training script, before any tensor work. Sets this process's thread
+    counts and, when started by launch(), joins the gloo process group so Trainer runs DDP.
+    """
+    workers = int(os.environ.get("LOCAL_WORLD_SIZE", world_size()))
+    torch.set_num_threads(int(os.environ.get("OMP_NUM_THREADS", worker_threads(workers))))
+    torch.set_num_interop_threads(INTEROP_THREADS)
+    if world_size() > 1 and not dist.is_initialized():
+        dist.init_process_group("gloo")
+
+
+@contextmanager
+def main_process_first():
+    """
+    Runs the block on rank 0 first and on the other ranks after it, e.g. so only one worker
+    tokenizes and writes the tokenized cache while the others then memory-map it.
+    """
+    if not dist.is_initialized():
+        yield
+        return
+    if not is_main_process():
+        dist.barrier()
+    yield
+    if is_main_process():
+        dist.barrier()
+
+
+def batch_arguments(global_batch_size=GLOBAL_BATCH_SIZE, max_device_batch_size=MAX_DEVICE_BATCH_SIZE):
+    """
+    TrainingArguments for this process that keep `global_batch_size` examples per optimizer
+    step: the batch is split across workers, and micro-batches above max_device_batch_size
+    become gradient accumulation steps.
+    """
+    workers = world_size()
+    if global_batch_size % workers:
+        raise ValueError(f"Global batch size {global_batch_size} is not divisible by {workers} workers")
+    per_worker = global_batch_size // workers
+    per_device = min(per_worker, max_device_batch_size)
+    while per_worker % per_device:
+        per_device -= 1
+    arguments = {"per_device_train_batch_size": per_device, "gradient_accumulation_steps": per_worker // per_device}
+    if workers > 1:
+        arguments.update(ddp_backend="gloo", ddp_find_unused_parameters=False)
+    return arguments
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def launch(command, workers, threads=None):
+    """
+    Starts `workers` local copies of `command` (an argv list) as one gloo process group,
+    with `threads` intra-op threads each (default: cores split evenly). If one worker fails
+    the others are stopped.
+    :return: The first non-zero exit code, or 0.
+    """
+    threads = threads or worker_threads(workers)
+    port = str(free_port())
+    processes = []
+    for rank in range(workers):
+        env = dict(os.environ, MASTER_ADDR="127.0.0.1", MASTER_PORT=port, RANK=str(rank), LOCAL_RANK=str(rank),
+                   WORLD_SIZE=str(workers), LOCAL_WORLD_SIZE=str(workers), OMP_NUM_THREADS=str(threads),
+                   MKL_NUM_THREADS=str(threads))
+        processes.append(subprocess.Popen(command, env=env))
+
+    while True:
+        codes = [process.poll() for process in processes]
+        failed = [code for code in codes if code]
+        if failed:
+            for process in processes:
+                if process.poll() is None:
+                    process.terminate()
+            for process in processes:
+                process.wait()
+            return failed[0]
+        if all(code == 0 for code in codes):
+            return 0
+        time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a training script as CPU DistributedDataParallel workers.",
+                                     usage="%(prog)s [--workers N] [--threads T] script.py [script args]")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, help="Intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("script")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    print(f"🚀 {args.workers} workers x {args.threads or worker_threads(args.workers)} threads: {args.script}")
+    sys.exit(launch([sys.executable, args.script, *args.script_args], args.workers, args.threads))
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import re
+import time
+import unicodedata
+
+import pandas as pd
+
+from preprocess_playbyplay import file_hash
+
+# Single-byte codecs that UTF-8 text gets mistakenly decoded with (Excel on Mac / Windows), in the order tried
+MOJIBAKE_CODECS = ("mac_roman", "cp1252")
+MAX_ROUNDS = 3  # Text re-saved several times is encoded more than once
+CLEAN_FLAG_SUFFIX = ".clean.json"
+
+
+def _decoded(codec, byte_values):
+    chars = set()
+    for value in byte_values:
+        try:
+            chars.add(bytes([value]).decode(codec))
+        except UnicodeDecodeError:
+            pass
+    return chars
+
+
+def _char_class(chars):
+    return "[" + "".join(re.escape(c) for c in sorted(chars)) + "]"
+
+
+# What UTF-8 lead bytes (0xC2-0xF4) and continuation bytes (0x80-0xBF) look like in each codec.
+# A lead character followed by a continuation character is the signature of double encoding.
+_LEADS = {codec: _decoded(codec, range(0xC2, 0xF5)) for codec in MOJIBAKE_CODECS}
+_CONTINUATIONS = {codec: _decoded(codec, range(0x80, 0xC0)) for codec in MOJIBAKE_CODECS}
+SUSPECT_PATTERN = re.compile("|".join(_char_class(_LEADS[codec]) + _char_class(_CONTINUATIONS[codec])
+                                      for codec in MOJIBAKE_CODECS))
+# Maximal runs of non-ASCII characters either codec can produce; each run is re-decoded as a unit
+RUN_PATTERN = re.compile(_char_class(set().union(*(_decoded(codec, range(0x80, 0x100))
+                                                   for codec in MOJIBAKE_CODECS))) + "+")
+IMPLAUSIBLE_CATEGORIES = {"Mn", "Me", "Co", "Cn", "Cc"}  # Combining marks, private use, unassigned, controls
+
+
+def _repair_run(match):
+    run = match.group()
+    for codec in MOJIBAKE_CODECS:
+        try:
+            fixed = run.encode(codec).decode("utf-8")
+        except UnicodeError:
+            continue
+        # Both codecs can turn "Ã©" into valid UTF-8; only one gives text rather than a stray combining mark
+        if len(fixed) < len(run) and not any(unicodedata.category(c) in IMPLAUSIBLE_CATEGORIES for c in fixed):
+            return fixed
+    return run
+
+
+def repair_text(text):
+    """
+    Reverses UTF-8 text that was decoded as MacRoman or cp1252 ("‚Äôs" -> "’s", "Jokiƒá" -> "Jokić",
+    "Ã©" -> "é"). Runs of non-ASCII characters are re-encoded with the wrong codec and decoded as
+    UTF-8; a run is only replaced when that gives plausible text, so correct accented text is left alone.
+    """
+    if not isinstance(text, str):
+        return text
+    for _ in range(MAX_ROUNDS):
+        if not SUSPECT_PATTERN.search(text):
+            break
+        repaired = RUN_PATTERN.sub(_repair_run, text)
+        if repaired == text:
+            break
+        text = repaired
+    return unicodedata.normalize("NFC", text)
+
+
+def repair_column(series):
+    """
+    One pass over a whole column: a vectorized regex scan finds the cells that can hold
+    mojibake, and only their distinct values are repaired.
+    :return: (repaired series, number of cells changed)
+    """
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return series, 0
+    suspect = series.str.contains(SUSPECT_PATTERN, na=False)
+    if not suspect.any():
+        return series, 0
+    repairs = {value: repair_text(value) for value in series[suspect].unique()}
+    fixed = series[suspect].map(repairs)
+    changed = int((fixed != series[suspect]).sum())
+    return series.mask(suspect, fixed), changed
+
+
+def repair_frame(df, columns=None):
+    """
+    :return: (repaired copy of df, dict column -> cells changed)
+    """
+    df = df.copy()
+    changed = {}
+    for column in columns or df.columns:
+        df[column], changed[column] = repair_column(df[column])
+    return df, changed
+
+
+def read_csv_text(path, **kwargs):
+    """
+    Reads a CSV as UTF-8 (with or without BOM); a file that is not valid UTF-8 was saved in a
+    single-byte codec (the labeling exports are MacRoman) and is decoded as MacRoman, which maps
+    every byte, so no character is replaced or dropped.
+    """
+    try:
+        return pd.read_csv(path, encoding="utf-8-sig", **kwargs)
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding=MOJIBAKE_CODECS[0], **kwargs)
+
+
+def clean_flag_path(path):
+    return path + CLEAN_FLAG_SUFFIX
+
+
+def is_clean(path):
+    """
+    True when `path` was written by write_clean_csv/repair_csv and has not changed since.
+    """
+    flag = clean_flag_path(path)
+    if not os.path.exists(flag):
+        return False
+    with open(flag) as f:
+        return json.load(f).get("sha1") == file_hash(path)
+
+
+def write_clean_csv(df, path, changed=None):
+    """
+    Writes a repaired frame as UTF-8 and records the file's hash as its clean flag.
+    """
+    df.to_csv(path, index=False, encoding="utf-8")
+    with open(clean_flag_path(path), "w") as f:
+        json.dump({"sha1": file_hash(path), "repaired_cells": changed or {}}, f, indent=2)
+
+
+def repair_csv(path, output=None):
+    """
+    Ingest step: repairs every text column of a CSV once and flags the result as clean.
+    :return: Dict column -> cells changed.
+    """
+    df, changed = repair_frame(read_csv_text(path))
+    write_clean_csv(df, output or path, changed)
+    return changed
+
+
+def read_clean_csv(path):
+    """
+    Reads a labeled CSV for merging. Files flagged clean are read as-is; others are repaired
+    in memory (run repair_csv at ingest so this happens only once).
+    """
+    if is_clean(path):
+        return pd.read_csv(path, encoding="utf-8")
+    df, changed = repair_frame(read_csv_text(path))
+    if any(changed.values()):
+        print(f"🔧 Repaired {sum(changed.values()):,} double-encoded cells in {path}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair double-encoded UTF-8 in CSVs in place and flag them clean.")
+    parser.add_argument("files", nargs="+")
+    args = parser.parse_args()
+
+    for path in args.files:
+        if is_clean(path):
+            print(f"♻️ {path} is already clean.")
+            continue
+        start = time.perf_counter()
+        changed = repair_csv(path)
+        print(f"✅ {path}: {sum(changed.values()):,} cells repaired in {time.perf_counter() - start:.2f}s "
+              f"({', '.join(f'{column} {count}' for column, count in changed.items() if count) or 'none needed'})")
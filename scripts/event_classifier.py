@@ -0,0 +1,241 @@
+import random
+import re
+from collections import namedtuple
+
+from commentary_templates import commentary_templates, missed_shot_templates
+
+# Slots filled in template order
+SLOTS = ("[PLAYER]", "[SECOND_PLAYER]", "[THIRD_PLAYER]")
+TEMPLATE_SETS = {"commentary": commentary_templates, "missed": missed_shot_templates}
+
+# Patterns are compiled once for the whole corpus
+STAT_PATTERN = re.compile(r"\([\d\w\s]+\)")
+JUMP_BALL_PATTERN = re.compile(r"Jump Ball (\w+) vs. (\w+): Tip to (\w+)")
+SUBSTITUTION_PATTERN = re.compile(r"SUB:\s*(\w+)\s*FOR\s*(\w+)")
+ASSIST_PATTERN = re.compile(r"\(([^)]+) AST\)")
+PARENS_PATTERN = re.compile(r"\(.*?\)")
+
+# Live feed descriptions ("MISS J. McDaniels 13' turnaround fadeaway Shot"), after preprocess_event
+# has prefixed the tricode ("ORL: ") and written out "TEAM" and tricodes as team names
+LIVE_NAME = r"[A-Z][\w.'’-]*(?: [A-Z][\w.'’-]*)*"
+LIVE_PREFIX_PATTERN = re.compile(r"^(?:[A-Z]{2,3}|nan): ")  # No tricode (period and game events) reads "nan"
+LIVE_SHOT_PATTERN = re.compile(rf"^(MISS )?({LIVE_NAME}) (?:\d+' )?(?:.*? )?(3PT|Jump Shot|Shot|Layup|DUNK|Hook)\b")
+LIVE_FREE_THROW_PATTERN = re.compile(rf"^(MISS )?({LIVE_NAME}) Free Throw (\d) of (\d)")
+LIVE_ACTION_PATTERN = re.compile(rf"^({LIVE_NAME}) (?:(.+?) )?(REBOUND|STEAL|BLOCK|FOUL|TURNOVER|VIOLATION)\b")
+LIVE_SUBSTITUTION_PATTERN = re.compile(rf"^SUB (in|out): ({LIVE_NAME})")
+LIVE_JUMP_BALL_PATTERN = re.compile(rf"^Jump Ball ({LIVE_NAME}) vs\. ({LIVE_NAME}): Tip to ({LIVE_NAME})")
+LIVE_TIMEOUT_PATTERN = re.compile(rf"^({LIVE_NAME}) Timeout")
+LIVE_FIXED_TEXTS = {"Period Start": "The period is underway.", "Period End": "That's the end of the period.",
+                    "Game End": "That's the final buzzer!"}
+LIVE_ASSIST_PATTERN = re.compile(rf"\(({LIVE_NAME}) \d+ AST\)")
+INITIAL_PATTERN = re.compile(r"^[A-Z]\. ")
+# Live shot words -> template key; missed dunks have no template of their own
+LIVE_SHOT_KEYS = {"3PT": "3PT Jump Shot", "Layup": "Layup", "DUNK": "Dunk"}
+LIVE_MISSED_SHOT_KEYS = {"3PT": "3PT Jump Shot", "Layup": "Layup", "DUNK": "Layup"}
+
+NAME_SUFFIXES = {"Jr.", "Sr.", "III"}
+SHOT_WORDS = ("shot", "fadeaway", "hook", "floating", "floater")
+
+# Typed event record produced by the classifier.
+# `template_set`/`template_key`/`slots` say how to render it; `text` holds fixed commentary.
+EventRecord = namedtuple("EventRecord", [
+    "event_type", "missed", "players", "assist", "template_set", "template_key", "slots", "text"
+])
+
+
+def extract_players(event):
+    """
+    Picks capitalized words (minus name suffixes) out of an event, ignoring stat parentheses.
+    :return: (player, second player or None, third player or None)
+    """
+    players = [word for word in STAT_PATTERN.sub("", event).split()
+               if word.istitle() and word not in NAME_SUFFIXES]
+
+    if not players:
+        return "A player", None, None
+    players += [None, None]
+    return players[0], players[1], players[2]
+
+
+def _type_name(template_key):
+    return template_key.lower().replace(" ", "_")
+
+
+def classify_event(event):
+    """
+    Maps one preprocessed event description to an EventRecord.
+    Branches are checked in the same order as the original generate_training_data.py chain.
+    """
+    lower = event.lower()
+    missed = "miss" in lower
+    player, second, third = extract_players(event)
+    players = (player, second, third)
+
+    assist_match = ASSIST_PATTERN.search(event)
+    assist = assist_match.group(1).split()[0] if assist_match else None
+
+    def template(event_type, key, slots, template_set="commentary", record_players=players):
+        return EventRecord(event_type, missed, record_players, assist, template_set, key, slots, None)
+
+    def fixed(event_type, text):
+        return EventRecord(event_type, missed, players, assist, None, None, (), text)
+
+    if "BLOCK" in event and second:
+        return template("block", "Block", (player, second))
+    if "STEAL" in event and second:
+        return template("steal", "Steal", (player, second))
+    if "T.FOUL" in event:
+        return template("technical_foul", "Technical Foul", (player,))
+    if ".FOUL" in event:
+        return template("foul", "Foul", (player,))
+    if "offensive foul" in lower:
+        return fixed("offensive_foul", f"{player} commits an offensive foul.")
+    if "Jump Ball" in event and "vs." in event and "Tip to" in event:
+        match = JUMP_BALL_PATTERN.search(event)
+        if match:
+            return template("jump_ball", "Jump Ball", match.groups(), record_players=match.groups())
+        return fixed("jump_ball", "Jump ball in play.")
+    if "Free Throw" in event:
+        return template("free_throw", "Free Throw", (player,))
+    if "MISS" in event and "Free Technical" in event:
+        return fixed("technical_free_throw", f"{player} misses the free throw after the technical foul.")
+    if "MAKE" in event and "Free Technical" in event:
+        return fixed("technical_free_throw", f"{player} makes the free throw after the technical foul.")
+    if "Timeout" in event:
+        return template("timeout", "Timeout", (player,))
+    if "Ejection" in event:
+        return template("ejection", "Ejection", (player,))
+    if "SUB:" in event and "FOR" in event:
+        match = SUBSTITUTION_PATTERN.search(event)
+        if match:
+            return template("substitution", "Substitution", match.groups(), record_players=match.groups() + (None,))
+        return fixed("substitution", f"{player} checks into the game.")
+
+    # First template key (in dict order) that appears in the event
+    template_set = "missed" if missed else "commentary"
+    for key in TEMPLATE_SETS[template_set]:
+        if key in event:
+            return template(_type_name(key), key, (player,), template_set)
+
+    if any(shot_type in lower for shot_type in SHOT_WORDS):
+        return template("jump_shot", "Jump Shot", (player,))
+    if "rebound" in lower:
+        return fixed("rebound", f"{player} secures the rebound.")
+    if "Turnover" in event:
+        return fixed("turnover", f"{player} turns the ball over.")
+    if "Foul" in event:
+        return fixed("foul", f"{player} is charged with a foul.")
+
+    # Preserve original event text without parentheses
+    return fixed("other", PARENS_PATTERN.sub("", event).strip())
+
+
+def _live_name(name):
+    """
+    "J. McDaniels" -> "McDaniels", the surname-only form the V2 descriptions (and so the training labels) use.
+    """
+    return INITIAL_PATTERN.sub("", name)
+
+
+def classify_live_event(event):
+    """
+    Maps one live feed description (as preprocess_event writes it) to an EventRecord. The V2
+    rules in classify_event misread it: names are "J. McDaniels" rather than "McDaniels", and
+    shot words such as "fadeaway" or "DUNK" have no missed template, so misses rendered as makes.
+    Missed shots here always use the missed templates.
+    :return: EventRecord, or None when `event` is not in the live format.
+    """
+    event = LIVE_PREFIX_PATTERN.sub("", event, count=1)
+
+    def record(event_type, missed, players, key=None, slots=(), text=None, assist=None, template_set="commentary"):
+        players = tuple(players) + (None,) * (3 - len(players))
+        if key is None:
+            return EventRecord(event_type, missed, players, assist, None, None, (), text)
+        return EventRecord(event_type, missed, players, assist, template_set, key, slots, None)
+
+    match = LIVE_FREE_THROW_PATTERN.match(event)
+    if match:
+        player = _live_name(match.group(2))
+        if match.group(1):
+            return record("free_throw", True, (player,), text=f"{player} misses the free throw.")
+        return record("free_throw", False, (player,), "Free Throw", (player,))
+
+    match = LIVE_SHOT_PATTERN.match(event)
+    if match:
+        missed, player, shot = bool(match.group(1)), _live_name(match.group(2)), match.group(3)
+        assist = LIVE_ASSIST_PATTERN.search(event)
+        assist = _live_name(assist.group(1)) if assist and not missed else None
+        key = (LIVE_MISSED_SHOT_KEYS if missed else LIVE_SHOT_KEYS).get(shot, "Jump Shot")
+        return record(_type_name(key), missed, (player,), key, (player,), assist=assist,
+                      template_set="missed" if missed else "commentary")
+
+    match = LIVE_ACTION_PATTERN.match(event)
+    if match:
+        player, detail, action = _live_name(match.group(1)), match.group(2) or "", match.group(3)
+        if action == "REBOUND":
+            return record("rebound", False, (player,), "Rebound", (player,))
+        if action == "STEAL":
+            return record("steal", False, (player,), text=f"{player} comes up with the steal!")
+        if action == "BLOCK":
+            return record("block", False, (player,), text=f"{player} blocks the shot!")
+        if action == "FOUL" and detail.startswith("technical"):
+            return record("technical_foul", False, (player,), "Technical Foul", (player,))
+        if action == "FOUL" and detail.startswith("offensive"):
+            return record("offensive_foul", False, (player,), text=f"{player} commits an offensive foul.")
+        if action == "FOUL":
+            return record("foul", False, (player,), "Foul", (player,))
+        if action == "TURNOVER":
+            return record("turnover", False, (player,), "Turnover", (player,))
+        violation = detail.replace("-", " ")
+        return record("violation", False, (player,), text=f"{player} is called for a {violation} violation.")
+
+    match = LIVE_SUBSTITUTION_PATTERN.match(event)
+    if match:
+        player = _live_name(match.group(2))
+        text = f"{player} checks into the game." if match.group(1) == "in" else f"{player} heads to the bench."
+        return record("substitution", False, (player,), text=text)
+
+    match = LIVE_JUMP_BALL_PATTERN.match(event)
+    if match:
+        players = tuple(_live_name(name) for name in match.groups())
+        return record("jump_ball", False, players, "Jump Ball", players)
+
+    match = LIVE_TIMEOUT_PATTERN.match(event)
+    if match:
+        return record("timeout", False, (match.group(1),), "Timeout", (match.group(1),))
+    if event in LIVE_FIXED_TEXTS:
+        return record(_type_name(event), False, (), text=LIVE_FIXED_TEXTS[event])
+    return None
+
+
+def classify_any_event(event):
+    """
+    Live feed rules first, then the V2 rules (model inputs can be in either format).
+    """
+    return classify_live_event(event) or classify_event(event)
+
+
+def classify_events(events):
+    """
+    Classifies a whole column of event descriptions in one pass.
+    :param events: Iterable (e.g. a DataFrame column) of event descriptions.
+    :return: List of EventRecord, one per event.
+    """
+    return [classify_event(event) for event in events]
+
+
+def render_commentary(record, rng=random):
+    """
+    Turns an EventRecord into commentary text: a template pick plus slot fill.
+    :param rng: Random source (the `random` module or a random.Random instance).
+    """
+    if record.template_key is None:
+        commentary = record.text
+    else:
+        commentary = rng.choice(TEMPLATE_SETS[record.template_set][record.template_key])
+        for slot, value in zip(SLOTS, record.slots):
+            commentary = commentary.replace(slot, value)
+
+    if record.assist:
+        commentary += f" {record.assist} assists."
+    return commentary
@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from event_classifier import classify_events
+from preprocess_playbyplay import MANIFEST_FILE, OUTPUT_FILE, file_hash
+
+INDEX_DIR = "data/event_index"
+INDEX_FORMAT = 2  # Bump when what gets indexed changes
+TEXT_COLUMNS = ("event_description", "structured_event")  # V2 and live preprocessed corpora
+
+# Rare/difficult events the labeling extracts look for; terms outside this list are added on first use
+KEYWORDS = [
+    "alley oop", "backcourt", "delay of game", "discontinue", "double dribble", "flagrant", "goaltending",
+    "jump ball", "kicked ball", "lane violation", "loose ball", "loose ball foul", "period end", "period start",
+    "shot clock", "take foul", "team", "technical", "traveling",
+]
+
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_keyword(keyword):
+    """
+    "Alley-Oop" -> "alley oop": lower case, words separated by single spaces.
+    """
+    return NON_WORD.sub(" ", keyword.lower()).strip()
+
+
+def normalize_column(texts):
+    return " " + texts.fillna("").astype(str).str.lower().str.replace(NON_WORD, " ", regex=True) + " "
+
+
+def keyword_postings(texts, keywords):
+    """
+    Finds every keyword in a text column with one regex scan. A keyword's last word matches as a
+    word prefix ("discontinue" finds "discontinued dribble"). The pattern is a lookahead at each
+    word start, so overlapping keywords ("loose ball", "ball foul") are all seen; at one position
+    only the longest alternative matches, so a keyword contained in a longer one ("loose ball" in
+    "loose ball foul") also inherits the longer one's rows.
+    :return: Dict keyword -> sorted int64 array of positions in `texts`.
+    """
+    keywords = sorted(set(keywords), key=len, reverse=True)
+    postings = {keyword: np.array([], dtype=np.int64) for keyword in keywords}
+    if not keywords or texts.empty:
+        return postings
+    pattern = r"(?= (" + "|".join(re.escape(keyword) for keyword in keywords) + r")[a-z0-9]* )"
+    found = normalize_column(texts).reset_index(drop=True).str.findall(pattern).explode().dropna()
+    for keyword, rows in found.groupby(found).groups.items():
+        postings[keyword] = np.unique(rows.to_numpy(dtype=np.int64))
+    for keyword in keywords:
+        for longer in keywords:
+            if len(longer) > len(keyword) and re.search(rf" {re.escape(keyword)}[a-z0-9]* ", f" {longer} "):
+                postings[keyword] = np.union1d(postings[keyword], postings[longer])
+    return postings
+
+
+def type_postings(texts):
+    """
+    :return: Dict event type (event_classifier's, e.g. "block", "jump_ball") -> sorted row positions.
+    """
+    types = pd.Series([record.event_type for record in classify_events(texts.fillna("").astype(str))])
+    return {event_type: rows.to_numpy(dtype=np.int64) for event_type, rows in types.groupby(types).groups.items()}
+
+
+def corpus_segments(source_file, manifest_file):
+    """
+    Splits the corpus into segments that change independently: one per game file when the
+    source has a preprocess manifest, otherwise the whole file.
+    :return: List of {"name", "sha1", "rows"} in row order; rows is None when only known after reading.
+    """
+    if manifest_file and os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        if manifest.get("output_file") == source_file:
+            return [{"name": name, "sha1": entry["sha1"], "rows": entry["rows"]}
+                    for name, entry in manifest["files"].items()]
+    return [{"name": os.path.basename(source_file), "sha1": file_hash(source_file), "rows": None}]
+
+
+class EventIndex:
+    """
+    Inverted index from "keyword:<keyword>" and "type:<event type>" terms to row positions in
+    a preprocessed corpus CSV. Postings are stored per segment (game file), so new or changed
+    games are indexed without touching the rest; extraction is then set operations on sorted
+    row arrays instead of regex scans of the whole corpus.
+    """
+
+    def __init__(self, source_file, segments, postings, keywords):
+        self.source_file = source_file
+        self.segments = segments
+        self.postings = postings  # segment name -> {term: local row positions}
+        self.keywords = set(keywords)
+        self.offsets = dict(zip([segment["name"] for segment in segments],
+                                np.cumsum([0] + [segment["rows"] for segment in segments[:-1]]).tolist()))
+        self._rows = {}
+
+    def __len__(self):
+        return sum(segment["rows"] for segment in self.segments)
+
+    def terms(self):
+        return sorted({term for postings in self.postings.values() for term in postings})
+
+    def rows(self, term):
+        """
+        :param term: "keyword:<keyword>", "type:<event type>", or a bare keyword.
+        :return: Sorted global row positions containing the term.
+        """
+        if ":" not in term:
+            term = f"keyword:{normalize_keyword(term)}"
+        if term not in self._rows:
+            if term.startswith("keyword:") and term[len("keyword:"):] not in self.keywords:
+                raise KeyError(f"{term!r} is not indexed; pass it to update_index(keywords=...) first")
+            parts = [postings[term] + self.offsets[name] for name, postings in self.postings.items()
+                     if term in postings]
+            self._rows[term] = np.sort(np.concatenate(parts)) if parts else np.array([], dtype=np.int64)
+        return self._rows[term]
+
+    def any_of(self, terms):
+        rows = [self.rows(term) for term in terms]
+        return np.unique(np.concatenate(rows)) if rows else np.array([], dtype=np.int64)
+
+    def all_of(self, terms):
+        rows = None
+        for term in terms:
+            rows = self.rows(term) if rows is None else np.intersect1d(rows, self.rows(term), assume_unique=True)
+        return np.array([], dtype=np.int64) if rows is None else rows
+
+    def excluding(self, rows, terms):
+        return np.setdiff1d(rows, self.any_of(terms), assume_unique=True)
+
+    def stratified_sample(self, terms, total, seed=42):
+        """
+        Up to `total` distinct rows spread evenly over `terms`: each round takes one unused row
+        per term that still has any, so rare event types are not crowded out by common ones.
+        :return: Row positions, in sampling order.
+        """
+        rng = np.random.default_rng(seed)
+        pools = [list(rng.permutation(self.rows(term))) for term in terms]
+        chosen, seen = [], set()
+        while len(chosen) < total and any(pools):
+            for pool in pools:
+                while pool and pool[-1] in seen:
+                    pool.pop()
+                if pool and len(chosen) < total:
+                    row = pool.pop()
+                    seen.add(row)
+                    chosen.append(row)
+        return np.array(chosen, dtype=np.int64)
+
+    def save(self, index_dir):
+        entries = [(name, term, rows) for name, postings in self.postings.items() for term, rows in postings.items()]
+        counts = [len(rows) for _, _, rows in entries]
+        names = np.array([name for name, _, _ in entries], dtype=object)
+        terms = np.array([term for _, term, _ in entries], dtype=object)
+        table = pa.table({
+            "segment": pa.array(np.repeat(names, counts), pa.string()),
+            "term": pa.array(np.repeat(terms, counts), pa.string()),
+            "row": pa.array(np.concatenate([rows for _, _, rows in entries]) if entries else [], pa.int32()),
+        })
+        partial = index_dir + ".partial"
+        shutil.rmtree(partial, ignore_errors=True)
+        os.makedirs(partial)
+        pq.write_table(table, os.path.join(partial, "postings.parquet"))
+        with open(os.path.join(partial, "index.json"), "w") as f:
+            json.dump({"format": INDEX_FORMAT, "source_file": self.source_file, "segments": self.segments,
+                       "keywords": sorted(self.keywords)}, f, indent=2)
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(partial, index_dir)
+
+    @classmethod
+    def load(cls, index_dir):
+        """
+        :return: The saved EventIndex, or None when there is none (or it has an old format).
+        """
+        if not os.path.exists(os.path.join(index_dir, "index.json")):
+            return None
+        with open(os.path.join(index_dir, "index.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT:
+            return None
+        df = pq.read_table(os.path.join(index_dir, "postings.parquet")).to_pandas()
+        postings = {segment["name"]: {} for segment in meta["segments"]}
+        for (name, term), rows in df.groupby(["segment", "term"])["row"]:
+            postings[name][term] = rows.to_numpy(dtype=np.int64)
+        return cls(meta["source_file"], meta["segments"], postings, meta["keywords"])
+
+
+def index_dir_for(source_file, index_dir=INDEX_DIR):
+    return os.path.join(index_dir, os.path.splitext(os.path.basename(source_file))[0])
+
+
+def update_index(source_file=OUTPUT_FILE, keywords=KEYWORDS, manifest_file=MANIFEST_FILE, index_dir=None):
+    """
+    Brings the persistent index of `source_file` up to date: new or changed segments are
+    indexed, and keywords not indexed yet are scanned for once over the whole corpus.
+    Nothing is read from the corpus when both are already current.
+    :return: EventIndex.
+    """
+    index_dir = index_dir or index_dir_for(source_file)
+    keywords = {normalize_keyword(keyword) for keyword in keywords}
+    segments = corpus_segments(source_file, manifest_file)
+    previous = EventIndex.load(index_dir)
+    if previous is not None and previous.source_file != source_file:
+        previous = None
+
+    known = {} if previous is None else {(s["name"], s["sha1"]): s["rows"] for s in previous.segments}
+    stale = set()
+    for segment in segments:
+        if (segment["name"], segment["sha1"]) in known:
+            segment["rows"] = known[segment["name"], segment["sha1"]]
+        else:
+            stale.add(segment["name"])
+    indexed_keywords = set() if previous is None else previous.keywords
+    new_keywords = keywords - indexed_keywords
+    all_keywords = keywords | indexed_keywords
+    if previous is not None and not stale and not new_keywords:
+        return EventIndex(source_file, segments, previous.postings, all_keywords)
+
+    df = pd.read_csv(source_file, dtype=str, keep_default_na=False)
+    text_column = next(column for column in TEXT_COLUMNS if column in df.columns)
+    postings, start = {}, 0
+    for segment in segments:
+        if segment["rows"] is None:
+            segment["rows"] = len(df)
+        texts = df[text_column].iloc[start:start + segment["rows"]]
+        start += segment["rows"]
+        if segment["name"] in stale:
+            found = {f"keyword:{k}": rows for k, rows in keyword_postings(texts, all_keywords).items() if len(rows)}
+            found.update({f"type:{t}": rows for t, rows in type_postings(texts).items()})
+        else:
+            found = dict(previous.postings[segment["name"]])
+            found.update({f"keyword:{k}": rows for k, rows in keyword_postings(texts, new_keywords).items()
+                          if len(rows)})
+        postings[segment["name"]] = found
+
+    index = EventIndex(source_file, segments, postings, all_keywords)
+    index.save(index_dir)
+    print(f"🗂️ Indexed {len(stale)} of {len(segments)} segments of {source_file}"
+          + (f", {len(new_keywords)} new keywords" if new_keywords and previous is not None else ""))
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the event keyword/type index of a corpus.")
+    parser.add_argument("--source", default=OUTPUT_FILE)
+    parser.add_argument("--keywords", nargs="*", default=[], help="Extra keywords to index")
+    args = parser.parse_args()
+
+    index = update_index(args.source, KEYWORDS + args.keywords)
+    print(f"✅ {len(index):,} rows, {len(index.terms())} terms. Largest:")
+    for term in sorted(index.terms(), key=lambda term: len(index.rows(term)), reverse=True)[:15]:
+        print(f"   {term:<32} {len(index.rows(term)):>9,}")
@@ -0,0 +1,250 @@
+import os
+import re
+import shutil
+from collections import defaultdict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from game_clock import parse_clock
+
+DATA_DIR = "data/"
+STORE_DIR = "data/event_store"
+ROW_GROUP_SIZE = 64_000  # Rows are sorted by game, so row-group stats let filters skip whole games
+
+V2_PATTERN = re.compile(r"^playbyplay_(\d{10})\.csv$")
+LIVE_PATTERN = re.compile(r"^live_playbyplay_(\d{10})\.csv$")
+
+_category = pa.dictionary(pa.int32(), pa.string())
+
+# Unified schema for V2 (home_event/away_event) and live (actionType/subType) rows
+EVENT_SCHEMA = pa.schema([
+    ("game_id", pa.string()),
+    ("source", _category),  # "v2" or "live"
+    ("event_num", pa.int32()),  # EVENTNUM / actionNumber
+    ("order_num", pa.int32()),  # live orderNumber (EVENTNUM for V2)
+    ("period", pa.int8()),
+    ("clock", pa.string()),  # Raw clock text ("11:43" or "PT11M43.00S")
+    ("clock_seconds", pa.int16()),  # Whole seconds remaining in the period
+    ("home_event", pa.string()),
+    ("away_event", pa.string()),
+    ("description", pa.string()),
+    ("action_type", _category),
+    ("sub_type", _category),
+    ("team", _category),
+    ("player_1", _category),
+    ("player_2", _category),
+    ("player_3", _category),
+    ("score_home", pa.int16()),
+    ("score_away", pa.int16()),
+    ("time_actual", pa.timestamp("ms", tz="UTC")),
+    ("edited", pa.timestamp("s", tz="UTC")),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+
+
+def season_for_game(game_id):
+    """
+    Derives the season from a game ID, e.g. "0022300001" -> "2023-24".
+    """
+    year = 2000 + int(game_id[3:5])
+    return f"{year}-{str(year + 1)[-2:]}"
+
+
+def parse_clock_column(clock):
+    """
+    Vectorized clock parsing for both "MM:SS" (V2) and "PT11M57.00S" (live) strings.
+    :param clock: Series of clock strings.
+    :return: Series of whole seconds remaining (nullable Int16).
+    """
+    return (parse_clock(clock)["remaining"] // 10).astype("Int16")
+
+
+def read_v2_csv(path, game_id):
+    """
+    Reads one data/playbyplay_<GAME_ID>.csv (V2 layout) into the unified schema.
+    """
+    df = pd.read_csv(path, dtype={"time_remaining": str, "home_event": str, "away_event": str,
+                                  "player_1": str, "player_2": str, "player_3": str,
+                                  "event_description": str, "team": str, "player": str})
+
+    # A few files were written by the old live fetcher (clock/description/team/player only)
+    if "EVENTNUM" not in df.columns:
+        return pd.DataFrame({
+            "game_id": game_id,
+            "source": "live",
+            "event_num": range(1, len(df) + 1),
+            "order_num": range(1, len(df) + 1),
+            "period": df["quarter"],
+            "clock": df["time_remaining"],
+            "clock_seconds": parse_clock_column(df["time_remaining"]),
+            "description": df["event_description"],
+            "team": df["team"],
+            "player_1": df["player"],
+        })
+
+    return pd.DataFrame({
+        "game_id": game_id,
+        "source": "v2",
+        "event_num": df["EVENTNUM"],
+        "order_num": df["EVENTNUM"],
+        "period": df["quarter"],
+        "clock": df["time_remaining"],
+        "clock_seconds": parse_clock_column(df["time_remaining"]),
+        "home_event": df["home_event"],
+        "away_event": df["away_event"],
+        "player_1": df["player_1"],
+        "player_2": df["player_2"],
+        "player_3": df["player_3"],
+    })
+
+
+def read_live_csv(path, game_id):
+    """
+    Reads one data/live_playbyplay_<GAME_ID>.csv into the unified schema.
+    Edited actions appended by the live poller collapse to their latest version.
+    """
+    df = pd.read_csv(path, dtype={"clock": str, "description": str, "teamTricode": str, "playerNameI": str})
+    df = df.drop_duplicates(subset=["actionNumber"], keep="last")
+    return pd.DataFrame({
+        "game_id": game_id,
+        "source": "live",
+        "event_num": df["actionNumber"],
+        "order_num": df["orderNumber"],
+        "period": df["period"],
+        "clock": df["clock"],
+        "clock_seconds": parse_clock_column(df["clock"]),
+        "description": df["description"],
+        "action_type": df["actionType"],
+        "sub_type": df["subType"],
+        "team": df["teamTricode"],
+        "player_1": df["playerNameI"],
+        "score_home": df["scoreHome"],
+        "score_away": df["scoreAway"],
+        "time_actual": pd.to_datetime(df["timeActual"], utc=True),
+        "edited": pd.to_datetime(df["edited"], utc=True),
+    })
+
+
+def to_table(frames):
+    """
+    Concatenates per-game frames and casts them to EVENT_SCHEMA, sorted by game.
+    """
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values(["game_id", "source", "order_num"], kind="stable", ignore_index=True)
+    for field in EVENT_SCHEMA:
+        if field.name not in df.columns:
+            df[field.name] = None
+    return pa.Table.from_pandas(df[EVENT_SCHEMA.names], schema=EVENT_SCHEMA, preserve_index=False)
+
+
+def list_csv_files(data_dir=DATA_DIR):
+    """
+    :return: Dict of season -> list of (reader, path, game_id) for every per-game CSV.
+    """
+    files = defaultdict(list)
+    for filename in sorted(os.listdir(data_dir)):
+        for pattern, reader in ((V2_PATTERN, read_v2_csv), (LIVE_PATTERN, read_live_csv)):
+            match = pattern.match(filename)
+            if match:
+                game_id = match.group(1)
+                files[season_for_game(game_id)].append((reader, os.path.join(data_dir, filename), game_id))
+    return files
+
+
+def import_csvs(data_dir=DATA_DIR, store_dir=STORE_DIR):
+    """
+    Rebuilds the event store from every playbyplay_*.csv and live_playbyplay_*.csv file.
+    One Parquet file is written per season (hive partition season=YYYY-YY),
+    sorted by game so that game/period filters are pushed down to row groups.
+    :return: Total number of rows written.
+    """
+    if os.path.exists(store_dir):
+        shutil.rmtree(store_dir)
+
+    total = 0
+    for season, files in list_csv_files(data_dir).items():
+        table = to_table([reader(path, game_id) for reader, path, game_id in files])
+        season_dir = os.path.join(store_dir, f"season={season}")
+        os.makedirs(season_dir, exist_ok=True)
+        pq.write_table(table, os.path.join(season_dir, "events.parquet"), row_group_size=ROW_GROUP_SIZE)
+        print(f"✅ {season}: {len(files)} games, {table.num_rows} events")
+        total += table.num_rows
+    return total
+
+
+def open_store(store_dir=STORE_DIR):
+    return ds.dataset(store_dir, format="parquet", schema=EVENT_SCHEMA.append(pa.field("season", pa.string())),
+                      partitioning=PARTITIONING)
+
+
+def build_filter(seasons=None, game_ids=None, periods=None, action_types=None, source=None):
+    """
+    Combines the optional predicates into one dataset filter expression.
+    """
+    predicates = []
+    if seasons is not None:
+        predicates.append(ds.field("season").isin(list(seasons)))
+    if game_ids is not None:
+        predicates.append(ds.field("game_id").isin(list(game_ids)))
+    if periods is not None:
+        predicates.append(ds.field("period").isin(list(periods)))
+    if action_types is not None:
+        predicates.append(ds.field("action_type").isin(list(action_types)))
+    if source is not None:
+        predicates.append(ds.field("source") == source)
+
+    expression = None
+    for predicate in predicates:
+        expression = predicate if expression is None else expression & predicate
+    return expression
+
+
+def read_events(columns=None, seasons=None, game_ids=None, periods=None, action_types=None, source=None,
+                store_dir=STORE_DIR):
+    """
+    Loads events from the store with column projection and predicate pushdown.
+    :param columns: Columns to read (None for all).
+    :param seasons: Seasons to keep, e.g. ["2023-24"] (prunes whole partitions).
+    :param game_ids: Game IDs to keep.
+    :param periods: Periods to keep.
+    :param action_types: Live action types to keep (e.g. ["rebound", "3pt"]).
+    :param source: "v2" or "live".
+    :return: DataFrame with categorical team/player/action columns.
+    """
+    dataset = open_store(store_dir)
+    expression = build_filter(seasons, game_ids, periods, action_types, source)
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def iter_games(columns=None, store_dir=STORE_DIR, **filters):
+    """
+    Yields (game_id, DataFrame) per game, one record batch stream at a time.
+    """
+    dataset = open_store(store_dir)
+    read_columns = None if columns is None else list(dict.fromkeys(["game_id", *columns]))
+    scanner = dataset.scanner(columns=read_columns, filter=build_filter(**filters))
+
+    pending = None
+    for batch in scanner.to_batches():
+        df = batch.to_pandas()
+        if pending is not None:
+            df = pd.concat([pending, df], ignore_index=True)
+        if df.empty:
+            continue
+        last_game = df["game_id"].iloc[-1]
+        complete = df[df["game_id"] != last_game]
+        pending = df[df["game_id"] == last_game]
+        for game_id, game_df in complete.groupby("game_id", sort=False):
+            yield game_id, game_df.reset_index(drop=True)
+    if pending is not None and not pending.empty:
+        yield pending["game_id"].iloc[0], pending.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print(f"📦 Importing per-game CSVs from {DATA_DIR} into {STORE_DIR}...")
+    rows = import_csvs()
+    print(f"✅ Event store ready with {rows} events.")
@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import shutil
+
+import torch
+from transformers import AutoTokenizer, T5ForConditionalGeneration
+
+from inference import (COMMENTARY_MODEL_DIR, MULTITASK_MODEL_DIR, QUANTIZED_LAYERS, QUANTIZED_WEIGHTS,
+                       REWRITER_MODEL_DIR, TASKS_FILE, quantize_model, quantized_state)
+
+QUANTIZED_SUFFIX = "-int8"
+
+
+def export_quantized(model_dir, output_dir=None):
+    """
+    Writes an int8 CPU inference artifact for a saved T5 checkpoint: config, tokenizer
+    and the quantized state dict.
+    :return: The output directory (default: `model_dir` + "-int8").
+    """
+    output_dir = output_dir or model_dir.rstrip("/") + QUANTIZED_SUFFIX
+    os.makedirs(output_dir, exist_ok=True)
+
+    model = T5ForConditionalGeneration.from_pretrained(model_dir)
+    model.config.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_dir).save_pretrained(output_dir)
+    if os.path.exists(os.path.join(model_dir, TASKS_FILE)):
+        shutil.copy(os.path.join(model_dir, TASKS_FILE), output_dir)
+    torch.save(quantized_state(quantize_model(model)), os.path.join(output_dir, QUANTIZED_WEIGHTS))
+    with open(os.path.join(output_dir, "export.json"), "w") as f:
+        json.dump({"source": os.path.abspath(model_dir), "quantization": "dynamic int8",
+                   "layers": sorted(layer.__name__ for layer in QUANTIZED_LAYERS)}, f)
+    return output_dir
+
+
+def model_size_mb(model_dir):
+    return sum(os.path.getsize(os.path.join(model_dir, f)) for f in os.listdir(model_dir)) / 2**20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export saved T5 checkpoints to int8 CPU inference artifacts.")
+    parser.add_argument("model_dirs", nargs="*",
+                        default=[COMMENTARY_MODEL_DIR, REWRITER_MODEL_DIR, MULTITASK_MODEL_DIR])
+    args = parser.parse_args()
+
+    for model_dir in args.model_dirs:
+        if not os.path.isdir(model_dir):
+            print(f"⚠️ {model_dir} not found, skipping.")
+            continue
+        output_dir = export_quantized(model_dir)
+        print(f"✅ {model_dir} ({model_size_mb(model_dir):.0f} MB) -> {output_dir} ({model_size_mb(output_dir):.0f} MB)")
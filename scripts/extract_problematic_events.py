@@ -1,7 +1,11 @@
 import pandas as pd
 
+from event_index import update_index
+
+INPUT_FILE = "data/preprocessed_live_playbyplay.csv"
+
 # Load preprocessed data
-df = pd.read_csv("data/preprocessed_live_playbyplay.csv")
+df = pd.read_csv(INPUT_FILE)
 
 # Event keywords to extract
 RARE_EVENTS = [
@@ -10,11 +14,11 @@ RARE_EVENTS = [
     "take foul", "kicked ball", "discontinue", "delay of game", "flagrant", "alley oop"
 ]
 
-# Extract rare or complex events
-rare_df = df[df["event_description"].str.contains("|".join(RARE_EVENTS), case=False, na=False)]
-
-# Extract team-based plays using teamId or teamTricode
-team_plays_df = df[df["event_description"].str.contains("TEAM", case=False, na=False)]
+# Rare or complex events and team-based plays, looked up in the keyword index instead of scanning
+# the corpus once per pattern (the index only reads the corpus when it or the keywords changed)
+index = update_index(INPUT_FILE, RARE_EVENTS + ["team"])
+rare_df = df.iloc[index.any_of(RARE_EVENTS)]
+team_plays_df = df.iloc[index.rows("team")]
 
 # Also grab first 75 records from each original live file
 sampled_dfs = []
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from event_index import update_index
+
 INPUT_FILE = "data/preprocessed_live_playbyplay.csv"
 OUTPUT_FILE = "data/targeted_events_for_labeling_v2.csv"
 
@@ -17,12 +19,11 @@ keywords = [
 # Make sure column is string type
 df["structured_event"] = df["structured_event"].fillna("").astype(str)
 
-# Step 1: Filter for problematic events
-problem_mask = df["structured_event"].str.lower().apply(
-    lambda text: any(keyword in text for keyword in keywords)
-)
-problematic_sample = df[problem_mask].sample(n=min(200, problem_mask.sum()), random_state=42)
-print(f"🔍 Found {len(problematic_sample)} problematic events.")
+# Step 1: Sample problematic events from the keyword index, stratified so every keyword is represented
+index = update_index(INPUT_FILE, keywords)
+problematic_sample = df.iloc[index.stratified_sample(keywords, 200)]
+print(f"🔍 Found {len(problematic_sample)} problematic events "
+      f"(of {len(index.any_of(keywords))} matching any keyword).")
 
 # Step 2: Determine how many more events are needed to reach 500
 n_problematic = len(problematic_sample)
@@ -0,0 +1,328 @@
+import csv
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import Timeout, ConnectionError
+
+# Default endpoint and headers for stats.nba.com (same headers nba_api sends)
+STATS_BASE_URL = "https://stats.nba.com/stats"
+STATS_HEADERS = {
+    "Host": "stats.nba.com",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:72.0) Gecko/20100101 Firefox/72.0",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Referer": "https://stats.nba.com/",
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+}
+
+# Engine settings
+MAX_WORKERS = 4
+MAX_RETRIES = 5
+REQUEST_TIMEOUT = 30  # Seconds before a request counts as timed out
+INITIAL_RATE = 1.0  # Requests per second shared by all workers
+MIN_RATE = 0.1
+MAX_RATE = 4.0
+RATE_INCREASE = 0.05  # Additive increase after each success
+RATE_DECREASE = 0.5  # Multiplicative decrease after each throttle
+BACKOFF_BASE = 2.0  # Seconds
+BACKOFF_CAP = 60.0
+
+# Ledger statuses
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+EMPTY = "empty"  # The API has no play-by-play for the game; not retried
+
+PLAYBYPLAY_COLUMNS = {
+    'PCTIMESTRING': 'time_remaining',
+    'PERIOD': 'quarter',
+    'HOMEDESCRIPTION': 'home_event',
+    'VISITORDESCRIPTION': 'away_event',
+    'PLAYER1_NAME': 'player_1',
+    'PLAYER2_NAME': 'player_2',
+    'PLAYER3_NAME': 'player_3'
+}
+
+
+class ThrottledError(Exception):
+    """Raised when the server answers with 429/5xx and asks us to slow down."""
+
+    def __init__(self, retry_after=None):
+        super().__init__(f"Throttled by server (retry after {retry_after})")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker.
+    The refill rate adapts to the server: it is cut on every throttle response
+    and slowly raised again on success (AIMD).
+    """
+
+    def __init__(self, rate=INITIAL_RATE, capacity=None, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 increase=RATE_INCREASE, decrease=RATE_DECREASE):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Blocks until a token is available.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        """
+        Slows the whole pool down after a 429/timeout.
+        :param retry_after: Seconds the server asked us to wait, if any.
+        """
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """
+    Exponential backoff with full jitter.
+    :param attempt: Zero-based retry number.
+    :return: Seconds to sleep before the next attempt.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class JobLedger:
+    """
+    Persistent per-GAME_ID job state stored as an append-only CSV.
+    The last row for a game wins, so a crash never corrupts earlier entries
+    and an interrupted run resumes from the remaining pending/failed games.
+    """
+
+    FIELDS = ["GAME_ID", "status", "attempts", "updated_at", "error"]
+
+    def __init__(self, path):
+        self.path = path
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    self.jobs[row["GAME_ID"]] = row
+
+    def status(self, game_id):
+        job = self.jobs.get(game_id)
+        return job["status"] if job else None
+
+    def record(self, game_id, status, attempts=0, error=""):
+        row = {
+            "GAME_ID": game_id,
+            "status": status,
+            "attempts": attempts,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "error": error,
+        }
+        with self.lock:
+            write_header = not os.path.exists(self.path)
+            with open(self.path, "a", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                if write_header:
+                    writer.writeheader()
+                writer.writerow(row)
+            self.jobs[game_id] = row
+
+    def add_pending(self, game_ids, output_dir=None):
+        """
+        Registers games that are not in the ledger yet.
+        :param output_dir: When given, done games whose CSV is no longer there are fetched again.
+        """
+        for game_id in game_ids:
+            status = self.status(game_id)
+            if status is None or status == DONE and output_dir is not None \
+                    and not os.path.exists(playbyplay_path(output_dir, game_id)):
+                self.record(game_id, PENDING)
+
+    def remaining(self, retry_failed=True):
+        """
+        :return: Game IDs that still need to be fetched, in ledger order.
+        """
+        wanted = {PENDING, FAILED} if retry_failed else {PENDING}
+        return [game_id for game_id, job in self.jobs.items() if job["status"] in wanted]
+
+    def counts(self):
+        counts = {PENDING: 0, DONE: 0, FAILED: 0, EMPTY: 0}
+        for job in self.jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+
+def playbyplay_path(output_dir, game_id):
+    return os.path.join(output_dir, f"playbyplay_{game_id}.csv")
+
+
+def format_playbyplay(pbp_data):
+    """
+    Keeps the play-by-play columns we store and renames them for clarity.
+    :param pbp_data: Raw PlayByPlayV2 DataFrame.
+    :return: DataFrame in the data/playbyplay_<GAME_ID>.csv layout.
+    """
+    pbp_data = pbp_data[['GAME_ID', 'EVENTNUM', 'PCTIMESTRING', 'PERIOD', 'HOMEDESCRIPTION', 'VISITORDESCRIPTION', 'PLAYER1_NAME', 'PLAYER2_NAME', 'PLAYER3_NAME']]
+    return pbp_data.rename(columns=PLAYBYPLAY_COLUMNS)
+
+
+class FetchEngine:
+    """
+    Fetches PlayByPlayV2 for many games over a bounded worker pool that shares
+    one HTTP connection pool and one adaptive rate limiter.
+    """
+
+    def __init__(self, ledger, output_dir="data/", base_url=STATS_BASE_URL, headers=None,
+                 max_workers=MAX_WORKERS, max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT,
+                 limiter=None, backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP):
+        self.ledger = ledger
+        self.output_dir = output_dir
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.limiter = limiter or TokenBucket()
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.session = requests.Session()
+        self.session.headers.update(STATS_HEADERS if headers is None else headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.stats = {"requests": 0, "throttled": 0, "timeouts": 0}
+        self.stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def request_playbyplay(self, game_id):
+        """
+        Performs a single PlayByPlayV2 request.
+        :return: Raw PlayByPlayV2 DataFrame (possibly empty).
+        """
+        self._count("requests")
+        response = self.session.get(
+            f"{self.base_url}/playbyplayv2",
+            params={"GameID": game_id, "StartPeriod": 0, "EndPeriod": 14},
+            timeout=self.timeout,
+        )
+
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            raise ThrottledError(float(retry_after) if retry_after else None)
+        response.raise_for_status()
+
+        result_set = response.json()["resultSets"][0]
+        return pd.DataFrame(result_set["rowSet"], columns=result_set["headers"])
+
+    def fetch_game(self, game_id):
+        """
+        Fetches one game with per-request exponential backoff.
+        :return: (DataFrame or None, attempts, error message)
+        """
+        error = ""
+        for attempt in range(self.max_retries):
+            self.limiter.acquire()
+            try:
+                pbp_data = self.request_playbyplay(game_id)
+                self.limiter.on_success()
+
+                if pbp_data.empty:
+                    return None, attempt + 1, EMPTY
+                return format_playbyplay(pbp_data), attempt + 1, ""
+
+            except ThrottledError as e:
+                self._count("throttled")
+                self.limiter.on_throttle(e.retry_after)
+                error = "throttled"
+            except (Timeout, ConnectionError) as e:
+                self._count("timeouts")
+                self.limiter.on_throttle()
+                error = type(e).__name__
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Critical error for Game ID {game_id}: {e}")
+                return None, attempt + 1, str(e)
+            except (ValueError, KeyError, IndexError) as e:
+                error = f"malformed response: {e}"
+
+            print(f"❌ {error} for Game ID {game_id}. Retrying ({attempt + 1}/{self.max_retries})...")
+            time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap))
+
+        return None, self.max_retries, error
+
+    def _run_job(self, game_id):
+        pbp_df, attempts, error = self.fetch_game(game_id)
+
+        if pbp_df is not None:
+            filename = playbyplay_path(self.output_dir, game_id)
+            pbp_df.to_csv(filename, index=False)
+            self.ledger.record(game_id, DONE, attempts)
+            print(f"✅ Play-by-play data saved: {filename}")
+        elif error == EMPTY:
+            self.ledger.record(game_id, EMPTY, attempts)
+            print(f"⚠️ Warning: No play-by-play data found for Game ID {game_id}.")
+        else:
+            self.ledger.record(game_id, FAILED, attempts, error)
+            print(f"❌ Failed to fetch play-by-play for Game ID {game_id}: {error}")
+
+        return game_id, pbp_df is not None
+
+    def run(self, game_ids=None, retry_failed=True):
+        """
+        Fetches every remaining game in the ledger.
+        :param game_ids: Optional new game IDs to register as pending first.
+        :return: Ledger status counts after the run.
+        """
+        if game_ids is not None:
+            self.ledger.add_pending(game_ids, self.output_dir)
+
+        remaining = self.ledger.remaining(retry_failed=retry_failed)
+        print(f"📋 {len(remaining)} games to fetch with {self.max_workers} workers.")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._run_job, game_id) for game_id in remaining]
+            for future in as_completed(futures):
+                future.result()
+
+        return self.ledger.counts()
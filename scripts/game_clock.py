@@ -0,0 +1,215 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+REGULATION_PERIODS = 4
+PERIOD_DECISECONDS = 12 * 60 * 10
+OVERTIME_DECISECONDS = 5 * 60 * 10
+
+# "PT11M57.00S" (live), "11:57" (V2) and "Q4 - 11:57" (preprocessed V2, which carries the period)
+CLOCK_PATTERN = r"^\s*(?:Q(\d+)\s*-?\s*)?(?:PT)?(\d+)[M:](\d+)(?:\.(\d)\d*)?S?\s*$"
+
+
+def _parse_unique(clock):
+    """
+    Runs the regex once per distinct clock string; a game has at most a few thousand, however many rows.
+    :return: (codes into the parsed arrays, -1 for missing; period; deciseconds remaining), NaN where unparseable.
+    """
+    codes, uniques = pd.factorize(pd.Series(clock, dtype=object))
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(CLOCK_PATTERN).astype(float)
+    remaining = parts[1] * 600 + parts[2] * 10 + parts[3].fillna(0)
+    # A trailing NaN, so code -1 (missing clock) picks NaN
+    return codes, np.append(parts[0].to_numpy(), np.nan), np.append(remaining.to_numpy(), np.nan)
+
+
+def parse_clock(clock):
+    """
+    Vectorized parsing of every clock format in the corpus.
+    :param clock: Series of clock strings.
+    :return: DataFrame with "period" (from a "Q4 - " prefix, else NA) and "remaining" (deciseconds
+             left in the period), both nullable integers aligned with `clock`.
+    """
+    codes, period, remaining = _parse_unique(clock)
+    return pd.DataFrame({"period": pd.Series(period[codes], index=clock.index).astype("Int8"),
+                         "remaining": pd.Series(remaining[codes], index=clock.index).astype("Int32")})
+
+
+def period_start(period):
+    """
+    :return: Elapsed game deciseconds at the start of `period` (scalar or array); overtimes are 5 minutes.
+    """
+    period = np.asarray(period, dtype=float)
+    regulation = np.clip(period - 1, 0, REGULATION_PERIODS)
+    overtime = np.maximum(period - 1 - REGULATION_PERIODS, 0)
+    return regulation * PERIOD_DECISECONDS + overtime * OVERTIME_DECISECONDS
+
+
+def period_length(period):
+    return np.where(np.asarray(period, dtype=float) > REGULATION_PERIODS, OVERTIME_DECISECONDS, PERIOD_DECISECONDS)
+
+
+def elapsed_deciseconds(period, remaining):
+    """
+    Turns (period, deciseconds remaining) into deciseconds since tip-off, so events sort and
+    compare across periods with plain integer arithmetic.
+    """
+    return period_start(period) + period_length(period) - np.asarray(remaining, dtype=float)
+
+
+def parse_game_clock(clock, period=None):
+    """
+    :param clock: Series of clock strings in any format parse_clock accepts.
+    :param period: Periods aligned with `clock`; taken from the "Q4 - " prefix when omitted.
+    :return: Series of elapsed game deciseconds (nullable Int32, NA when the clock or period is missing).
+    """
+    codes, parsed_period, remaining = _parse_unique(clock)
+    if period is None:
+        period = parsed_period[codes]
+    else:
+        period = pd.to_numeric(pd.Series(period), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    elapsed = elapsed_deciseconds(period, remaining[codes])
+    return pd.Series(elapsed, index=clock.index).astype("Int32")
+
+
+def format_elapsed(elapsed):
+    """
+    2059 -> "Q1 - 08:34.1": the clock as shown at that moment (a period's last tenth shows as its 00:00).
+    """
+    period = 1
+    while elapsed > period_start(period) + period_length(period):
+        period += 1
+    minutes, deciseconds = divmod(int(period_start(period) + period_length(period) - elapsed), 600)
+    return f"Q{period} - {minutes:02d}:{deciseconds // 10:02d}" + (f".{deciseconds % 10}" if deciseconds % 10 else "")
+
+
+def _nanoseconds(times):
+    """
+    :return: (int64 nanoseconds since the epoch, mask of valid timestamps)
+    """
+    stamps = pd.to_datetime(pd.Series(times), utc=True, format="ISO8601")
+    return stamps.to_numpy(dtype="datetime64[ns]").view(np.int64), stamps.notna().to_numpy()
+
+
+def _slices(codes, n_games):
+    starts = np.searchsorted(codes, np.arange(n_games), side="left")
+    ends = np.searchsorted(codes, np.arange(n_games), side="right")
+    return starts, ends
+
+
+class GameTimeline:
+    """
+    Per-game sorted index over a frame's rows: by elapsed game clock and, when given, by wall-clock
+    time (`timeActual`). Window and as-of queries are binary searches into one game's slice
+    instead of boolean masks over the whole corpus. Results are row positions in the source frame.
+    """
+
+    def __init__(self, games, elapsed, times=None, periods=None):
+        """
+        :param games: Game ID per row.
+        :param elapsed: Elapsed game deciseconds per row (see parse_game_clock); rows with NA are left out.
+        :param times: Optional wall-clock timestamps per row (ISO 8601 strings or datetimes).
+        :param periods: Optional period per row; period windows then keep the end of one period and
+                        the start of the next apart (both are at the same elapsed time).
+        """
+        codes, self.game_ids = pd.factorize(pd.Series(games, dtype=object))
+        self.games = {game_id: code for code, game_id in enumerate(self.game_ids)}
+        elapsed = pd.Series(elapsed).astype(float).to_numpy()
+
+        rows = np.flatnonzero(~np.isnan(elapsed) & (codes >= 0))
+        # Stable sort, so events at the same clock keep their feed order
+        self.rows = rows[np.lexsort((rows, elapsed[rows], codes[rows]))]
+        self.elapsed = elapsed[self.rows].astype(np.int64)
+        self.periods = None if periods is None else pd.to_numeric(pd.Series(periods), errors="coerce").to_numpy(
+            dtype=float, na_value=np.nan)
+        self.starts, self.ends = _slices(codes[self.rows], len(self.game_ids))
+
+        self.time_rows = self.times = None
+        if times is not None:
+            stamps, valid = _nanoseconds(times)
+            rows = np.flatnonzero(valid & (codes >= 0))
+            self.time_rows = rows[np.lexsort((rows, stamps[rows], codes[rows]))]
+            self.times = stamps[self.time_rows]
+            self.time_starts, self.time_ends = _slices(codes[self.time_rows], len(self.game_ids))
+
+    @classmethod
+    def from_frame(cls, df, game_column, clock_column, period_column=None, time_column=None):
+        clock = df[clock_column]
+        period = df[period_column] if period_column else parse_clock(clock)["period"]
+        return cls(df[game_column], parse_game_clock(clock, period), df[time_column] if time_column else None,
+                   period)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _slice(self, game_id):
+        code = self.games.get(game_id)
+        return (0, 0) if code is None else (self.starts[code], self.ends[code])
+
+    def window(self, game_id, start, end):
+        """
+        :param start: Elapsed deciseconds, inclusive.
+        :param end: Elapsed deciseconds, inclusive.
+        :return: Row positions of the game's events in [start, end], in game order.
+        """
+        first, last = self._slice(game_id)
+        elapsed = self.elapsed[first:last]
+        return self.rows[first + np.searchsorted(elapsed, start, "left"):first + np.searchsorted(elapsed, end, "right")]
+
+    def period_window(self, game_id, period, last_seconds=None):
+        """
+        Events of one period, or of its last `last_seconds` ("last 2 minutes of Q4": period=4, last_seconds=120).
+        """
+        end = int(period_start(period) + period_length(period))
+        start = int(period_start(period)) if last_seconds is None else end - last_seconds * 10
+        rows = self.window(game_id, start, end)
+        return rows if self.periods is None else rows[self.periods[rows] == period]
+
+    def _time_slice(self, game_id):
+        if self.times is None:
+            raise ValueError("This timeline was built without wall-clock times")
+        code = self.games.get(game_id)
+        return (0, 0) if code is None else (self.time_starts[code], self.time_ends[code])
+
+    def between(self, game_id, start_time, end_time):
+        """
+        :return: Row positions of the game's events with start_time <= timestamp <= end_time, in time order.
+        """
+        first, last = self._time_slice(game_id)
+        times = self.times[first:last]
+        (start, end), _ = _nanoseconds([start_time, end_time])
+        return self.time_rows[first + np.searchsorted(times, start, "left"):
+                              first + np.searchsorted(times, end, "right")]
+
+    def asof(self, game_id, times):
+        """
+        :return: For each timestamp, the row position of the game's latest event at or before it (-1 if none).
+        """
+        first, last = self._time_slice(game_id)
+        stamps, _ = _nanoseconds(times)
+        if last == first:
+            return np.full(len(stamps), -1, dtype=np.int64)
+        found = np.searchsorted(self.times[first:last], stamps, "right") - 1
+        return np.where(found >= 0, self.time_rows[first + np.maximum(found, 0)], -1)
+
+    def asof_join(self, df, game_column, time_column):
+        """
+        As-of join of another frame (e.g. tweets, odds or wall-clock marks) onto this timeline.
+        :return: Series aligned with `df`: row position of the latest event at or before each row's time (-1 if none).
+        """
+        matched = np.full(len(df), -1, dtype=np.int64)
+        for game_id, positions in df.groupby(game_column, sort=False).indices.items():
+            matched[positions] = self.asof(game_id, df[time_column].iloc[positions])
+        return pd.Series(matched, index=df.index)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert game clocks to elapsed time.")
+    parser.add_argument("clocks", nargs="+", help='e.g. "PT11M57.00S" --period 1, or "Q4 - 01:59"')
+    parser.add_argument("--period", type=int)
+    args = parser.parse_args()
+
+    clocks = pd.Series(args.clocks)
+    elapsed = parse_game_clock(clocks, None if args.period is None else [args.period] * len(clocks))
+    for clock, value in zip(clocks, elapsed):
+        print(f"{clock:<16} -> {'unparseable' if pd.isna(value) else f'{value:>6} ds ({format_elapsed(value)})'}")
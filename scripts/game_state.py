@@ -0,0 +1,299 @@
+import argparse
+import math
+
+from live_ingest import clock_to_seconds
+from replay_simulator import list_recorded_games, load_recorded_game
+
+# Team fouls after which every further foul in the period is penalized (NBA: the 5th foul, 4th in overtime)
+PENALTY_FOULS = 4
+OVERTIME_PENALTY_FOULS = 3
+LATE_SECONDS = 120  # In the last two minutes a team under the limit is penalized from its second foul
+LATE_PENALTY_FOULS = 1
+NON_TEAM_FOULS = {"offensive", "technical", "double-technical"}  # Fouls that do not count toward the penalty
+REGULATION_PERIODS = 4
+
+# Running totals the feed carries on an action, per player role in it
+PLAYER_TOTALS = {
+    "personId": {"pointsTotal": "points", "reboundTotal": "rebounds", "foulPersonalTotal": "fouls",
+                 "foulTechnicalTotal": "technicals", "turnoverTotal": "turnovers"},
+    "assistPersonId": {"assistTotal": "assists"},
+}
+# Stats the feed has no running total for; they are counted here
+PLAYER_COUNTS = {"stealPersonId": "steals", "blockPersonId": "blocks"}
+
+_MISSING = object()
+
+
+def _number(value):
+    """
+    Feed numbers arrive as ints, numeric strings, floats from CSV, NaN or "".
+    :return: int, or None when missing.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else int(value)
+
+
+class GameState:
+    """
+    Running state of one game, updated in O(1) per action: score and margin, lead changes
+    and ties, the current scoring run, team fouls and penalty per period, and player totals.
+
+    Every change an action makes is written through `_set`, which keeps what it overwrote,
+    so an action can be undone exactly. When the feed edits an action, the actions applied
+    after it are undone, the corrected version is applied and the later ones are re-applied;
+    feed corrections land within the last few actions, so this stays a handful of updates.
+    """
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.game = {"period": 0, "clock": None, "seconds_remaining": None, "scoreHome": 0, "scoreAway": 0,
+                     "leader": None, "last_leader": None, "lead_changes": 0, "times_tied": 0,
+                     "largest_lead_home": 0, "largest_lead_away": 0, "run_side": None, "run_points": 0,
+                     "possession": None, "actions": 0, "last_action": None}
+        self.teams = {}  # "home"/"away" -> tricode, learned from who scores
+        self.team_ids = {}  # teamId -> tricode
+        self.fouls = {}  # (period, tricode) -> team fouls
+        self.late_fouls = {}  # (period, tricode) -> team fouls in the last two minutes
+        self.players = {}  # personId -> {"name", "team", stat -> value}
+        self.actions = {}  # actionNumber -> latest version applied
+        self.applied = []  # [actionNumber, undo entries] in application order
+        self.position = {}  # actionNumber -> index in `applied`
+        self.rolled_back = 0
+        self._undo = None
+
+    def _set(self, target, key, value):
+        if target.get(key, _MISSING) != value:
+            self._undo.append((target, key, target.get(key, _MISSING)))
+            target[key] = value
+
+    def _add(self, target, key, amount):
+        self._set(target, key, target.get(key, 0) + amount)
+
+    def _player(self, person_id, action):
+        if person_id not in self.players:
+            self._set(self.players, person_id, {"name": None, "team": None})
+        player = self.players[person_id]
+        if action.get("personId") is not None and _number(action["personId"]) == person_id:
+            self._set(player, "name", action.get("playerNameI") or action.get("player") or player["name"])
+            self._set(player, "team", self._tricode(action) or player["team"])
+        return player
+
+    @staticmethod
+    def _tricode(action):
+        return action.get("teamTricode") or action.get("team") or None
+
+    def _score(self, home, away, tricode):
+        game = self.game
+        scored_home, scored_away = home - game["scoreHome"], away - game["scoreAway"]
+        if not scored_home and not scored_away:
+            return
+        self._set(game, "scoreHome", home)
+        self._set(game, "scoreAway", away)
+        if tricode and (scored_home > 0) != (scored_away > 0):
+            side = "home" if scored_home > 0 else "away"
+            if side not in self.teams:
+                self._set(self.teams, side, tricode)
+
+        # Scoring run: consecutive points by one side, reset when the other side scores
+        for side, points in (("home", scored_home), ("away", scored_away)):
+            if points > 0:
+                if game["run_side"] == side:
+                    self._add(game, "run_points", points)
+                else:
+                    self._set(game, "run_side", side)
+                    self._set(game, "run_points", points)
+
+        margin = home - away
+        leader = "home" if margin > 0 else "away" if margin < 0 else None
+        if leader is None and game["leader"] is not None:
+            self._add(game, "times_tied", 1)
+        # A lead change is measured against the last side to lead, so a tie in between still counts
+        if leader is not None and leader != game["last_leader"]:
+            if game["last_leader"] is not None:
+                self._add(game, "lead_changes", 1)
+            self._set(game, "last_leader", leader)
+        self._set(game, "leader", leader)
+        if margin > game["largest_lead_home"]:
+            self._set(game, "largest_lead_home", margin)
+        if -margin > game["largest_lead_away"]:
+            self._set(game, "largest_lead_away", -margin)
+
+    def _foul(self, action, tricode):
+        if action.get("actionType") != "foul" or not tricode or action.get("subType") in NON_TEAM_FOULS:
+            return
+        key = (self.game["period"], tricode)
+        self._add(self.fouls, key, 1)
+        seconds = self.game["seconds_remaining"]
+        if seconds is not None and seconds <= LATE_SECONDS:
+            self._add(self.late_fouls, key, 1)
+
+    def _players(self, action):
+        for role, totals in PLAYER_TOTALS.items():
+            person_id = _number(action.get(role))
+            if not person_id:
+                continue
+            values = {stat: _number(action.get(field)) for field, stat in totals.items()}
+            if all(value is None for value in values.values()):
+                continue
+            player = self._player(person_id, action)
+            for stat, value in values.items():
+                if value is not None:
+                    self._set(player, stat, value)
+        for role, stat in PLAYER_COUNTS.items():
+            person_id = _number(action.get(role))
+            if person_id:
+                self._add(self._player(person_id, action), stat, 1)
+
+    def _apply(self, action):
+        game = self.game
+        tricode = self._tricode(action)
+        team_id = _number(action.get("teamId"))
+        if team_id and tricode and team_id not in self.team_ids:
+            self._set(self.team_ids, team_id, tricode)
+
+        period = _number(action.get("period"))
+        if period is not None:
+            self._set(game, "period", period)
+        if action.get("clock"):
+            self._set(game, "clock", action["clock"])
+            self._set(game, "seconds_remaining", clock_to_seconds(action["clock"]))
+        possession = _number(action.get("possession"))
+        if possession is not None:
+            self._set(game, "possession", self.team_ids.get(possession, game["possession"]) if possession else None)
+
+        home, away = _number(action.get("scoreHome")), _number(action.get("scoreAway"))
+        if home is not None and away is not None:
+            self._score(home, away, tricode)
+        self._foul(action, tricode)
+        self._players(action)
+        self._add(game, "actions", 1)
+        self._set(game, "last_action", action.get("actionNumber"))
+
+    def _undo_last(self):
+        action_number, undo = self.applied.pop()
+        del self.position[action_number]
+        for target, key, previous in reversed(undo):
+            if previous is _MISSING:
+                del target[key]
+            else:
+                target[key] = previous
+        return action_number
+
+    def _push(self, action):
+        self._undo = []
+        self._apply(action)
+        self.position[action["actionNumber"]] = len(self.applied)
+        self.applied.append([action["actionNumber"], self._undo])
+        self._undo = None
+
+    def update(self, action):
+        """
+        Applies one raw live action or normalized event. An action number seen before is
+        treated as an edit and replaces the earlier version.
+        """
+        number = action["actionNumber"]
+        self.actions[number] = action
+        if number not in self.position:
+            self._push(action)
+            return
+        later = []
+        while True:
+            undone = self._undo_last()
+            if undone == number:
+                break
+            later.append(undone)
+        self.rolled_back += len(later) + 1
+        self._push(action)
+        for undone in reversed(later):
+            self._push(self.actions[undone])
+
+    def penalty(self, tricode):
+        """
+        :return: True when the next team foul by `tricode` this period gives free throws.
+        """
+        period = self.game["period"]
+        limit = PENALTY_FOULS if period <= REGULATION_PERIODS else OVERTIME_PENALTY_FOULS
+        return (self.fouls.get((period, tricode), 0) >= limit
+                or self.late_fouls.get((period, tricode), 0) >= LATE_PENALTY_FOULS)
+
+    def snapshot(self, players=()):
+        """
+        Game context for commentary, built from the running state only.
+        :param players: Person IDs whose totals to include (e.g. the players in the current action).
+        """
+        game = self.game
+        tricodes = sorted({tricode for _, tricode in self.fouls} | set(self.teams.values()))
+        teams = {side: self.teams.get(side) for side in ("home", "away")}
+        return {
+            "gameId": self.game_id,
+            "period": game["period"],
+            "clock": game["clock"],
+            "score": {"home": game["scoreHome"], "away": game["scoreAway"]},
+            "teams": teams,
+            "margin": game["scoreHome"] - game["scoreAway"],
+            "leader": teams.get(game["leader"]) or game["leader"],
+            "lead_changes": game["lead_changes"],
+            "times_tied": game["times_tied"],
+            "largest_lead": {"home": game["largest_lead_home"], "away": game["largest_lead_away"]},
+            "run": {"team": teams.get(game["run_side"]) or game["run_side"], "points": game["run_points"]},
+            "possession": game["possession"],
+            "team_fouls": {tricode: self.fouls.get((game["period"], tricode), 0) for tricode in tricodes},
+            "penalty": {tricode: self.penalty(tricode) for tricode in tricodes},
+            "players": {person_id: dict(self.players[person_id]) for person_id in players
+                        if person_id in self.players},
+            "actions": game["actions"],
+        }
+
+
+class GameStateTracker:
+    """
+    One GameState per game, fed from the live event stream.
+    """
+
+    def __init__(self):
+        self.games = {}
+
+    def __contains__(self, game_id):
+        return game_id in self.games
+
+    def update(self, event):
+        """
+        :param event: Raw live action or normalized event with its `gameId`.
+        :return: The game's GameState.
+        """
+        game_id = event["gameId"]
+        if game_id not in self.games:
+            self.games[game_id] = GameState(game_id)
+        state = self.games[game_id]
+        state.update(event)
+        return state
+
+    def snapshot(self, game_id, event=None):
+        """
+        :param event: When given, the totals of the players involved in it are included.
+        """
+        players = [_number(event.get(role)) for role in (*PLAYER_TOTALS, *PLAYER_COUNTS)] if event else ()
+        return self.games[game_id].snapshot([person_id for person_id in players if person_id])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded live games through the game-state tracker.")
+    parser.add_argument("--game-id", help="Only this game (default: every recorded game)")
+    args = parser.parse_args()
+
+    for game_id, path in list_recorded_games().items():
+        if args.game_id and game_id != args.game_id:
+            continue
+        tracker = GameStateTracker()
+        for action in load_recorded_game(path):
+            tracker.update({**action, "gameId": game_id})
+        snapshot = tracker.snapshot(game_id)
+        print(f"🏀 {game_id}: {snapshot['teams']['home']} {snapshot['score']['home']} - "
+              f"{snapshot['score']['away']} {snapshot['teams']['away']}, {snapshot['lead_changes']} lead changes, "
+              f"{snapshot['times_tied']} ties, largest leads {snapshot['largest_lead']}, "
+              f"final run {snapshot['run']}")
@@ -1,138 +1,21 @@
+import argparse
 import pandas as pd
 import random
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from commentary_templates import commentary_templates, missed_shot_templates
+from event_classifier import classify_events, extract_players, render_commentary
 
 INPUT_FILE = "data/preprocessed_playbyplay.csv"
 OUTPUT_FILE = "data/training_data.csv"
+CHUNK_SIZE = 50_000  # Rows held in memory at once when streaming
 
-# Load preprocessed play-by-play data
-df = pd.read_csv(INPUT_FILE)
-
-# Expanded AI-generated responses
-commentary_templates = {
-    "3PT Jump Shot": [
-        "[PLAYER] drills a deep three!", 
-        "[PLAYER] connects from downtown!", 
-        "[PLAYER] splashes a long-range shot!",
-        "[PLAYER] drills a deep three!", 
-        "[PLAYER] connects from way downtown!", 
-        "[PLAYER] buries a long-range shot!", 
-        "[PLAYER] lets it fly... and hits!"
-    ],
-    "Jump Shot": [
-        "[PLAYER] pulls up and nails the jumper!", 
-        "[PLAYER] sinks a mid-range shot!", 
-        "[PLAYER] buries the jump shot!",
-        "[PLAYER] pulls up and knocks it down!", 
-        "[PLAYER] nails the mid-range jumper!", 
-        "[PLAYER] rises up and buries it!"
-    ],
-    "Dunk": [
-        "[PLAYER] slams it home!", 
-        "[PLAYER] throws it down!", 
-        "[PLAYER] hammers it in!"
-    ],
-    "Layup": [
-        "[PLAYER] drives inside and lays it in!", 
-        "[PLAYER] finishes strong at the rim!", 
-        "[PLAYER] gets the bucket in traffic!",
-        "[PLAYER] drives inside and lays it in!", 
-        "[PLAYER] attacks the rim for two!", 
-        "[PLAYER] glides in for the score!"
-    ],
-    "Rebound": [
-        "[PLAYER] secures the board.", 
-        "[PLAYER] snatches the ball off the glass.", 
-        "[PLAYER] comes down with the rebound."
-    ],
-    "Steal": [
-        "[PLAYER] steals the ball from [SECOND_PLAYER]!", 
-        "[PLAYER] picks [SECOND_PLAYER]'s pocket!", 
-        "[PLAYER] swipes it away from [SECOND_PLAYER]!"
-    ],
-    "Foul": [
-        "[PLAYER] is charged with a foul.", 
-        "[PLAYER] was assessed a foul."
-    ],
-    "Technical Foul": [
-        "Technical foul assessed to [PLAYER].", 
-        "[PLAYER] hit with a technical foul.", 
-        "[PLAYER] T'd up by the ref!"
-    ],
-    "Turnover": [
-        "[PLAYER] loses the ball.", 
-        "[PLAYER] turns it over.", 
-        "[PLAYER] coughs it up."
-    ],
-    "Block": [
-        "[PLAYER] swats [SECOND_PLAYER]'s shot away!", 
-        "[PLAYER] denies [SECOND_PLAYER] at the rim!", 
-        "[PLAYER] sends [SECOND_PLAYER]'s shot packing!"
-    ],
-    "Substitution": [
-        "[PLAYER] comes in for [SECOND_PLAYER].", 
-        "[PLAYER] checks in for [SECOND_PLAYER].", 
-        "[PLAYER] enters the game for [SECOND_PLAYER]."
-    ],
-        "Free Throw": [
-        "Free throws for [PLAYER]."
-    ],
-    "Missed Free Throw": [
-        "[PLAYER] misses the free throw after the technical foul."
-    ],
-    "Timeout": [
-        "[PLAYER] calls a timeout.", 
-        "Timeout [PLAYER]."
-    ],
-    "Ejection": [
-        "[PLAYER] has been ejected from the game."
-    ],
-    "Jump Ball": [
-        "There's a jump ball between [PLAYER] and [SECOND_PLAYER], and it's tipped to [THIRD_PLAYER]."
-    ]
-}
-
-# Missed shot responses
-missed_shot_templates = {
-    "3PT Jump Shot": [
-        "[PLAYER] fires from deep but can't connect.", 
-        "[PLAYER] launches a three but misses."
-    ],
-    "Jump Shot": [
-        "[PLAYER] takes a jumper but can't get it to fall.", 
-        "[PLAYER] pulls up but it's off the mark."
-    ],
-    "Layup": [
-        "[PLAYER] drives inside but the layup won’t fall.", 
-        "[PLAYER] attacks the basket but can't finish."
-    ]
-}
-
-# Extract player names from event
-def extract_players(event):
-    # Remove stat-related parentheses like "(1 STL)"
-    event_cleaned = re.sub(r"\([\d\w\s]+\)", "", event)
-    words = event_cleaned.split()
-    players = []
-    
-    for i, word in enumerate(words):
-        if word.istitle() and word not in ["Jr.", "Sr.", "III"]:
-            players.append(word)
-    
-    if len(players) == 0:
-        return "A player", None, None
-    elif len(players) == 1:
-        return players[0], None, None
-    elif len(players) == 2:
-        return players[0], players[1], None
-    else:
-        return players[0], players[1], players[2]
-
-# Generate AI commentary
-training_data = []
-for _, row in df.iterrows():
-    event = row["event_description"]
-
+def generate_commentary(event):
+    """
+    Original per-row commentary rules, kept as the reference the classifier is checked against.
+    Uses the global `random` module, so seed it for reproducible output.
+    """
     # Determine if it's a missed shot
     is_missed_shot = "miss" in event.lower()
     
@@ -208,10 +91,77 @@ for _, row in df.iterrows():
         assist_player = assist_match.group(1).split()[0]  
         commentary += f" {assist_player} assists."
 
-    training_data.append([event, commentary])
+    return commentary
+
+def generate_training_data(df, rng=random):
+    """
+    Generates [event, commentary] pairs for every preprocessed event.
+    Events are classified in one pass over the column; rendering is a template pick and slot fill.
+    :param rng: Random source; seeding it gives the same output as generate_commentary row by row.
+    :return: DataFrame with input_event and ai_commentary columns.
+    """
+    events = df["event_description"]
+    records = classify_events(events)
+    commentary = [render_commentary(record, rng) for record in records]
+    return pd.DataFrame({"input_event": events.to_numpy(), "ai_commentary": commentary})
+
+def chunk_rng(seed, index):
+    """
+    Deterministic random source for one chunk, independent of which worker runs it.
+    """
+    return random.Random(seed * 1_000_003 + index)
+
+def _generate_chunk(args):
+    events, seed, index = args
+    return generate_training_data(pd.DataFrame({"event_description": events}), chunk_rng(seed, index))
+
+def iter_training_chunks(input_file=INPUT_FILE, chunk_size=CHUNK_SIZE, seed=None, workers=1):
+    """
+    Generator pipeline: reads the input in chunks and yields training-data chunks in input order.
+    Without a seed (and one worker) the global `random` module is used, which matches the in-memory run.
+    With a seed every chunk gets its own RNG, so output is reproducible for any number of workers.
+    """
+    chunks = pd.read_csv(input_file, usecols=["event_description"], chunksize=chunk_size)
+
+    if workers <= 1:
+        for index, chunk in enumerate(chunks):
+            yield generate_training_data(chunk, random if seed is None else chunk_rng(seed, index))
+        return
+
+    # Keep at most two chunks per worker in flight so memory stays bounded
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for index, chunk in enumerate(chunks):
+            pending.append(pool.submit(_generate_chunk, (chunk["event_description"].tolist(), seed, index)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def stream_training_data(input_file=INPUT_FILE, output_file=OUTPUT_FILE, chunk_size=CHUNK_SIZE, seed=None, workers=1):
+    """
+    Writes training data chunk by chunk, so peak memory depends on the chunk size, not the input size.
+    :return: Number of rows written.
+    """
+    if workers > 1 and seed is None:
+        seed = random.randrange(2 ** 32)
+        print(f"🎲 Parallel run without --seed; using seed {seed}")
+
+    rows = 0
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
+        for train_chunk in iter_training_chunks(input_file, chunk_size, seed, workers):
+            train_chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(train_chunk)
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate template commentary training data.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows processed per chunk.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for parallel chunks.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible per-chunk randomness.")
+    args = parser.parse_args()
 
-# Convert to DataFrame and save
-train_df = pd.DataFrame(training_data, columns=["input_event", "ai_commentary"])
-train_df.to_csv(OUTPUT_FILE, index=False)
+    # Stream the preprocessed play-by-play data through the commentary generator
+    rows = stream_training_data(INPUT_FILE, OUTPUT_FILE, args.chunk_size, args.seed, args.workers)
 
-print(f"✅ Training data saved to {OUTPUT_FILE}. AI model will learn correct phrasing.")
\ No newline at end of file
+    print(f"✅ Training data saved to {OUTPUT_FILE} ({rows} rows). AI model will learn correct phrasing.")
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import os
+import time
+from collections import Counter, deque
+
+import torch
+from transformers import AutoTokenizer, T5Config, T5ForConditionalGeneration
+
+# Checkpoints written by train_t5.py and train_event_rewriter.py
+COMMENTARY_MODEL_DIR = "./t5-commentary"
+REWRITER_MODEL_DIR = "./t5-event-rewriter"
+MULTITASK_MODEL_DIR = "./t5-multitask"  # train_multitask.py: one checkpoint for both tasks
+
+# Task prefixes of multi-task checkpoints, stored in the checkpoint as TASKS_FILE
+TASK_PREFIXES = {"rewrite": "rewrite event: ", "commentary": "commentary: "}
+TASKS_FILE = "tasks.json"
+
+MAX_INPUT_LENGTH = 128  # Same truncation as training
+MAX_NEW_TOKENS = 64
+BATCH_WINDOW_MS = 10  # How long the first request of a batch waits for company
+MAX_BATCH_SIZE = 32
+LATENCY_SAMPLES = 10000  # Recent samples kept for percentiles
+
+# int8 artifacts written by export_quantized.py
+QUANTIZED_WEIGHTS = "quantized_int8.pt"
+QUANTIZED_LAYERS = {torch.nn.Linear}  # Attention projections, feed-forward and lm_head
+
+
+def quantize_model(model):
+    """
+    Dynamic int8 quantization: Linear weights are stored as int8 and activations
+    are quantized on the fly, so no calibration data is needed.
+    """
+    return torch.ao.quantization.quantize_dynamic(model.eval(), QUANTIZED_LAYERS, dtype=torch.qint8)
+
+
+def is_quantized_export(model_dir):
+    return os.path.exists(os.path.join(model_dir, QUANTIZED_WEIGHTS))
+
+
+def quantized_state(model):
+    """
+    Splits a dynamically quantized model into plain tensors: the float parameters, plus
+    each quantized Linear's int8 weight with its scale/zero point and its bias.
+    """
+    int8 = {}
+    for name, module in model.named_modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight = module.weight()
+            int8[name] = {"weight": weight.int_repr(), "scale": weight.q_scale(),
+                          "zero_point": weight.q_zero_point(), "bias": module.bias()}
+    floats = {**dict(model.named_parameters(remove_duplicate=False)), **dict(model.named_buffers())}
+    return {"float": {key: value.detach() for key, value in floats.items()}, "int8": int8}
+
+
+def load_quantized_state(model, state):
+    """
+    Inverse of quantized_state, for a model already passed through quantize_model.
+    """
+    tensors = {**dict(model.named_parameters(remove_duplicate=False)), **dict(model.named_buffers())}
+    with torch.no_grad():
+        for key, value in state["float"].items():
+            tensors[key].copy_(value)
+    modules = dict(model.named_modules())
+    for name, packed in state["int8"].items():
+        weight = torch._make_per_tensor_quantized_tensor(packed["weight"], packed["scale"], packed["zero_point"])
+        modules[name].set_weight_bias(weight, packed["bias"])
+    return model
+
+
+class T5Generator:
+    """
+    A saved T5 checkpoint loaded once, generating for a list of inputs as one padded batch.
+    """
+
+    def __init__(self, model_dir, max_input_length=MAX_INPUT_LENGTH, max_new_tokens=MAX_NEW_TOKENS,
+                 num_beams=1, device="cpu"):
+        self.model_dir = model_dir
+        self.max_input_length = max_input_length
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self.device = device
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = self.load_model(model_dir).to(device).eval()
+
+    def load_model(self, model_dir):
+        return T5ForConditionalGeneration.from_pretrained(model_dir)
+
+    def generate(self, texts):
+        """
+        :param texts: List of input strings.
+        :return: List of generated strings, in input order.
+        """
+        inputs = self.tokenizer(list(texts), padding=True, truncation=True,
+                                max_length=self.max_input_length, return_tensors="pt").to(self.device)
+        with torch.inference_mode():
+            outputs = self.model.generate(**inputs, max_new_tokens=self.max_new_tokens, num_beams=self.num_beams)
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+class QuantizedT5Generator(T5Generator):
+    """
+    Same interface as T5Generator, running an int8 export from export_quantized.py on CPU.
+    Generation still reuses the decoder's key/value cache between steps.
+    """
+
+    def __init__(self, model_dir, **kwargs):
+        super().__init__(model_dir, **{**kwargs, "device": "cpu"})
+
+    def load_model(self, model_dir):
+        # Rebuild the quantized module structure from the config, then load the int8 weights
+        model = quantize_model(T5ForConditionalGeneration(T5Config.from_pretrained(model_dir)))
+        return load_quantized_state(model, torch.load(os.path.join(model_dir, QUANTIZED_WEIGHTS)))
+
+
+def checkpoint_tasks(model_dir):
+    """
+    :return: Dict task -> input prefix for a multi-task checkpoint, or None for a single-task one.
+    """
+    path = os.path.join(model_dir, TASKS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_generator(model_dir, **kwargs):
+    """
+    :return: A QuantizedT5Generator for int8 exports, otherwise a T5Generator.
+    """
+    if is_quantized_export(model_dir):
+        return QuantizedT5Generator(model_dir, **kwargs)
+    return T5Generator(model_dir, **kwargs)
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """
+    :return: Dict like {"p50": ..., "p95": ...} in milliseconds, or None values when there are no samples.
+    """
+    ordered = sorted(samples)
+    result = {}
+    for point in points:
+        if ordered:
+            index = min(len(ordered) - 1, int(round(point / 100 * (len(ordered) - 1))))
+            result[f"p{point}"] = round(ordered[index] * 1000, 2)
+        else:
+            result[f"p{point}"] = None
+    return result
+
+
+class BatcherMetrics:
+    """
+    Latency and throughput counters for one MicroBatcher.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.requests = 0
+        self.failures = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self.latency = deque(maxlen=LATENCY_SAMPLES)  # Submit -> result, per request
+        self.queue_wait = deque(maxlen=LATENCY_SAMPLES)  # Submit -> batch start, per request
+        self.batch_time = deque(maxlen=LATENCY_SAMPLES)  # generate() call, per batch
+
+    def record_batch(self, size, waits, seconds):
+        self.batches += 1
+        self.batch_sizes[size] += 1
+        self.queue_wait.extend(waits)
+        self.batch_time.append(seconds)
+
+    def record_request(self, seconds, failed=False):
+        self.requests += 1
+        self.failures += failed
+        self.latency.append(seconds)
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started_at
+        items = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "batches": self.batches,
+            "mean_batch_size": round(items / self.batches, 2) if self.batches else None,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "throughput_rps": round(self.requests / uptime, 2) if uptime else None,
+            "latency_ms": percentiles(self.latency),
+            "queue_wait_ms": percentiles(self.queue_wait),
+            "batch_ms": percentiles(self.batch_time),
+            "uptime_s": round(uptime, 1),
+        }
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for up to `max_wait_ms` or `max_batch_size` items,
+    runs them through `generate_fn` as one batch in a worker thread and fans the
+    results back out to each caller. The next batch is collected while the current
+    one is generating.
+    """
+
+    def __init__(self, generate_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=BATCH_WINDOW_MS):
+        self.generate_fn = generate_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = BatcherMetrics()
+        self.queue = None
+        self._task = None
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self.queue is not None and not self.queue.empty():
+            _, future, _ = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, text):
+        """
+        :return: The generated string for `text`.
+        """
+        if self._task is None:
+            raise RuntimeError("Batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        submitted = time.perf_counter()
+        await self.queue.put((text, future, submitted))
+        try:
+            result = await future
+        except Exception:
+            self.metrics.record_request(time.perf_counter() - submitted, failed=True)
+            raise
+        self.metrics.record_request(time.perf_counter() - submitted)
+        return result
+
+    async def _collect(self):
+        """
+        Waits for one request, then keeps taking more until the window closes or the batch is full.
+        """
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            batch = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            texts = [text for text, _, _ in batch]
+            try:
+                results = await asyncio.to_thread(self.generate_fn, texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.metrics.record_batch(len(batch), [started - submitted for _, _, submitted in batch],
+                                          time.perf_counter() - started)
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
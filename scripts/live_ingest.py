@@ -0,0 +1,180 @@
+import asyncio
+import json
+import re
+import time
+
+from requests.exceptions import RequestException
+
+from live_poller import LivePoller, LIVE_BASE_URL, POOL_SIZE, REQUEST_TIMEOUT
+
+# Per-game polling intervals (seconds)
+CLUTCH_INTERVAL = 1.0  # Last 5 minutes of Q4/OT in a one-possession-ish game
+NORMAL_INTERVAL = 3.0
+PAUSED_INTERVAL = 10.0  # Timeouts and breaks between quarters
+HALFTIME_INTERVAL = 30.0
+SCOREBOARD_INTERVAL = 15.0
+
+CLUTCH_SECONDS = 300
+CLUTCH_MARGIN = 5
+
+CLOCK_PATTERN = re.compile(r"PT(\d+)M([\d.]+)S")
+
+# Raw feed fields passed through for the game-state tracker (game_state.py)
+STATE_FIELDS = ("teamId", "possession", "personId", "pointsTotal", "reboundTotal", "foulPersonalTotal",
+                "foulTechnicalTotal", "turnoverTotal", "assistPersonId", "assistTotal", "stealPersonId",
+                "blockPersonId")
+
+
+def clock_to_seconds(clock):
+    """
+    Converts a live feed clock such as "PT11M57.00S" into seconds remaining.
+    :return: Float seconds, or None if the clock cannot be parsed.
+    """
+    match = CLOCK_PATTERN.match(clock or "")
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + float(match.group(2))
+
+
+def normalize_action(game_id, action, is_edit=False):
+    """
+    Flattens a raw live action into the event shape the rest of the pipeline consumes.
+    """
+    return {
+        "gameId": game_id,
+        "actionNumber": action.get("actionNumber"),
+        "orderNumber": action.get("orderNumber"),
+        "period": action.get("period"),
+        "clock": action.get("clock"),
+        "seconds_remaining": clock_to_seconds(action.get("clock")),
+        "actionType": action.get("actionType"),
+        "subType": action.get("subType"),
+        "team": action.get("teamTricode") or "",
+        "player": action.get("playerNameI") or "",
+        "description": action.get("description") or "",
+        "scoreHome": action.get("scoreHome"),
+        "scoreAway": action.get("scoreAway"),
+        "timeActual": action.get("timeActual"),
+        "edited": action.get("edited"),
+        "is_edit": is_edit,
+        "received_at": time.time(),
+        **{field: action.get(field) for field in STATE_FIELDS},
+    }
+
+
+def poll_interval(event):
+    """
+    Chooses how soon to poll a game again based on its latest event.
+    :param event: Latest normalized event for the game, or None.
+    :return: Seconds until the next poll.
+    """
+    if event is None:
+        return NORMAL_INTERVAL
+
+    action_type = event["actionType"]
+    if action_type == "period" and event["subType"] == "end":
+        return HALFTIME_INTERVAL if event["period"] == 2 else PAUSED_INTERVAL
+    if action_type == "timeout":
+        return PAUSED_INTERVAL
+
+    seconds = event["seconds_remaining"]
+    try:
+        margin = abs(int(event["scoreHome"]) - int(event["scoreAway"]))
+    except (TypeError, ValueError):
+        margin = None
+    if (event["period"] or 0) >= 4 and seconds is not None and seconds <= CLUTCH_SECONDS \
+            and margin is not None and margin <= CLUTCH_MARGIN:
+        return CLUTCH_INTERVAL
+    return NORMAL_INTERVAL
+
+
+class AsyncLiveIngest:
+    """
+    Polls the scoreboard and every live game concurrently from one event loop.
+    All requests share the poller's keep-alive connection pool; each game runs
+    its own task with an interval that follows the game situation.
+    Normalized events are published on an asyncio queue (see `events()`).
+    """
+
+    def __init__(self, base_url=LIVE_BASE_URL, output_dir=None, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT,
+                 scoreboard_interval=SCOREBOARD_INTERVAL, interval_fn=poll_interval):
+        self.poller = LivePoller(output_dir=output_dir, base_url=base_url, timeout=timeout, pool_size=pool_size)
+        self.scoreboard_interval = scoreboard_interval
+        self.interval_fn = interval_fn
+        self.queue = asyncio.Queue()
+        self.tasks = {}
+        self.latest = {}  # gameId -> latest normalized event
+
+    async def poll_game(self, game_id):
+        """
+        Fetches one game once and publishes its new/edited actions.
+        :return: Number of events published.
+        """
+        try:
+            actions = await asyncio.to_thread(self.poller.fetch_actions, game_id)
+        except (RequestException, json.decoder.JSONDecodeError) as e:
+            print(f"❌ Error polling Game ID {game_id}: {e}")
+            return 0
+        if actions is None:
+            return 0
+
+        changes = self.poller.cursor(game_id).diff(actions)
+        if not changes:
+            return 0
+        if self.poller.output_dir is not None:
+            await asyncio.to_thread(self.poller.append_log, game_id, [action for action, _ in changes])
+
+        for action, is_edit in changes:
+            event = normalize_action(game_id, action, is_edit)
+            self.latest[game_id] = event
+            self.queue.put_nowait(event)
+        return len(changes)
+
+    async def game_loop(self, game_id):
+        while True:
+            start = time.monotonic()
+            await self.poll_game(game_id)
+            interval = self.interval_fn(self.latest.get(game_id))
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    def track(self, game_ids):
+        """
+        Starts a polling task for every new game and stops tasks for games that ended.
+        """
+        for game_id in game_ids:
+            if game_id not in self.tasks:
+                self.tasks[game_id] = asyncio.create_task(self.game_loop(game_id))
+        for game_id in list(self.tasks):
+            if game_id not in game_ids:
+                self.tasks.pop(game_id).cancel()
+
+    async def scoreboard_loop(self):
+        while True:
+            try:
+                game_ids = await asyncio.to_thread(self.poller.get_live_games)
+                self.track(set(game_ids))
+            except (RequestException, json.decoder.JSONDecodeError, KeyError) as e:
+                print(f"❌ Error fetching the scoreboard: {e}")
+            await asyncio.sleep(self.scoreboard_interval)
+
+    async def run(self, game_ids=None):
+        """
+        Runs until cancelled. With `game_ids` the scoreboard is skipped and
+        exactly those games are polled.
+        """
+        try:
+            if game_ids is not None:
+                self.track(set(game_ids))
+                await asyncio.gather(*self.tasks.values())
+            else:
+                await self.scoreboard_loop()
+        finally:
+            for task in self.tasks.values():
+                task.cancel()
+
+    async def events(self):
+        """
+        Async stream of normalized events, in arrival order.
+        """
+        while True:
+            yield await self.queue.get()
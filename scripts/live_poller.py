@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import queue
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+# CDN endpoints behind nba_api.live (support ETag / Last-Modified)
+LIVE_BASE_URL = "https://cdn.nba.com/static/json/liveData"
+LIVE_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Connection": "keep-alive",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Safari/537.36",
+}
+
+POLL_INTERVAL = 3  # Seconds between polling rounds
+REQUEST_TIMEOUT = 10
+POOL_SIZE = 16  # Keep-alive connections shared by all games
+OUTPUT_DIR = "data/"
+
+# Column layout of data/live_playbyplay_<GAME_ID>.csv
+LIVE_COLUMNS = [
+    "actionNumber", "clock", "timeActual", "period", "periodType", "actionType", "subType", "qualifiers",
+    "personId", "x", "y", "possession", "scoreHome", "scoreAway", "edited", "orderNumber",
+    "isTargetScoreLastPeriod", "xLegacy", "yLegacy", "isFieldGoal", "side", "description", "personIdsFilter",
+    "teamId", "teamTricode", "descriptor", "jumpBallRecoveredName", "jumpBallRecoverdPersonId", "playerName",
+    "playerNameI", "jumpBallWonPlayerName", "jumpBallWonPersonId", "jumpBallLostPlayerName",
+    "jumpBallLostPersonId", "area", "areaDetail", "officialId", "foulPersonalTotal", "foulTechnicalTotal",
+    "foulDrawnPlayerName", "foulDrawnPersonId", "shotDistance", "shotResult", "shotActionNumber",
+    "reboundTotal", "reboundDefensiveTotal", "reboundOffensiveTotal", "pointsTotal", "turnoverTotal",
+    "stealPlayerName", "stealPersonId", "assistPlayerNameInitial", "assistPersonId", "assistTotal",
+    "blockPlayerName", "blockPersonId"
+]
+
+
+class GameCursor:
+    """
+    What we have already seen for one game: the `edited` stamp of every
+    action plus the validators needed for conditional requests.
+    """
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.edited = {}  # actionNumber -> edited timestamp
+        self.last_action_number = 0
+        self.last_order_number = 0
+        self.etag = None
+        self.last_modified = None
+
+    def diff(self, actions):
+        """
+        Picks out actions that are new or whose `edited` stamp changed.
+        :param actions: Full action list from the play-by-play feed.
+        :return: List of (action, is_edit) tuples in feed order.
+        """
+        changes = []
+        for action in actions:
+            number = action.get("actionNumber")
+            edited = action.get("edited")
+            seen = self.edited.get(number)
+
+            if seen is None:
+                changes.append((action, False))
+            elif seen != edited:
+                changes.append((action, True))
+            else:
+                continue
+
+            self.edited[number] = edited
+            self.last_action_number = max(self.last_action_number, number or 0)
+            self.last_order_number = max(self.last_order_number, action.get("orderNumber") or 0)
+        return changes
+
+
+class LivePoller:
+    """
+    Long-running poller that only emits new or edited play-by-play actions.
+    Changes are appended to data/live_playbyplay_<GAME_ID>.csv (skipped when
+    `output_dir` is None) and pushed onto an in-process queue as dicts with
+    `gameId` and `is_edit` added.
+    """
+
+    def __init__(self, output_dir=OUTPUT_DIR, base_url=LIVE_BASE_URL, events=None, timeout=REQUEST_TIMEOUT,
+                 pool_size=POOL_SIZE):
+        self.output_dir = output_dir
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.events = events if events is not None else queue.Queue()
+        self.cursors = {}
+
+        self.session = requests.Session()
+        self.session.headers.update(LIVE_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.stats = {"requests": 0, "not_modified": 0, "new": 0, "edited": 0}
+
+    def log_path(self, game_id):
+        if self.output_dir is None:
+            return None
+        return os.path.join(self.output_dir, f"live_playbyplay_{game_id}.csv")
+
+    def cursor(self, game_id):
+        """
+        Returns the cursor for a game, seeding it from an existing log so a
+        restarted poller does not re-emit actions it already wrote.
+        """
+        if game_id not in self.cursors:
+            cursor = GameCursor(game_id)
+            path = self.log_path(game_id)
+            if path and os.path.exists(path):
+                with open(path, newline="") as f:
+                    cursor.diff({
+                        "actionNumber": int(row["actionNumber"]),
+                        "orderNumber": int(row["orderNumber"] or 0),
+                        "edited": row["edited"],
+                    } for row in csv.DictReader(f))
+            self.cursors[game_id] = cursor
+        return self.cursors[game_id]
+
+    def get_live_games(self):
+        """
+        :return: A list of active game IDs from today's scoreboard.
+        """
+        response = self.session.get(f"{self.base_url}/scoreboard/todaysScoreboard_00.json", timeout=self.timeout)
+        response.raise_for_status()
+        games = response.json()["scoreboard"]["games"]
+        return [game["gameId"] for game in games if game["gameStatusText"] != "Final"]
+
+    def fetch_actions(self, game_id):
+        """
+        Conditionally fetches a game's play-by-play.
+        :return: Full action list, or None when the feed has not changed.
+        """
+        cursor = self.cursor(game_id)
+        headers = {}
+        if cursor.etag:
+            headers["If-None-Match"] = cursor.etag
+        if cursor.last_modified:
+            headers["If-Modified-Since"] = cursor.last_modified
+
+        self.stats["requests"] += 1
+        response = self.session.get(f"{self.base_url}/playbyplay/playbyplay_{game_id}.json",
+                                    headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+            return None
+        response.raise_for_status()
+
+        cursor.etag = response.headers.get("ETag")
+        cursor.last_modified = response.headers.get("Last-Modified")
+        return response.json().get("game", {}).get("actions", [])
+
+    def append_log(self, game_id, actions):
+        path = self.log_path(game_id)
+        if path is None:
+            return
+        # Recorded logs don't all share LIVE_COLUMNS' order, so append in the file's own column order
+        fieldnames = None
+        if os.path.exists(path):
+            with open(path, newline="") as f:
+                fieldnames = next(csv.reader(f), None)
+        write_header = not fieldnames
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames or LIVE_COLUMNS, extrasaction="ignore")
+            if write_header:
+                writer.writeheader()
+            writer.writerows(actions)
+
+    def poll_game(self, game_id):
+        """
+        Polls one game and emits whatever changed since the last poll.
+        :return: Number of actions emitted.
+        """
+        try:
+            actions = self.fetch_actions(game_id)
+        except (RequestException, json.decoder.JSONDecodeError) as e:
+            print(f"❌ Error polling Game ID {game_id}: {e}")
+            return 0
+        if actions is None:
+            return 0
+
+        changes = self.cursor(game_id).diff(actions)
+        if not changes:
+            return 0
+
+        self.append_log(game_id, [action for action, _ in changes])
+        for action, is_edit in changes:
+            self.stats["edited" if is_edit else "new"] += 1
+            self.events.put({**action, "gameId": game_id, "is_edit": is_edit})
+        return len(changes)
+
+    def poll_once(self, game_ids=None):
+        """
+        Runs one polling round over the given games (or every live game).
+        :return: Total number of actions emitted.
+        """
+        if game_ids is None:
+            game_ids = self.get_live_games()
+        return sum(self.poll_game(game_id) for game_id in game_ids)
+
+    def run(self, interval=POLL_INTERVAL, game_ids=None):
+        """
+        Polls forever (until interrupted), sleeping `interval` seconds between rounds.
+        """
+        while True:
+            start = time.monotonic()
+            try:
+                emitted = self.poll_once(game_ids)
+                if emitted:
+                    print(f"🆕 {emitted} new/edited actions")
+            except RequestException as e:
+                print(f"❌ Error fetching the scoreboard: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
@@ -1,22 +1,25 @@
 import pandas as pd
 
+from encoding_repair import read_clean_csv, write_clean_csv
+from near_duplicates import drop_near_duplicates, print_cluster_report
+
 original_file = "data/final_training_data.csv"
 new_file = "data/targeted_events_for_labeling_v2.csv"
 output_file = "data/final_training_data_v2.csv"
 
-# Read original CSV safely
-with open(original_file, "r", encoding="utf-8", errors="replace") as f:
-    original_df = pd.read_csv(f)
-
-# Read new labeled CSV safely
-with open(new_file, "r", encoding="utf-8", errors="replace") as f:
-    new_df = pd.read_csv(f)
+# Read both CSVs without replacing undecodable bytes; double-encoded text is repaired
+# unless the file is flagged clean (final_training_data.csv is, by merge_labeled_data.py)
+original_df = read_clean_csv(original_file)
+new_df = read_clean_csv(new_file)
 
-# Combine and deduplicate
+# Combine and drop near-duplicates, not only exact (structured_event, natural_description) repeats
 combined_df = pd.concat([original_df, new_df], ignore_index=True)
-combined_df = combined_df.drop_duplicates(subset=["structured_event", "natural_description"])
+columns = ["structured_event", "natural_description"]
+deduplicated_df, duplicates = drop_near_duplicates(combined_df, columns)
+print_cluster_report(duplicates, combined_df, columns)
+combined_df = deduplicated_df
 
 # Save merged dataset
-combined_df.to_csv(output_file, index=False)
+write_clean_csv(combined_df, output_file)
 
 print("✅ Merged training dataset saved to:", output_file)
\ No newline at end of file
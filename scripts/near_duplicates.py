@@ -0,0 +1,244 @@
+import argparse
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from commentary_cache import name_spans
+from event_classifier import classify_events
+
+NUM_PERMUTATIONS = 64  # MinHash signature length
+BANDS = 16  # LSH bands of NUM_PERMUTATIONS // BANDS rows; rows sharing any band become candidates
+THRESHOLD = 0.9  # Estimated Jaccard similarity to a cluster's representative above which a row is a near-duplicate
+SHINGLE_SIZE = 4  # Characters per shingle
+MERSENNE_PRIME = (1 << 61) - 1
+SEED = 42
+
+# Byte sequences left behind by UTF-8 text decoded as MacRoman/cp1252 ("‚Äô", "Ã©", "Â"), and other
+# characters that never carry meaning for deduplication
+ARTIFACTS = re.compile(r"[‚ÄÃÂ€™„¶œ�]+")
+NON_WORD = re.compile(r"[^\w\[\]]+")
+NUMBER = re.compile(r"\d+")
+
+
+def mask_players(text):
+    """
+    "J. Tatum makes a layup" -> "[PLAYER] makes a layup". Teams and numbers (points, shot distances) are kept.
+    """
+    parts, position = [], 0
+    for start, end in name_spans(text):
+        parts += [text[position:start], "[PLAYER]"]
+        position = end
+    return "".join(parts) + text[position:]
+
+
+def normalize_text(text, mask_names=False):
+    """
+    Canonical form for near-duplicate detection: encoding artifacts and accents removed,
+    lower case, punctuation and whitespace collapsed, and (with mask_names) player names
+    replaced by a slot, so rows that only differ in who made the play compare equal.
+    """
+    if not isinstance(text, str):
+        return ""
+    text = ARTIFACTS.sub("", unicodedata.normalize("NFKC", text))
+    if mask_names:
+        text = mask_players(text)
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return NON_WORD.sub(" ", text.lower()).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    :return: uint64 array of CRC32 hashes of the text's character shingles (unique).
+    """
+    if len(text) <= size:
+        return np.array([zlib.crc32(text.encode())], dtype=np.uint64)
+    encoded = text.encode()
+    return np.unique(np.fromiter((zlib.crc32(encoded[i:i + size]) for i in range(len(encoded) - size + 1)),
+                                 dtype=np.uint64))
+
+
+def row_kinds(df, columns, mask_names=False):
+    """
+    What must be equal for two rows to merge: the event type and made/missed outcome of the
+    first column (event_classifier's), every number in the row (points, shot distances, stat
+    counters), unless mask_names the player names, and the normalized labels (the other
+    columns), so paraphrased labels of one event stay separate training examples.
+    """
+    events = df[columns[0]].fillna("").astype(str)
+    texts = row_texts(df, columns)
+    labels = row_texts(df, columns[1:]).map(lambda text: normalize_text(text, mask_names)) if len(columns) > 1 \
+        else pd.Series("", index=df.index)
+    kinds = []
+    for record, text, label in zip(classify_events(events), texts, labels):
+        text = " ".join(text.split())
+        names = None if mask_names else normalize_text(" ".join(text[start:end] for start, end in name_spans(text)))
+        kinds.append((record.event_type, record.missed, tuple(NUMBER.findall(text)), names, label))
+    return kinds
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index over normalized texts. Adding a text costs O(BANDS) bucket lookups
+    plus one signature comparison per candidate, so building over n rows is O(n) instead of
+    comparing all pairs. The first row of a cluster is its representative, and a row only
+    joins a cluster when it is similar to that representative (clusters never chain through
+    intermediate rows) and of the same kind (see row_kinds).
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_permutations=NUM_PERMUTATIONS, bands=BANDS, mask_names=False,
+                 seed=SEED):
+        if num_permutations % bands:
+            raise ValueError(f"{num_permutations} permutations do not split into {bands} bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows_per_band = num_permutations // bands
+        self.mask_names = mask_names
+        rng = np.random.default_rng(seed)
+        # a, b < 2^31 and 32-bit shingle hashes keep a * x + b below 2^64
+        self.a = rng.integers(1, 1 << 31, num_permutations, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, num_permutations, dtype=np.uint64)
+        self.signatures = []
+        self.exact = {}  # (kind, normalized text) -> first row id
+        self.buckets = [{} for _ in range(bands)]  # band -> {(kind, band hash): representative row ids}
+        self.clusters = []  # Row id -> its cluster's representative row id
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def signature(self, normalized):
+        hashes = shingles(normalized)
+        # Min of (a * x + b) mod p per permutation, truncated to 32 bits to halve the index's memory
+        minimums = ((self.a[:, None] * hashes[None, :] + self.b[:, None]) % MERSENNE_PRIME).min(axis=1)
+        return minimums.astype(np.uint32)
+
+    def band_keys(self, signature, kind=None):
+        rows = self.rows_per_band
+        return [(kind, hash(signature[i * rows:(i + 1) * rows].tobytes())) for i in range(self.bands)]
+
+    def _representatives(self, signature, kind):
+        """
+        :return: Sorted ids of cluster representatives of the same kind similar to `signature`.
+        """
+        candidates = {row for bucket, key in zip(self.buckets, self.band_keys(signature, kind))
+                      for row in bucket.get(key, ())}
+        return sorted(row for row in candidates if self.similarity(signature, self.signatures[row]) >= self.threshold)
+
+    def query(self, text, kind=None):
+        """
+        :return: Sorted ids of the cluster representatives `text` is a near-duplicate of.
+        """
+        normalized = normalize_text(text, self.mask_names)
+        if (kind, normalized) in self.exact:
+            return [self.clusters[self.exact[kind, normalized]]]
+        return self._representatives(self.signature(normalized), kind)
+
+    def similarity(self, signature, other):
+        """
+        Estimated Jaccard similarity of two rows' shingle sets.
+        """
+        return float(np.mean(signature == other))
+
+    def add(self, text, kind=None):
+        """
+        Indexes one text, joining the earliest similar cluster of the same kind or starting a new one.
+        :param kind: Rows only merge with rows of the same kind (see row_kinds).
+        :return: The new row id.
+        """
+        row = len(self.clusters)
+        normalized = normalize_text(text, self.mask_names)
+        first = self.exact.setdefault((kind, normalized), row)
+        if first != row:
+            self.signatures.append(self.signatures[first])
+            self.clusters.append(self.clusters[first])
+            return row
+
+        signature = self.signature(normalized)
+        self.signatures.append(signature)
+        representatives = self._representatives(signature, kind)
+        if representatives:
+            self.clusters.append(representatives[0])
+            return row
+        # Only representatives go into the buckets, so later rows are compared with them alone
+        self.clusters.append(row)
+        for bucket, key in zip(self.buckets, self.band_keys(signature, kind)):
+            bucket.setdefault(key, []).append(row)
+        return row
+
+    def add_all(self, texts, kinds=None):
+        kinds = [None] * len(texts) if kinds is None else kinds
+        return [self.add(text, kind) for text, kind in zip(texts, kinds)]
+
+    def cluster_ids(self):
+        """
+        :return: Array mapping each row id to its cluster's representative row id.
+        """
+        return np.array(self.clusters, dtype=np.int64)
+
+
+def row_texts(df, columns):
+    return df[list(columns)].astype(str).agg(" || ".join, axis=1)
+
+
+def drop_near_duplicates(df, columns, index=None, **kwargs):
+    """
+    Keeps the first row of every near-duplicate cluster over `columns`. The first column is the
+    event text whose event type and outcome must match for rows to merge (see row_kinds).
+    :param index: Optional NearDuplicateIndex already holding earlier rows (e.g. the previous
+                  merge's output); rows of df that duplicate those are dropped as well.
+    :return: (deduplicated frame, cluster report frame with one row per dropped duplicate)
+    """
+    index = NearDuplicateIndex(**kwargs) if index is None else index
+    offset = len(index)
+    index.add_all(row_texts(df, columns).tolist(), row_kinds(df, columns, index.mask_names))
+    roots = index.cluster_ids()[offset:]
+    keep = roots == np.arange(offset, offset + len(df))
+
+    dropped = np.flatnonzero(~keep)
+    report = pd.DataFrame({
+        "cluster": roots[dropped],
+        "representative": [int(r - offset) if r >= offset else None for r in roots[dropped]],
+        "duplicate": dropped,
+    })
+    for column in columns:
+        report[f"duplicate_{column}"] = df[column].to_numpy()[dropped]
+    return df[keep], report
+
+
+def print_cluster_report(report, df, columns, top=10):
+    """
+    Prints how many rows near-duplicate detection removed and the largest clusters.
+    """
+    if report.empty:
+        print("✅ No near-duplicates found.")
+        return
+    sizes = report["cluster"].value_counts()
+    print(f"🧹 {len(report):,} near-duplicate rows in {len(sizes):,} clusters; largest:")
+    for cluster, count in sizes.head(top).items():
+        representative = report.loc[report["cluster"] == cluster, "representative"].iloc[0]
+        text = " || ".join(str(df[column].iloc[int(representative)]) for column in columns) \
+            if pd.notna(representative) else f"(row {cluster} of the existing index)"
+        print(f"   {count + 1:>6,} x {text[:100]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge labeled CSVs, keeping one row per near-duplicate cluster.")
+    parser.add_argument("inputs", nargs="+", help="Labeled CSVs, in priority order (earlier rows are kept)")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--columns", nargs="+", default=["structured_event", "natural_description"])
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--mask-names", action="store_true",
+                        help="Treat rows that only differ in player names as duplicates")
+    parser.add_argument("--report", help="CSV to write the dropped duplicates and their clusters to")
+    args = parser.parse_args()
+
+    merged = pd.concat([pd.read_csv(path) for path in args.inputs], ignore_index=True)
+    deduplicated, report = drop_near_duplicates(merged, args.columns, threshold=args.threshold,
+                                                mask_names=args.mask_names)
+    print_cluster_report(report, merged, args.columns)
+    if args.report:
+        report.to_csv(args.report, index=False)
+    deduplicated.to_csv(args.output, index=False, encoding="utf-8")
+    print(f"✅ {len(deduplicated):,} of {len(merged):,} rows saved to {args.output}")
@@ -0,0 +1,134 @@
+import re
+from collections import Counter
+
+import pandas as pd
+
+# Rules are applied in order. `requires` lists literals that must appear in a row
+# for the pattern to possibly match, so each regex only runs on candidate rows.
+EVENT_DESCRIPTION_RULES = [
+    {
+        "name": "missed_shot",
+        "pattern": r"MISS (\w+) (\d+)' (\w+)",
+        "replacement": r"\1 attempts a \2-foot \3 but misses.",
+        "requires": ["MISS "],
+    },
+    {
+        "name": "made_shot",
+        "pattern": r"(\w+) (\d+)' (\w+)",
+        "replacement": r"\1 sinks a \2-foot \3.",
+        "requires": ["' "],
+    },
+    {
+        "name": "rebound",
+        "pattern": r"(\w+) REBOUND",
+        "replacement": r"\1 grabs the rebound.",
+        "requires": [" REBOUND"],
+    },
+    {
+        "name": "steal_turnover",
+        "pattern": r"(\w+) STEAL (\w+) Lost Ball Turnover",
+        "replacement": r"\1 steals the ball from \2.",
+        "requires": [" STEAL ", " Lost Ball Turnover"],
+    },
+    {
+        "name": "offensive_foul",
+        "pattern": r"(\w+) OFF.Foul",
+        "replacement": r"\1 commits an offensive foul.",
+        "requires": [" OFF"],
+    },
+]
+
+
+class NormalizationEngine:
+    """
+    Applies a list of regex rules to whole columns at once.
+    Rules are compiled once; `hits` counts how many rows each rule changed.
+    """
+
+    def __init__(self, rules=EVENT_DESCRIPTION_RULES):
+        self.rules = [
+            {**rule, "regex": re.compile(rule["pattern"]), "requires": rule.get("requires", [])}
+            for rule in rules
+        ]
+        self.hits = Counter()
+
+    def apply(self, events):
+        """
+        Normalizes a column of raw event descriptions.
+        Matches clean_event_description row for row: blank/missing rows become None.
+        :param events: Series of raw event descriptions.
+        :return: Series of cleaned descriptions.
+        """
+        events = events.str.strip()
+        events = events.where(events.notna() & (events != ""), None)
+
+        for rule in self.rules:
+            mask = events.notna()
+            for literal in rule["requires"]:
+                mask &= events.str.contains(literal, regex=False, na=False)
+            if not mask.any():
+                continue
+
+            candidates = events[mask]
+            replaced = candidates.str.replace(rule["regex"], rule["replacement"], regex=True)
+            changed = replaced != candidates
+            self.hits[rule["name"]] += int(changed.sum())
+            events = events.copy()
+            events[mask] = replaced.to_numpy()
+
+        self.hits["rows"] += len(events)
+        return events
+
+    def report(self, hits=None):
+        """
+        :param hits: Counts to report instead of this engine's own (e.g. summed across workers).
+        :return: Printable per-rule hit counts.
+        """
+        hits = self.hits if hits is None else hits
+        total = hits["rows"] or 1
+        names = [rule["name"] for rule in self.rules]
+        names += sorted(name for name in hits if name not in names and name != "rows")
+        lines = [f"📊 Normalization rule hits over {hits['rows']} rows:"]
+        for name in names:
+            lines.append(f"   {name:<18} {hits[name]:>9} ({100 * hits[name] / total:.1f}%)")
+        return "\n".join(lines)
+
+
+def as_text(df, column):
+    """
+    Column as text the way `str(row.get(column, "") or "")` reads it: missing values become "nan".
+    """
+    if column not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[column].astype(object).map(str)
+
+
+def structure_live_events(df, team_names, hits=None):
+    """
+    Vectorized version of preprocess_event in preprocess_live_playbyplay.py:
+    expands "TEAM"/tricodes in the description to the team name and prefixes the tricode.
+    :param df: Live play-by-play rows.
+    :param team_names: Dict of tricode -> team name.
+    :param hits: Optional Counter that receives the "team_name" hit count.
+    :return: Series of structured events.
+    """
+    descriptions = as_text(df, "description")
+    teams = as_text(df, "teamTricode")
+
+    # Only rows mentioning "TEAM" or their own tricode can change
+    mentions_team = descriptions.str.contains("TEAM", regex=False)
+    for team in teams.unique():
+        if team == "":
+            continue
+        full_name = team_names.get(team, team)
+        in_team = (teams == team).to_numpy(copy=True)
+        group = descriptions[in_team]
+        rows = (mentions_team[in_team] | group.str.contains(team, regex=False)).to_numpy()
+        if rows.any():
+            replaced = group[rows].str.replace("TEAM", full_name, regex=False).str.replace(team, full_name, regex=False)
+            if hits is not None:
+                hits["team_name"] += int((replaced != group[rows]).sum())
+            in_team[in_team] = rows
+            descriptions[in_team] = replaced.to_numpy()
+
+    return (teams + ": " + descriptions).where(teams != "", descriptions)
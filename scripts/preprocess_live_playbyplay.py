@@ -1,5 +1,8 @@
 import os
 import pandas as pd
+from collections import Counter
+from game_clock import parse_game_clock
+from normalization_engine import structure_live_events
 
 INPUT_FOLDER = "data"
 OUTPUT_FILE = "data/preprocessed_live_playbyplay.csv"
@@ -19,6 +22,9 @@ def load_and_merge_data():
         if file.startswith("live_playbyplay_") and file.endswith(".csv"):
             game_id = file.replace("live_playbyplay_", "").replace(".csv", "")
             df = pd.read_csv(os.path.join(INPUT_FOLDER, file))
+            # The live poller appends edited actions again; keep the latest version
+            if "actionNumber" in df.columns:
+                df = df.drop_duplicates(subset=["actionNumber"], keep="last")
             df["gameId"] = game_id  # Extract from filename
             dfs.append(df)
     return pd.concat(dfs, ignore_index=True)
@@ -33,14 +39,18 @@ def preprocess_event(row):
 
     return f"{team_abbr}: {desc}" if team_abbr else desc
 
-# Load and preprocess
-df = load_and_merge_data()
-df["time_remaining"] = df.get("clock", "")
-df["structured_event"] = df.apply(preprocess_event, axis=1)
-
-# Sort and reset index
-df = df.sort_values(by=["gameId", "period", "clock"], ascending=[True, True, False])
-df = df[["time_remaining", "structured_event"]]
-df.to_csv(OUTPUT_FILE, index=False)
-
-print(f"✅ Preprocessed play-by-play data saved to {OUTPUT_FILE}")
\ No newline at end of file
+if __name__ == "__main__":
+    # Load and preprocess (column-wise equivalent of df.apply(preprocess_event, axis=1))
+    df = load_and_merge_data()
+    df["time_remaining"] = df.get("clock", "")
+    hits = Counter()
+    df["structured_event"] = structure_live_events(df, team_name_map, hits)
+    print(f"📊 Team names expanded in {hits['team_name']} of {len(df)} events")
+
+    # Sort by elapsed game time (the raw "PT11M57.00S" strings only sort by accident); ties keep feed order
+    df["elapsed"] = parse_game_clock(df["clock"], df["period"])
+    df = df.sort_values(by=[c for c in ("gameId", "elapsed", "orderNumber") if c in df.columns], kind="stable")
+    df = df[["time_remaining", "structured_event"]]
+    df.to_csv(OUTPUT_FILE, index=False)
+
+    print(f"✅ Preprocessed play-by-play data saved to {OUTPUT_FILE}")
@@ -1,10 +1,18 @@
+import argparse
+import hashlib
+import json
 import os
 import pandas as pd
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from normalization_engine import NormalizationEngine
 
 # Folder where play-by-play data is stored
 DATA_DIR = "data/"
 OUTPUT_FILE = "data/preprocessed_playbyplay.csv"
+MANIFEST_FILE = "data/preprocessed_playbyplay_manifest.json"
+OUTPUT_COLUMNS = ['time_remaining', 'event_description']
 
 def clean_event_description(event):
     """
@@ -34,46 +42,169 @@ def clean_event_description(event):
 
     return event
 
-def preprocess_pbp_data():
+def list_input_files(data_dir=DATA_DIR):
     """
-    Reads all play-by-play files, processes them, and saves a structured dataset.
+    :return: Sorted play-by-play file names, so every run concatenates games in the same order.
+    """
+    return sorted(f for f in os.listdir(data_dir) if f.startswith("playbyplay_") and f.endswith(".csv"))
+
+def file_hash(file_path):
+    sha1 = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+def preprocess_game_file(file_path):
     """
-    all_data = []
+    Preprocesses a single play-by-play file.
+    :param file_path: Path to a data/playbyplay_<GAME_ID>.csv file.
+    :return: (DataFrame with OUTPUT_COLUMNS or None if the file has no V2 events, content hash, rule hits)
+    """
+    engine = NormalizationEngine()
+
+    # Read CSV file
+    df = pd.read_csv(file_path)
 
-    # Loop through all play-by-play files
-    for filename in os.listdir(DATA_DIR):
-        if filename.startswith("playbyplay_") and filename.endswith(".csv"):
-            file_path = os.path.join(DATA_DIR, filename)
-            print(f"🔄 Processing {filename}...")
+    # Files written by the old live fetcher have no home/away columns; preprocess_live_playbyplay.py covers those
+    if not {'home_event', 'away_event'}.issubset(df.columns):
+        return None, file_hash(file_path), engine.hits
 
-            # Read CSV file
-            df = pd.read_csv(file_path)
+    # Keep only relevant columns
+    df = df[['time_remaining', 'quarter', 'home_event', 'away_event']].dropna(how="all")
 
-            # Keep only relevant columns
-            df = df[['time_remaining', 'quarter', 'home_event', 'away_event']].dropna(how="all")
+    # Convert timestamps into readable format (e.g., "Q3 - 10:45")
+    df['time_remaining'] = df['quarter'].apply(lambda q: f"Q{q}") + " - " + df['time_remaining']
 
-            # Convert timestamps into readable format (e.g., "Q3 - 10:45")
-            df['time_remaining'] = df['quarter'].apply(lambda q: f"Q{q}") + " - " + df['time_remaining']
+    # Merge home & away event descriptions
+    df['event_description'] = df['home_event'].fillna('') + df['away_event'].fillna('')
+    df['event_description'] = engine.apply(df['event_description'])
 
-            # Merge home & away event descriptions
-            df['event_description'] = df['home_event'].fillna('') + df['away_event'].fillna('')
-            df['event_description'] = df['event_description'].apply(clean_event_description)
+    # Remove empty event descriptions
+    df = df.dropna(subset=['event_description'])
 
-            # Remove empty event descriptions
-            df = df.dropna(subset=['event_description'])
+    # Keep only necessary columns
+    return df[OUTPUT_COLUMNS], file_hash(file_path), engine.hits
 
-            # Keep only necessary columns
-            df = df[['time_remaining', 'event_description']]
-            
-            all_data.append(df)
+def load_manifest(manifest_file):
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            return json.load(f)
+    return {"output_file": None, "files": {}}
+
+def find_changed_files(filenames, manifest, data_dir):
+    """
+    Compares the input files against the manifest.
+    Files whose mtime/size changed are hashed, so a touched but unchanged file is not reprocessed.
+    :return: Set of file names that need to be (re)processed.
+    """
+    changed = set()
+    for filename in filenames:
+        entry = manifest["files"].get(filename)
+        stat = os.stat(os.path.join(data_dir, filename))
+        if entry is None:
+            changed.add(filename)
+        elif entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+            if file_hash(os.path.join(data_dir, filename)) != entry["sha1"]:
+                changed.add(filename)
+            else:
+                entry["mtime"], entry["size"] = stat.st_mtime, stat.st_size
+    return changed
+
+def load_previous_games(manifest, output_file):
+    """
+    Splits the previous output back into per-file frames using the row counts in the manifest.
+    :return: Dict of file name -> DataFrame.
+    """
+    previous = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+    games, start = {}, 0
+    for filename, entry in manifest["files"].items():
+        games[filename] = previous.iloc[start:start + entry["rows"]]
+        start += entry["rows"]
+    return games
+
+def preprocess_pbp_data(data_dir=DATA_DIR, output_file=OUTPUT_FILE, manifest_file=MANIFEST_FILE,
+                        incremental=True, max_workers=None):
+    """
+    Reads all play-by-play files, processes them, and saves a structured dataset.
+    Games are processed across a process pool. With `incremental`, only files that are
+    new or changed since the last run are processed and their rows are merged into the
+    previous output, which gives the same file as a full run.
+    :return: Number of files processed in this run.
+    """
+    filenames = list_input_files(data_dir)
+    manifest = load_manifest(manifest_file)
 
-    # Concatenate all processed data
-    if all_data:
-        final_df = pd.concat(all_data, ignore_index=True)
-        final_df.to_csv(OUTPUT_FILE, index=False)
-        print(f"✅ Preprocessed data saved to {OUTPUT_FILE}")
+    can_reuse = incremental and manifest["output_file"] == output_file and os.path.exists(output_file)
+    if can_reuse:
+        changed = find_changed_files(filenames, manifest, data_dir)
+        removed = set(manifest["files"]) - set(filenames)
     else:
-        print("❌ No valid play-by-play data found.")
+        manifest = {"output_file": output_file, "files": {}}
+        changed, removed = set(filenames), set()
+
+    if not changed and not removed:
+        with open(manifest_file, "w") as f:
+            json.dump(manifest, f)
+        print("✅ Preprocessed data is up to date.")
+        return 0
+
+    # Process new/changed games across a pool of worker processes
+    to_process = [f for f in filenames if f in changed]
+    print(f"🔄 Processing {len(to_process)} of {len(filenames)} files...")
+    paths = [os.path.join(data_dir, f) for f in to_process]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(to_process, pool.map(preprocess_game_file, paths, chunksize=16)))
+
+    hits = Counter()
+    for filename, (df, _, file_hits) in results.items():
+        hits.update(file_hits)
+        if df is None:
+            print(f"⚠️ Skipping {filename}: not in the V2 play-by-play format.")
+    print(NormalizationEngine().report(hits))
+
+    # Fast path: only new games that sort after everything already written can simply be appended
+    previous_names = list(manifest["files"])
+    append_only = can_reuse and not removed and not (changed & set(previous_names)) \
+        and (not previous_names or min(to_process) > previous_names[-1])
+
+    if append_only:
+        new_frames = [results[f][0] for f in to_process if results[f][0] is not None]
+        if new_frames:
+            pd.concat(new_frames, ignore_index=True).to_csv(output_file, mode="a", header=False, index=False)
+    else:
+        previous = load_previous_games(manifest, output_file) if can_reuse else {}
+        all_data = []
+        for filename in filenames:
+            df = results[filename][0] if filename in results else previous[filename]
+            if df is not None:
+                all_data.append(df)
+        if not all_data:
+            print("❌ No valid play-by-play data found.")
+            return len(to_process)
+        pd.concat(all_data, ignore_index=True).to_csv(output_file, index=False)
+
+    # Record what each input looked like and how many rows it produced
+    files = {}
+    for filename in filenames:
+        if filename in results:
+            df, sha1, _ = results[filename]
+            stat = os.stat(os.path.join(data_dir, filename))
+            files[filename] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha1": sha1,
+                               "rows": 0 if df is None else len(df)}
+        else:
+            files[filename] = manifest["files"][filename]
+    manifest["files"] = files
+    with open(manifest_file, "w") as f:
+        json.dump(manifest, f)
+
+    print(f"✅ Preprocessed data saved to {output_file}")
+    return len(to_process)
 
 if __name__ == "__main__":
-    preprocess_pbp_data()
+    parser = argparse.ArgumentParser(description="Preprocess play-by-play CSVs into a single dataset.")
+    parser.add_argument("--full", action="store_true", help="Reprocess every file instead of only new/changed ones.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores).")
+    args = parser.parse_args()
+
+    preprocess_pbp_data(incremental=not args.full, max_workers=args.workers)
@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+DATA_DIR = "data/"
+SPEEDS = (1, 10, 100)
+EDIT_THRESHOLD = 2.0  # `edited` only has whole seconds; later stamps are replayed as corrections
+
+PLAYBYPLAY_PATTERN = re.compile(r"/playbyplay/playbyplay_(\w+)\.json$")
+SCOREBOARD_PATTERN = re.compile(r"/scoreboard/todaysScoreboard_00\.json$")
+
+
+def load_recorded_game(file_path):
+    """
+    Reads one data/live_playbyplay_<GAME_ID>.csv log.
+    :return: List of action dicts in feed order, latest version of each action.
+    """
+    df = pd.read_csv(file_path)
+    df = df.drop_duplicates(subset=["actionNumber"], keep="last").sort_values("orderNumber", kind="stable")
+    return json.loads(df.to_json(orient="records"))
+
+
+def list_recorded_games(data_dir=DATA_DIR):
+    """
+    :return: Dict of game ID -> path of every recorded live log.
+    """
+    return {
+        file[len("live_playbyplay_"):-len(".csv")]: os.path.join(data_dir, file)
+        for file in sorted(os.listdir(data_dir))
+        if file.startswith("live_playbyplay_") and file.endswith(".csv")
+    }
+
+
+class ReplayGame:
+    """
+    A recorded game on a replay timeline. Each action appears at its `timeActual`
+    offset from the first action, divided by `speed`; when the recorded `edited`
+    stamp is later, the action first appears with a preliminary stamp and is
+    corrected at the `edited` offset, so pollers see it as an edit.
+    """
+
+    def __init__(self, game_id, actions, speed=1, start=None):
+        self.game_id = game_id
+        self.speed = speed
+        self.start = time.time() if start is None else start
+        self.actions = actions
+
+        stamps = pd.to_datetime(pd.Series([a["timeActual"] for a in actions]), utc=True)
+        edits = pd.to_datetime(pd.Series([a["edited"] for a in actions]), utc=True)
+        origin = stamps.min()
+        self.appear_at = ((stamps - origin).dt.total_seconds() / speed).tolist()
+        self.edit_at = [
+            (edit - origin).total_seconds() / speed if (edit - stamp).total_seconds() > EDIT_THRESHOLD else None
+            for stamp, edit in zip(stamps, edits)
+        ]
+        self.preliminary = [
+            {**action, "edited": action["timeActual"][:19] + "Z"} if edit_at is not None else action
+            for action, edit_at in zip(actions, self.edit_at)
+        ]
+        self.duration = max(self.appear_at + [t for t in self.edit_at if t is not None])
+
+    def releases(self):
+        """
+        :return: List of (actionNumber, is_edit, wall-clock time the change becomes visible).
+        """
+        releases = []
+        for action, appear_at, edit_at in zip(self.actions, self.appear_at, self.edit_at):
+            releases.append((action["actionNumber"], False, self.start + appear_at))
+            if edit_at is not None:
+                releases.append((action["actionNumber"], True, self.start + edit_at))
+        return releases
+
+    def finished(self, now=None):
+        return (time.time() if now is None else now) - self.start >= self.duration
+
+    def snapshot(self, now=None):
+        """
+        :return: (actions visible at `now` in feed order, version that changes with every release)
+        """
+        elapsed = (time.time() if now is None else now) - self.start
+        visible, edits = [], 0
+        for action, preliminary, appear_at, edit_at in zip(self.actions, self.preliminary, self.appear_at,
+                                                           self.edit_at):
+            if appear_at > elapsed:
+                continue
+            if edit_at is not None and edit_at <= elapsed:
+                visible.append(action)
+                edits += 1
+            else:
+                visible.append(preliminary)
+        return visible, f"{len(visible)}.{edits}"
+
+    def scoreboard_entry(self, now=None):
+        visible, _ = self.snapshot(now)
+        last = visible[-1] if visible else {}
+        status = 3 if self.finished(now) else 2 if visible else 1
+        return {
+            "gameId": self.game_id,
+            "gameStatus": status,
+            "gameStatusText": {1: "Scheduled", 2: f"Q{last.get('period')} Live", 3: "Final"}[status],
+            "period": last.get("period") or 0,
+            "gameClock": last.get("clock") or "",
+            "homeTeam": {"score": last.get("scoreHome") or 0},
+            "awayTeam": {"score": last.get("scoreAway") or 0},
+        }
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in for the live CDN: play-by-play and today's scoreboard, with ETags so
+    conditional requests get 304 until the game's next release.
+    """
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        path = self.path.split("?")[0]
+        match = PLAYBYPLAY_PATTERN.search(path)
+        if match:
+            game = self.server.games.get(match.group(1))
+            if game is None:
+                self.send_error(404)
+                return
+            actions, version = game.snapshot()
+            etag = f'"{game.game_id}-{version}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_json({"game": {"gameId": game.game_id, "actions": actions}}, etag)
+        elif SCOREBOARD_PATTERN.search(path):
+            now = time.time()
+            games = [game.scoreboard_entry(now) for game in self.server.games.values()]
+            self.send_json({"scoreboard": {"games": games}})
+        else:
+            self.send_error(404)
+
+    def send_json(self, payload, etag=None):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def build_replay_games(copies=1, speed=1, stagger=0.0, data_dir=DATA_DIR, start=None):
+    """
+    Puts every recorded game on a replay timeline, `copies` times over.
+    Copies after the first get a "_NN" suffix so many concurrent games can be simulated.
+    :param stagger: Seconds between the start of consecutive games.
+    :return: Dict of game ID -> ReplayGame.
+    """
+    start = time.time() if start is None else start
+    recorded = {game_id: load_recorded_game(path) for game_id, path in list_recorded_games(data_dir).items()}
+    games = {}
+    for copy in range(copies):
+        for game_id, actions in recorded.items():
+            replay_id = game_id if copy == 0 else f"{game_id}_{copy:02d}"
+            games[replay_id] = ReplayGame(replay_id, actions, speed, start + len(games) * stagger)
+    return games
+
+
+def start_replay_server(games, latency=0.0, host="127.0.0.1", port=0):
+    """
+    Serves `games` on a background thread.
+    :param latency: Seconds added to every response, to mimic the CDN round trip.
+    :return: (server, base URL to use as the live feed base URL)
+    """
+    server = ThreadingHTTPServer((host, port), ReplayHandler)
+    server.daemon_threads = True
+    server.games = games
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded live games through a local live-feed stand-in.")
+    parser.add_argument("--speed", type=float, default=1, help=f"Replay speed, e.g. one of {SPEEDS}.")
+    parser.add_argument("--copies", type=int, default=1, help="How many times to replay each recorded game.")
+    parser.add_argument("--stagger", type=float, default=0.0, help="Seconds between game starts.")
+    parser.add_argument("--port", type=int, default=8800)
+    args = parser.parse_args()
+
+    games = build_replay_games(args.copies, args.speed, args.stagger)
+    server, base_url = start_replay_server(games, port=args.port)
+    longest = max(game.duration for game in games.values())
+    print(f"🏀 Replaying {len(games)} games at {args.speed:g}x on {base_url} ({longest / 60:.1f} min)")
+    print(f"   e.g. LIVE_BASE_URL={base_url} uvicorn main:app")
+    try:
+        while not all(game.finished() for game in games.values()):
+            time.sleep(1)
+        print("✅ All games final.")
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
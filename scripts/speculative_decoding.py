@@ -0,0 +1,232 @@
+import argparse
+import time
+from collections import Counter, defaultdict
+
+import pandas as pd
+import torch
+from transformers.modeling_outputs import BaseModelOutput
+
+from event_classifier import SLOTS, TEMPLATE_SETS, classify_any_event
+from inference import (COMMENTARY_MODEL_DIR, TASK_PREFIXES, QuantizedT5Generator, T5Generator,
+                       is_quantized_export)
+
+DRAFT_TOKENS = 16  # Most draft tokens checked per decoder pass
+NGRAM_ORDER = 3  # Tokens of context (order - 1) used to continue a draft after a mismatch
+NGRAM_FILE = "data/training_data.csv"  # train_t5.py's labels
+NGRAM_TEXTS = 200_000  # Distinct commentary strings the n-gram table is built from
+
+
+def template_drafts(event):
+    """
+    Every commentary the template engine could render for `event` (render_commentary picks one at random).
+    """
+    record = classify_any_event(event)
+    if record.template_key is None:
+        texts = [record.text]
+    else:
+        texts = []
+        for template in TEMPLATE_SETS[record.template_set][record.template_key]:
+            for slot, value in zip(SLOTS, record.slots):
+                template = template.replace(slot, value)
+            texts.append(template)
+    suffix = f" {record.assist} assists." if record.assist else ""
+    return [text + suffix for text in texts]
+
+
+class NgramTable:
+    """
+    Most frequent next token after each (order - 1)-token context of the training commentary.
+    """
+
+    def __init__(self, following, order=NGRAM_ORDER):
+        self.following = following
+        self.order = order
+
+    @classmethod
+    def from_texts(cls, tokenizer, texts, order=NGRAM_ORDER):
+        counts = defaultdict(Counter)
+        for tokens in tokenizer(list(texts)).input_ids:
+            for i in range(order - 1, len(tokens)):
+                counts[tuple(tokens[i - order + 1:i])][tokens[i]] += 1
+        return cls({context: next_tokens.most_common(1)[0][0] for context, next_tokens in counts.items()}, order)
+
+    @classmethod
+    def from_csv(cls, tokenizer, path=NGRAM_FILE, column="ai_commentary", limit=NGRAM_TEXTS, order=NGRAM_ORDER):
+        texts = pd.read_csv(path, usecols=[column])[column].dropna().drop_duplicates().head(limit)
+        return cls.from_texts(tokenizer, texts, order)
+
+    def propose(self, tokens, limit, eos_token_id):
+        context, draft = list(tokens[-(self.order - 1):]), []
+        while len(draft) < limit and len(context) >= self.order - 1:
+            token = self.following.get(tuple(context[-(self.order - 1):]))
+            if token is None:
+                break
+            draft.append(token)
+            context.append(token)
+            if token == eos_token_id:
+                break
+        return draft
+
+
+class TemplateDrafter:
+    """
+    Proposes the tokens the model is likely to write next. In order:
+    1. the rest of a template rendering whose tokens start with what was generated so far;
+    2. after a mismatch, what follows the last generated tokens inside a template rendering
+       (the model picked other words but rejoined the template);
+    3. the training-corpus n-gram continuation, when a table is given.
+    """
+
+    def __init__(self, tokenizer, ngrams=None, task_prefix=TASK_PREFIXES["commentary"]):
+        self.tokenizer = tokenizer
+        self.ngrams = ngrams
+        self.task_prefix = task_prefix
+        self.other_prefixes = [prefix for prefix in TASK_PREFIXES.values() if prefix != task_prefix]
+
+    def candidates(self, text):
+        """
+        :return: Token lists (ending in </s>) of every template rendering, or None for other tasks' inputs.
+        """
+        if any(text.startswith(prefix) for prefix in self.other_prefixes):
+            return None
+        if text.startswith(self.task_prefix):
+            text = text[len(self.task_prefix):]
+        return self.tokenizer(template_drafts(text)).input_ids
+
+    def propose(self, candidates, generated, limit):
+        if candidates is None or limit <= 0:
+            return []
+        n = len(generated)
+        for tokens in candidates:
+            if len(tokens) > n and tokens[:n] == generated:
+                return tokens[n:n + limit]
+        context = NGRAM_ORDER - 1
+        if n >= context:
+            tail = generated[-context:]
+            for tokens in candidates:
+                for i in range(len(tokens) - context - 1, -1, -1):
+                    if tokens[i:i + context] == tail:
+                        return tokens[i + context:i + context + limit]
+        if self.ngrams is not None:
+            return self.ngrams.propose(generated, limit, self.tokenizer.eos_token_id)
+        return []
+
+
+def crop_cache(past_key_values, length):
+    """
+    Drops cached decoder self-attention entries past `length` tokens (the rejected draft).
+    """
+    if hasattr(past_key_values, "crop"):
+        excess = past_key_values.get_seq_length() - length
+        if excess > 0:
+            past_key_values.crop(-excess)
+        return past_key_values
+    # Legacy tuples: (self key, self value, cross key, cross value) per layer
+    return tuple((key[:, :, :length], value[:, :, :length], *cross) for key, value, *cross in past_key_values)
+
+
+class SpeculativeDecoding:
+    """
+    Greedy decoding that checks a drafted continuation with one decoder pass: the draft is fed
+    after the last accepted token, every position's argmax is compared with the draft, the
+    matching prefix is kept plus the model's own token at the first mismatch, and the decoder
+    cache is cropped back to the kept tokens. Each kept token is the model's argmax, so the
+    output is greedy decoding's; a good draft just needs fewer passes. Inputs are decoded one
+    at a time (acceptance differs per input), after one batched encoder pass.
+    """
+
+    def __init__(self, model_dir, drafter=None, draft_tokens=DRAFT_TOKENS, **kwargs):
+        super().__init__(model_dir, **kwargs)
+        self.drafter = drafter or TemplateDrafter(self.tokenizer)
+        self.draft_tokens = draft_tokens
+        self.stats = Counter()  # passes, drafted, accepted, tokens
+
+    def generate(self, texts):
+        """
+        Inputs the drafter has drafts for are decoded speculatively; the rest (other tasks of a
+        multi-task checkpoint) keep batched generate().
+        """
+        texts = list(texts)
+        if self.num_beams != 1:
+            return super().generate(texts)
+        candidates = [self.drafter.candidates(text) for text in texts]
+        drafted = [i for i, candidate in enumerate(candidates) if candidate is not None]
+        plain = [i for i, candidate in enumerate(candidates) if candidate is None]
+        results = [None] * len(texts)
+        if plain:
+            for i, output in zip(plain, super().generate([texts[i] for i in plain])):
+                results[i] = output
+        if drafted:
+            inputs = self.tokenizer([texts[i] for i in drafted], padding=True, truncation=True,
+                                    max_length=self.max_input_length, return_tensors="pt").to(self.device)
+            with torch.inference_mode():
+                hidden = self.model.get_encoder()(**inputs).last_hidden_state
+                outputs = [self._decode(BaseModelOutput(last_hidden_state=hidden[j:j + 1]),
+                                        inputs["attention_mask"][j:j + 1], candidates[i])
+                           for j, i in enumerate(drafted)]
+            for i, output in zip(drafted, self.tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                results[i] = output
+        return results
+
+    def _decode(self, encoder_outputs, attention_mask, candidates):
+        config = self.model.config
+        tokens, past = [config.decoder_start_token_id], None
+        while len(tokens) - 1 < self.max_new_tokens:
+            generated = tokens[1:]
+            limit = min(self.draft_tokens, self.max_new_tokens - len(generated) - 1)
+            draft = self.drafter.propose(candidates, generated, limit)
+            out = self.model(encoder_outputs=encoder_outputs, attention_mask=attention_mask,
+                             decoder_input_ids=torch.tensor([tokens[-1:] + draft], device=self.device),
+                             past_key_values=past, use_cache=True)
+            predicted = out.logits[0].argmax(-1).tolist()
+            accepted = 0
+            while accepted < len(draft) and draft[accepted] == predicted[accepted]:
+                accepted += 1
+            past = crop_cache(out.past_key_values, len(tokens) + accepted)
+            new = draft[:accepted] + [predicted[accepted]]
+            self.stats.update(passes=1, drafted=len(draft), accepted=accepted, tokens=len(new))
+            tokens += new
+            if config.eos_token_id in new:
+                return tokens[:tokens.index(config.eos_token_id, 1) + 1]
+        return tokens
+
+    def snapshot(self):
+        stats = self.stats
+        return {
+            **stats,
+            "acceptance_rate": round(stats["accepted"] / stats["drafted"], 4) if stats["drafted"] else None,
+            "tokens_per_pass": round(stats["tokens"] / stats["passes"], 2) if stats["passes"] else None,
+        }
+
+
+class SpeculativeT5Generator(SpeculativeDecoding, T5Generator):
+    pass
+
+
+class SpeculativeQuantizedT5Generator(SpeculativeDecoding, QuantizedT5Generator):
+    pass
+
+
+def load_speculative_generator(model_dir, drafter=None, **kwargs):
+    """
+    load_generator() counterpart with template-drafted speculative decoding.
+    """
+    if is_quantized_export(model_dir):
+        return SpeculativeQuantizedT5Generator(model_dir, drafter=drafter, **kwargs)
+    return SpeculativeT5Generator(model_dir, drafter=drafter, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate commentary with template-drafted speculative decoding.")
+    parser.add_argument("events", nargs="+")
+    parser.add_argument("--model-dir", default=COMMENTARY_MODEL_DIR)
+    parser.add_argument("--ngrams", action="store_true", help=f"Also draft from n-grams of {NGRAM_FILE}")
+    args = parser.parse_args()
+
+    generator = load_speculative_generator(args.model_dir)
+    if args.ngrams:
+        generator.drafter.ngrams = NgramTable.from_csv(generator.tokenizer)
+    start = time.perf_counter()
+    for event, commentary in zip(args.events, generator.generate(args.events)):
+        print(f"🎙️ {event}\n   {commentary}")
+    print(f"✅ {time.perf_counter() - start:.2f}s, {generator.snapshot()}")
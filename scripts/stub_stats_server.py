@@ -0,0 +1,132 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fetch_engine import FetchEngine, JobLedger, TokenBucket
+
+# Fault injection defaults for the local demo run
+THROTTLE_RATE = 0.2  # Share of requests answered with 429
+TIMEOUT_RATE = 0.1  # Share of requests that hang past the client timeout
+HANG_SECONDS = 2.0
+DEMO_GAMES = 40
+
+PLAYBYPLAY_HEADERS = [
+    "GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "EVENTMSGACTIONTYPE", "PERIOD", "WCTIMESTRING",
+    "PCTIMESTRING", "HOMEDESCRIPTION", "NEUTRALDESCRIPTION", "VISITORDESCRIPTION", "SCORE",
+    "SCOREMARGIN", "PLAYER1_NAME", "PLAYER2_NAME", "PLAYER3_NAME"
+]
+
+
+def fake_playbyplay(game_id, n_events=20):
+    """
+    Builds a small PlayByPlayV2 payload for a game.
+    :return: Dict shaped like the stats.nba.com JSON response.
+    """
+    rows = []
+    for eventnum in range(1, n_events + 1):
+        seconds = 720 - eventnum * 30
+        home = f"Player{eventnum} 12' Jump Shot" if eventnum % 2 else None
+        away = None if eventnum % 2 else f"Player{eventnum} REBOUND (Off:0 Def:1)"
+        rows.append([
+            game_id, eventnum, 1, 1, 1, "7:00 PM", f"{seconds // 60}:{seconds % 60:02d}",
+            home, None, away, None, None, f"Player {eventnum}", None, None
+        ])
+    return {"resultSets": [{"name": "PlayByPlay", "headers": PLAYBYPLAY_HEADERS, "rowSet": rows}]}
+
+
+class StubStatsHandler(BaseHTTPRequestHandler):
+    """
+    Answers /stats/playbyplayv2 like stats.nba.com, randomly injecting 429s and hangs.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        server = self.server
+
+        with server.lock:
+            server.request_count += 1
+            roll = server.rng.random()
+
+        if not url.path.endswith("/playbyplayv2"):
+            self.send_error(404)
+            return
+
+        if roll < server.throttle_rate:
+            with server.lock:
+                server.throttled_count += 1
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if roll < server.throttle_rate + server.timeout_rate:
+            # Hold the connection open so the client read times out
+            time.sleep(server.hang_seconds)
+
+        game_id = parse_qs(url.query).get("GameID", [""])[0]
+        body = json.dumps(fake_playbyplay(game_id)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the demo output readable
+
+
+def start_stub_server(throttle_rate=THROTTLE_RATE, timeout_rate=TIMEOUT_RATE, hang_seconds=HANG_SECONDS, seed=42):
+    """
+    Starts the stub server on a free local port in a background thread.
+    :return: (server, base_url) — call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubStatsHandler)
+    server.daemon_threads = True
+    server.throttle_rate = throttle_rate
+    server.timeout_rate = timeout_rate
+    server.hang_seconds = hang_seconds
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.throttled_count = 0
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/stats"
+
+
+if __name__ == "__main__":
+    server, base_url = start_stub_server()
+    print(f"🧪 Stub stats server running at {base_url}")
+
+    game_ids = [f"00224{i:05d}" for i in range(1, DEMO_GAMES + 1)]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        ledger_path = os.path.join(output_dir, "ledger.csv")
+
+        # First pass: faults injected, few retries, so some games end up failed
+        limiter = TokenBucket(rate=20.0, max_rate=50.0, min_rate=1.0)
+        engine = FetchEngine(JobLedger(ledger_path), output_dir=output_dir, base_url=base_url, headers={},
+                             max_workers=8, max_retries=2, timeout=0.5, limiter=limiter,
+                             backoff_base=0.05, backoff_cap=0.5)
+        start = time.perf_counter()
+        counts = engine.run(game_ids)
+        print(f"📊 First pass in {time.perf_counter() - start:.2f}s: {counts}, client stats: {engine.stats}")
+
+        # Second pass: a fresh engine resumes from the ledger and only refetches failed games
+        server.throttle_rate, server.timeout_rate = 0.0, 0.0
+        engine = FetchEngine(JobLedger(ledger_path), output_dir=output_dir, base_url=base_url, headers={},
+                             max_workers=8, timeout=0.5, limiter=TokenBucket(rate=20.0, max_rate=50.0))
+        counts = engine.run()
+        print(f"📊 Resumed pass: {counts}, requests sent: {engine.stats['requests']}")
+
+        saved = [f for f in os.listdir(output_dir) if f.startswith("playbyplay_")]
+        print(f"✅ {len(saved)}/{len(game_ids)} games saved, server saw {server.request_count} requests "
+              f"({server.throttled_count} throttled)")
+
+    server.shutdown()
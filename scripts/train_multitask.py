@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+
+from transformers import T5Tokenizer, T5ForConditionalGeneration, TrainingArguments, DataCollatorForSeq2Seq
+
+from distributed_training import batch_arguments, is_main_process, main_process_first, setup_worker
+from inference import MULTITASK_MODEL_DIR, TASK_PREFIXES, TASKS_FILE
+from training_data import TokenBudgetTrainer, length_report, load_tokenized_splits, mix_tasks
+
+# Training CSV and (source, target) columns per task
+TASK_DATA = {
+    "rewrite": ("data/final_training_data_v2.csv", "structured_event", "natural_description"),
+    "commentary": ("data/training_data.csv", "input_event", "ai_commentary"),
+}
+TASK_RATIOS = None  # Relative weight per task, e.g. {"rewrite": 0.2, "commentary": 0.8}; None mixes by data size
+MAX_BATCH_TOKENS = None  # e.g. 4096 to batch by padded tokens instead of 8 examples
+
+
+def parse_ratios(values):
+    """
+    ["rewrite=0.3", "commentary=0.7"] -> {"rewrite": 0.3, "commentary": 0.7}; no values -> TASK_RATIOS.
+    """
+    if not values:
+        return TASK_RATIOS
+    ratios = {}
+    for value in values:
+        task, _, ratio = value.partition("=")
+        if task not in TASK_DATA:
+            raise ValueError(f"Unknown task {task!r}, expected one of {sorted(TASK_DATA)}")
+        ratios[task] = float(ratio)
+    missing = sorted(set(TASK_DATA) - set(ratios))
+    if missing:
+        raise ValueError(f"--ratios needs a ratio for every task; missing {missing} (use 0 to leave one out)")
+    return ratios
+
+
+def task_files(args):
+    files = dict(TASK_DATA)
+    if args.rewrite_data:
+        files["rewrite"] = (args.rewrite_data,) + files["rewrite"][1:]
+    if args.commentary_data:
+        files["commentary"] = (args.commentary_data,) + files["commentary"][1:]
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train one T5 checkpoint for event rewriting and commentary.")
+    parser.add_argument("--ratios", nargs="*", default=[], metavar="TASK=RATIO",
+                        help="Share of training examples per task (default: in proportion to each task's data)")
+    parser.add_argument("--examples", type=int, help="Training examples per epoch (default: all tasks together)")
+    parser.add_argument("--rewrite-data", help=f"CSV for the rewrite task (default {TASK_DATA['rewrite'][0]})")
+    parser.add_argument("--commentary-data", help=f"CSV for the commentary task (default {TASK_DATA['commentary'][0]})")
+    parser.add_argument("--output-dir", default=MULTITASK_MODEL_DIR)
+    parser.add_argument("--epochs", type=float, default=3)
+    args = parser.parse_args()
+    ratios = parse_ratios(args.ratios)
+    setup_worker()  # Thread counts, and the gloo process group when started by distributed_training.py
+
+    tokenizer = T5Tokenizer.from_pretrained("t5-small")
+
+    # Each task is tokenized (and cached) with its prefix, then mixed by ratio
+    train_splits, val_splits = {}, {}
+    for task, (csv_file, source_column, target_column) in task_files(args).items():
+        if ratios is not None and not ratios[task]:
+            continue
+        with main_process_first():
+            train_splits[task], val_splits[task] = load_tokenized_splits(csv_file, source_column, target_column,
+                                                                         tokenizer, prefix=TASK_PREFIXES[task])
+    train_dataset = mix_tasks(train_splits, ratios, args.examples)
+    if is_main_process():
+        shares = ratios or {task: len(split) for task, split in train_splits.items()}
+        print(f"✅ Training on {len(train_dataset)} examples: "
+              + ", ".join(f"{task} {shares[task] / sum(shares.values()):.1%} (of {len(split)})"
+                          for task, split in train_splits.items()))
+        length_report(train_dataset)
+
+    # One shared backbone; the prefix tells it which task to perform
+    model = T5ForConditionalGeneration.from_pretrained("t5-small")
+
+    training_args = TrainingArguments(
+        output_dir=args.output_dir,
+        **batch_arguments(),  # 8 examples per step, split across DDP workers
+        per_device_eval_batch_size=8,
+        eval_strategy="epoch",
+        save_strategy="epoch",
+        train_sampling_strategy="group_by_length",
+        length_column_name="length",
+        num_train_epochs=args.epochs,
+        learning_rate=3e-4,
+        weight_decay=0.01,
+        save_total_limit=1,
+        push_to_hub=False
+    )
+
+    # Eval loss is reported per task (eval_rewrite_loss, eval_commentary_loss)
+    trainer = TokenBudgetTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=val_splits,
+        processing_class=tokenizer,
+        data_collator=DataCollatorForSeq2Seq(tokenizer, model=model),
+        max_batch_tokens=MAX_BATCH_TOKENS,
+    )
+    trainer.train()
+
+    if is_main_process():
+        model.save_pretrained(args.output_dir)
+        tokenizer.save_pretrained(args.output_dir)
+        with open(os.path.join(args.output_dir, TASKS_FILE), "w") as f:
+            json.dump({task: TASK_PREFIXES[task] for task in train_splits}, f, indent=2)
+
+        print(f"✅ Multi-task model training complete. Saved in {args.output_dir} for: {', '.join(train_splits)}")
@@ -1,35 +1,28 @@
 import torch
-import pandas as pd
-from transformers import T5Tokenizer, T5ForConditionalGeneration, Trainer, TrainingArguments, DataCollatorForSeq2Seq
-from datasets import Dataset
-from sklearn.model_selection import train_test_split
+from transformers import T5Tokenizer, T5ForConditionalGeneration, TrainingArguments, DataCollatorForSeq2Seq
+
+from distributed_training import batch_arguments, is_main_process, main_process_first, setup_worker
+from training_data import TokenBudgetTrainer, length_report, load_tokenized_splits
+
+MAX_BATCH_TOKENS = None  # e.g. 4096 to batch by padded tokens instead of 8 examples
+
+# Thread counts, and the gloo process group when started by distributed_training.py
+setup_worker()
 
 # Use MPS backend if available (for Apple Silicon)
 device = "cpu"
 
 print(f"✅ Using device: {device}")
 
-# Load data
-df = pd.read_csv("data/training_data.csv").dropna()
-df = df[df["ai_commentary"] != ""]  # Remove empty labels
-
-# Split into training & validation sets
-train_texts, val_texts, train_labels, val_labels = train_test_split(
-    df["input_event"].tolist(),
-    df["ai_commentary"].tolist(),
-    test_size=0.1, random_state=42
-)
-
 # Load T5 tokenizer
 tokenizer = T5Tokenizer.from_pretrained("t5-small")
 
-# Tokenize the datasets
-def tokenize_data(examples):
-    return tokenizer(examples["input_event"], text_target=examples["ai_commentary"], truncation=True, padding="max_length", max_length=128)
-
-# Convert to Hugging Face dataset
-train_dataset = Dataset.from_dict({"input_event": train_texts, "ai_commentary": train_labels}).map(tokenize_data, batched=True)
-val_dataset = Dataset.from_dict({"input_event": val_texts, "ai_commentary": val_labels}).map(tokenize_data, batched=True)
+# Read, split and tokenize the dataset, or memory-map the result of an earlier run
+with main_process_first():
+    train_dataset, val_dataset = load_tokenized_splits("data/training_data.csv", "input_event", "ai_commentary",
+                                                       tokenizer)
+if is_main_process():
+    length_report(train_dataset)
 
 # Load pre-trained T5 model and move to MPS
 model = T5ForConditionalGeneration.from_pretrained("t5-small").to(device)
@@ -37,11 +30,12 @@ model = T5ForConditionalGeneration.from_pretrained("t5-small").to(device)
 # Define training arguments
 training_args = TrainingArguments(
     output_dir="./t5-commentary",
-    per_device_train_batch_size=8,
+    **batch_arguments(),  # 8 examples per step, split across DDP workers
     per_device_eval_batch_size=8,
-    evaluation_strategy="epoch",
+    eval_strategy="epoch",
     save_strategy="epoch",
-    logging_dir="./logs",
+    train_sampling_strategy="group_by_length",  # Batch examples of similar length to cut padding
+    length_column_name="length",
     num_train_epochs=3,
     learning_rate=3e-4,
     weight_decay=0.01,
@@ -50,20 +44,22 @@ training_args = TrainingArguments(
 )
 
 # Initialize Trainer
-trainer = Trainer(
+trainer = TokenBudgetTrainer(
     model=model.to(device),  # Move model to MPS
     args=training_args,
     train_dataset=train_dataset,
     eval_dataset=val_dataset,
-    tokenizer=tokenizer,
+    processing_class=tokenizer,
     data_collator=DataCollatorForSeq2Seq(tokenizer, model=model),
+    max_batch_tokens=MAX_BATCH_TOKENS,
 )
 
 # Train the model
 trainer.train()
 
-# Save model and tokenizer
-model.save_pretrained("./t5-commentary")
-tokenizer.save_pretrained("./t5-commentary")
+# Save model and tokenizer (once, from the first DDP worker)
+if is_main_process():
+    model.save_pretrained("./t5-commentary")
+    tokenizer.save_pretrained("./t5-commentary")
 
-print("✅ Model training complete. Saved in ./t5-commentary")
+    print("✅ Model training complete. Saved in ./t5-commentary")
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import random
+import shutil
+
+import numpy as np
+import pandas as pd
+from datasets import Dataset, concatenate_datasets, load_from_disk
+from sklearn.model_selection import train_test_split
+from torch.utils.data import DataLoader
+from transformers import Trainer
+
+from preprocess_playbyplay import file_hash
+
+MAX_LENGTH = 128  # Truncation for sources and targets, as before
+VALIDATION_SIZE = 0.1
+SPLIT_SEED = 42
+TOKENIZED_CACHE_DIR = "data/tokenized_cache"
+CACHE_FORMAT = 1  # Bump when tokenize_pairs changes what it writes
+GROUP_SIZE = 50  # Batches per length-sorted mega-batch (same idea as Trainer's group_by_length)
+HISTOGRAM_BIN = 8  # Tokens per histogram bucket
+MAX_TASK_REPEATS = 10  # Most times mix_tasks repeats a task's examples per epoch
+
+
+def tokenize_pairs(tokenizer, sources, targets, max_length=MAX_LENGTH, prefix=""):
+    """
+    Tokenizes source/target pairs without padding; batches are padded to their own longest
+    example by DataCollatorForSeq2Seq. `length` (source + target tokens) drives bucketing.
+    :param prefix: Task prefix put in front of every source, e.g. "commentary: ".
+    """
+    def tokenize(examples):
+        encoded = tokenizer([prefix + source for source in examples["source"]], text_target=examples["target"],
+                            truncation=True, max_length=max_length)
+        encoded["length"] = [len(i) + len(l) for i, l in zip(encoded["input_ids"], encoded["labels"])]
+        return encoded
+
+    return Dataset.from_dict({"source": sources, "target": targets}).map(
+        tokenize, batched=True, remove_columns=["source", "target"])
+
+
+def tokenized_cache_key(csv_file, source_column, target_column, tokenizer, max_length=MAX_LENGTH, prefix=""):
+    """
+    Hash of everything the tokenized splits depend on: CSV content, columns, tokenizer, max length and prefix.
+    """
+    inputs = {
+        "format": CACHE_FORMAT,
+        "csv_sha1": file_hash(csv_file),
+        "columns": [source_column, target_column],
+        "tokenizer": [tokenizer.name_or_path, type(tokenizer).__name__, len(tokenizer)],
+        "max_length": max_length,
+        "prefix": prefix,
+        "split": [VALIDATION_SIZE, SPLIT_SEED],
+    }
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode()).hexdigest()[:16], inputs
+
+
+def tokenize_splits(csv_file, source_column, target_column, tokenizer, max_length=MAX_LENGTH, prefix=""):
+    """
+    Reads, cleans and splits a training CSV the way the training scripts always have,
+    then tokenizes both splits.
+    :return: (train_dataset, val_dataset)
+    """
+    df = pd.read_csv(csv_file).dropna()
+    df = df[df[target_column] != ""]  # Remove empty labels
+    train_texts, val_texts, train_labels, val_labels = train_test_split(
+        df[source_column].tolist(), df[target_column].tolist(), test_size=VALIDATION_SIZE, random_state=SPLIT_SEED)
+    return (tokenize_pairs(tokenizer, train_texts, train_labels, max_length, prefix),
+            tokenize_pairs(tokenizer, val_texts, val_labels, max_length, prefix))
+
+
+def load_tokenized_splits(csv_file, source_column, target_column, tokenizer, max_length=MAX_LENGTH, prefix="",
+                          cache_dir=TOKENIZED_CACHE_DIR):
+    """
+    tokenize_splits() through an on-disk cache. Splits are saved as Arrow files under a key
+    that changes whenever the CSV, tokenizer or max length change, and later runs memory-map
+    them instead of re-reading and re-tokenizing. cache_dir=None disables the cache.
+    :return: (train_dataset, val_dataset)
+    """
+    if cache_dir is None:
+        return tokenize_splits(csv_file, source_column, target_column, tokenizer, max_length, prefix)
+
+    key, inputs = tokenized_cache_key(csv_file, source_column, target_column, tokenizer, max_length, prefix)
+    path = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(csv_file))[0]}-{key}")
+    if os.path.exists(os.path.join(path, "inputs.json")):
+        print(f"♻️ Reusing tokenized {csv_file} from {path}")
+        return load_from_disk(os.path.join(path, "train")), load_from_disk(os.path.join(path, "val"))
+
+    train_dataset, val_dataset = tokenize_splits(csv_file, source_column, target_column, tokenizer, max_length,
+                                                 prefix)
+    # Write next to the final directory and rename, so an interrupted run never leaves a half-written cache
+    partial = path + ".partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    train_dataset.save_to_disk(os.path.join(partial, "train"))
+    val_dataset.save_to_disk(os.path.join(partial, "val"))
+    with open(os.path.join(partial, "inputs.json"), "w") as f:
+        json.dump(inputs, f, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(partial, path)
+    print(f"💾 Cached tokenized {csv_file} in {path}")
+    remove_outdated_caches(cache_dir, path, inputs)
+    return load_from_disk(os.path.join(path, "train")), load_from_disk(os.path.join(path, "val"))
+
+
+def example_lengths(dataset):
+    """
+    The `length` column as one NumPy array; indexing the dataset per example is far slower.
+    """
+    return dataset.with_format("numpy", columns=["length"])[:]["length"]
+
+
+def remove_outdated_caches(cache_dir, current, inputs):
+    """
+    Deletes caches built from earlier versions of the same CSV with otherwise identical settings.
+    Caches for other tokenizers or max lengths are kept for sweeps that switch between them.
+    """
+    stem = os.path.basename(current).rsplit("-", 1)[0]
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if path == current or name.rsplit("-", 1)[0] != stem or not os.path.exists(os.path.join(path, "inputs.json")):
+            continue
+        with open(os.path.join(path, "inputs.json")) as f:
+            previous = json.load(f)
+        if {**previous, "csv_sha1": None} == {**inputs, "csv_sha1": None}:
+            shutil.rmtree(path)
+
+
+def mix_tasks(datasets, ratios=None, total=None, seed=SPLIT_SEED, max_repeats=MAX_TASK_REPEATS):
+    """
+    Draws a multi-task training set where task i makes up ratios[i] of `total` examples
+    (default: as many as all tasks together). Tasks with fewer examples than their share are
+    repeated, up to `max_repeats` times each (with a warning), larger ones subsampled.
+    :param datasets: Dict task -> tokenized dataset.
+    :param ratios: Dict task -> relative weight; weights are normalized. None weighs tasks by
+                   their number of examples, so every example is seen once per epoch.
+    """
+    ratios = ratios or {task: len(dataset) for task, dataset in datasets.items()}
+    total = total or sum(len(dataset) for dataset in datasets.values())
+    weight = sum(ratios[task] for task in datasets)
+    rng = np.random.default_rng(seed)
+    parts = []
+    for task, dataset in datasets.items():
+        count = round(total * ratios[task] / weight) if weight else 0
+        if count == 0 or len(dataset) == 0:
+            continue  # A small ratio can round to no examples at all
+        if count > max_repeats * len(dataset):
+            print(f"⚠️ {task}: a {ratios[task] / weight:.0%} share is {count:,} examples, "
+                  f"{count / len(dataset):.0f}x its {len(dataset):,}; capped at {max_repeats}x")
+            count = max_repeats * len(dataset)
+        indices = np.concatenate([rng.permutation(len(dataset)) for _ in range(-(-count // len(dataset)))])[:count]
+        parts.append(dataset.select(indices))
+    if not parts:
+        raise ValueError("No task has both a non-zero ratio and training examples")
+    return concatenate_datasets(parts).shuffle(seed=seed)
+
+
+def length_grouped_batches(lengths, batch_size, seed=0):
+    """
+    Shuffles, sorts each mega-batch of GROUP_SIZE batches by length and cuts it into
+    batches, so examples of similar length are padded together while batch order stays random.
+    :return: List of index lists.
+    """
+    rng = random.Random(seed)
+    indices = list(range(len(lengths)))
+    rng.shuffle(indices)
+    group = batch_size * GROUP_SIZE
+    batches = []
+    for start in range(0, len(indices), group):
+        ordered = sorted(indices[start:start + group], key=lambda i: lengths[i], reverse=True)
+        batches += [ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size)]
+    rng.shuffle(batches)
+    return batches
+
+
+def token_budget_batches(lengths, max_tokens, seed=0):
+    """
+    Packs length-sorted examples into batches of up to `max_tokens` padded tokens, so short
+    events travel in large batches and long ones in small batches.
+    :return: List of index lists, in random order.
+    """
+    batches, batch, longest = [], [], 0
+    for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        if batch and max(longest, lengths[i]) * (len(batch) + 1) > max_tokens:
+            batches.append(batch)
+            batch, longest = [], 0
+        batch.append(i)
+        longest = max(longest, lengths[i])
+    if batch:
+        batches.append(batch)
+    random.Random(seed).shuffle(batches)
+    return batches
+
+
+class BatchSampler:
+    """
+    Batch sampler over precomputed batches that reshuffles every epoch.
+    """
+
+    def __init__(self, make_batches, seed=0):
+        self.make_batches = make_batches
+        self.seed = seed
+        self.epoch = 0
+        self.batches = make_batches(seed)
+
+    def __len__(self):
+        return len(self.batches)
+
+    def __iter__(self):
+        batches = self.batches
+        self.epoch += 1
+        self.batches = self.make_batches(self.seed + self.epoch)
+        return iter(batches)
+
+
+class TokenBudgetTrainer(Trainer):
+    """
+    Trainer whose training batches hold up to `max_batch_tokens` padded tokens instead of a
+    fixed number of examples. With max_batch_tokens=None it behaves like Trainer.
+    """
+
+    def __init__(self, *args, max_batch_tokens=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_batch_tokens = max_batch_tokens
+
+    def get_train_dataloader(self):
+        if self.max_batch_tokens is None:
+            return super().get_train_dataloader()
+        lengths = example_lengths(self.train_dataset)
+        sampler = BatchSampler(lambda seed: token_budget_batches(lengths, self.max_batch_tokens, seed),
+                               seed=self.args.seed)
+        dataset = self._remove_unused_columns(self.train_dataset, description="training")
+        return self.accelerator.prepare(DataLoader(dataset, batch_sampler=sampler, collate_fn=self.data_collator,
+                                                   num_workers=self.args.dataloader_num_workers))
+
+
+def length_report(dataset, max_length=MAX_LENGTH, batch_size=8):
+    """
+    Prints token-length histograms for sources and targets and the share of pad tokens
+    under fixed max_length padding vs. dynamic padding of length-grouped batches.
+    """
+    sources = np.array([len(ids) for ids in dataset["input_ids"]])
+    targets = np.array([len(ids) for ids in dataset["labels"]])
+    print(f"📊 {len(dataset):,} examples")
+    for name, lengths in [("source", sources), ("target", targets)]:
+        p50, p95, p99 = np.percentile(lengths, [50, 95, 99])
+        print(f"   {name} tokens: mean {lengths.mean():.1f}, p50 {p50:.0f}, p95 {p95:.0f}, p99 {p99:.0f}, "
+              f"max {lengths.max()} ({(lengths >= max_length).sum()} truncated at {max_length})")
+        counts = np.bincount(np.minimum(lengths, max_length) // HISTOGRAM_BIN)
+        for bucket, count in enumerate(counts):
+            if count:
+                bar = "#" * max(1, round(50 * count / counts.max()))
+                print(f"   {bucket * HISTOGRAM_BIN:>4}-{bucket * HISTOGRAM_BIN + HISTOGRAM_BIN - 1:<4} {count:>7,} {bar}")
+
+    real = sources.sum() + targets.sum()
+    fixed = 2 * max_length * len(dataset)
+    grouped = sum(len(batch) * (sources[batch].max() + targets[batch].max())
+                  for batch in length_grouped_batches(sources + targets, batch_size))
+    print(f"   pad tokens: {1 - real / fixed:.1%} with max_length padding, "
+          f"{1 - real / grouped:.1%} with dynamic padding of length-grouped batches of {batch_size}")
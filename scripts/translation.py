@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+from commentary_cache import SLOT_PATTERN, event_signature, fill_template, surname
+from inference import LATENCY_SAMPLES, MAX_INPUT_LENGTH, percentiles
+
+# Local copy of a multilingual seq2seq model (M2M100 family: one model, target chosen per pass),
+# written once by `python scripts/translation.py --download` so serving never needs the network
+TRANSLATION_MODEL_DIR = "./translation-model"
+TRANSLATION_BASE_MODEL = "facebook/m2m100_418M"
+SOURCE_LANGUAGE = "en"
+TARGET_LANGUAGES = ("es", "fr", "de", "pt", "zh")  # With English, the six commentary languages
+MAX_TRANSLATION_TOKENS = 96
+PHRASE_JOINERS = {"zh": ""}  # Between translated sentences; a space otherwise
+PHRASE_CACHE_SIZE = 20000  # Translated phrases and phrase templates kept per language (LRU)
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_phrases(commentary):
+    """
+    Commentary sentences, the unit that repeats across events and is translated and cached.
+    """
+    return [phrase for phrase in SENTENCE_END.split(commentary.strip()) if phrase]
+
+
+def translation_template(translation, slots):
+    """
+    Masks the source phrase's player, team and number values in its translation.
+    :return: The template, or None unless every value appears in the translation exactly once
+             (names and numbers normally pass through translation unchanged).
+    """
+    template = translation
+    for slot, value in sorted(slots.items(), key=lambda item: len(item[1]), reverse=True):
+        candidates = [value] + ([surname(value)] if "PLAYER" in slot else [])
+        for candidate in candidates:
+            pattern = re.compile(r"(?<![\w])" + re.escape(candidate) + r"(?![\w])")
+            if len(pattern.findall(template)) == 1:
+                template = pattern.sub(lambda _: slot, template)
+                break
+        else:
+            return None
+    if any(slot.startswith("[NUMBER") for slot in slots) and re.search(r"\d", SLOT_PATTERN.sub("", template)):
+        return None
+    return template
+
+
+class PhraseCache:
+    """
+    Per-language LRU of translated phrases. Exact phrases are looked up first, then phrase
+    templates keyed on event_signature, so "Tatum secures the board." translated once serves
+    "Adebayo secures the board." too.
+    """
+
+    def __init__(self, max_size=PHRASE_CACHE_SIZE):
+        self.max_size = max_size
+        self.phrases = OrderedDict()  # (language, phrase) -> translation
+        self.templates = OrderedDict()  # (language, signature) -> translated template
+        self.hits = 0
+        self.template_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _touch(entries, key, value, max_size):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > max_size:
+            entries.popitem(last=False)
+
+    def get(self, language, phrase):
+        translation = self.phrases.get((language, phrase))
+        if translation is not None:
+            self.phrases.move_to_end((language, phrase))
+            self.hits += 1
+            return translation
+        signature, slots = event_signature(phrase)
+        template = self.templates.get((language, signature))
+        if template is not None:
+            self.templates.move_to_end((language, signature))
+            self.template_hits += 1
+            return fill_template(template, slots)
+        self.misses += 1
+        return None
+
+    def __contains__(self, key):
+        """
+        `(language, phrase) in cache`, without counting a lookup.
+        """
+        language, phrase = key
+        return key in self.phrases or (language, event_signature(phrase)[0]) in self.templates
+
+    def put(self, language, phrase, translation):
+        self._touch(self.phrases, (language, phrase), translation, self.max_size)
+        signature, slots = event_signature(phrase)
+        template = translation_template(translation, slots)
+        if template is not None:
+            self._touch(self.templates, (language, signature), template, self.max_size)
+
+    def snapshot(self):
+        lookups = self.hits + self.template_hits + self.misses
+        return {
+            "phrases": len(self.phrases),
+            "templates": len(self.templates),
+            "hits": self.hits,
+            "template_hits": self.template_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.template_hits) / lookups, 4) if lookups else None,
+        }
+
+
+class Translator:
+    """
+    English commentary -> TARGET_LANGUAGES with one local multilingual model.
+    All uncached phrases of a request go through the model as one batch per target language.
+    """
+
+    def __init__(self, model_dir=TRANSLATION_MODEL_DIR, languages=TARGET_LANGUAGES, cache_size=PHRASE_CACHE_SIZE,
+                 max_new_tokens=MAX_TRANSLATION_TOKENS, device="cpu"):
+        self.languages = tuple(languages)
+        self.max_new_tokens = max_new_tokens
+        self.device = device
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.tokenizer.src_lang = SOURCE_LANGUAGE
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_dir).to(device).eval()
+        self.cache = PhraseCache(cache_size) if cache_size else None
+        self.cache_lock = threading.Lock()  # translate() runs in worker threads; model passes run unlocked
+        self.latency = {language: deque(maxlen=LATENCY_SAMPLES) for language in self.languages}
+
+    def _generate(self, phrases, language):
+        inputs = self.tokenizer(phrases, padding=True, truncation=True, max_length=MAX_INPUT_LENGTH,
+                                return_tensors="pt").to(self.device)
+        with torch.inference_mode():
+            outputs = self.model.generate(**inputs, max_new_tokens=self.max_new_tokens,
+                                          forced_bos_token_id=self.tokenizer.get_lang_id(language))
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def translate(self, texts, language):
+        """
+        :param texts: List of English commentary strings.
+        :return: List of translations into `language`, in input order.
+        """
+        start = time.perf_counter()
+        split = [split_phrases(text) for text in texts]
+        translated, missing = {}, []
+        with self.cache_lock:
+            for phrase in dict.fromkeys(phrase for phrases in split for phrase in phrases):
+                cached = self.cache.get(language, phrase) if self.cache else None
+                if cached is None:
+                    missing.append(phrase)
+                else:
+                    translated[phrase] = cached
+        if missing:
+            translated.update(zip(missing, self._generate(missing, language)))
+            if self.cache:
+                with self.cache_lock:
+                    for phrase in missing:
+                        self.cache.put(language, phrase, translated[phrase])
+        self.latency[language].append(time.perf_counter() - start)
+        joiner = PHRASE_JOINERS.get(language, " ")
+        return [joiner.join(translated[phrase] for phrase in phrases) for phrases in split]
+
+    async def fan_out(self, commentary):
+        """
+        Translates one event's commentary into every target language, yielding
+        (language, translation) as each language finishes. Languages served entirely from
+        the phrase cache come first; model passes run in a worker thread, one per language.
+        """
+        phrases = split_phrases(commentary)
+        pending = []
+        for language in self.languages:
+            with self.cache_lock:
+                cached = self.cache is not None and all((language, phrase) in self.cache for phrase in phrases)
+            if cached:
+                yield language, self.translate([commentary], language)[0]
+            else:
+                pending.append(language)
+        for language in pending:
+            yield language, (await asyncio.to_thread(self.translate, [commentary], language))[0]
+
+    def snapshot(self):
+        return {
+            "languages": list(self.languages),
+            "latency_ms": {language: percentiles(samples) for language, samples in self.latency.items()},
+            "cache": self.cache.snapshot() if self.cache else None,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Translate English commentary offline with a local model.")
+    parser.add_argument("--download", action="store_true",
+                        help=f"Save {TRANSLATION_BASE_MODEL} to {TRANSLATION_MODEL_DIR} for offline use")
+    parser.add_argument("--model-dir", default=TRANSLATION_MODEL_DIR)
+    parser.add_argument("commentary", nargs="*")
+    args = parser.parse_args()
+
+    if args.download:
+        AutoTokenizer.from_pretrained(TRANSLATION_BASE_MODEL).save_pretrained(args.model_dir)
+        AutoModelForSeq2SeqLM.from_pretrained(TRANSLATION_BASE_MODEL).save_pretrained(args.model_dir)
+        print(f"✅ Saved {TRANSLATION_BASE_MODEL} in {args.model_dir}")
+
+    if args.commentary:
+        translator = Translator(args.model_dir)
+        for text in args.commentary:
+            print(f"en: {text}")
+            for language in translator.languages:
+                print(f"{language}: {translator.translate([text], language)[0]}")